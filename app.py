@@ -3,13 +3,32 @@ NFL Analysis Dashboard
 Interactive web app for exploring NFL statistics and trends
 """
 
+import os
+
 import streamlit as st
-import nflreadpy as nfl
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 
+import polars_engine
+import season_cache
+import season_stats
+import season_store
+import team_cube
+import wp_store
+
+# Aggregation engine for the team EPA table: 'pandas' or 'polars'
+BACKEND = os.environ.get('NFL_BACKEND', 'pandas')
+
+# Play-by-play columns read by the dashboard
+DASHBOARD_COLUMNS = [
+    'play_type', 'posteam', 'defteam', 'epa', 'penalty', 'season_type',
+    'pass', 'rush', 'touchdown', 'yards_gained',
+    'complete_pass', 'pass_touchdown', 'rush_touchdown', 'interception',
+    'passer_player_name', 'rusher_player_name',
+]
+
 # Page configuration
 st.set_page_config(
     page_title="NFL Analysis Dashboard",
@@ -32,22 +51,25 @@ st.markdown("""
         border-bottom: 1px solid #DDDDDD;
     }
 
-    /* Reduce visual noise */
-    .stTabs [data-baseweb="tab-list"] {
+    /* Reduce visual noise - the view switcher (radio key "view") reads as a tab bar */
+    .st-key-view [role="radiogroup"] {
         gap: 0;
         border-bottom: 1px solid #DDDDDD;
     }
 
-    .stTabs [data-baseweb="tab"] {
+    .st-key-view label[data-baseweb="radio"] {
         padding: 0.75rem 1.5rem;
+        margin: 0;
         background-color: transparent;
-        border: none;
         color: #666666;
         font-weight: 400;
     }
 
-    .stTabs [aria-selected="true"] {
-        background-color: transparent;
+    .st-key-view label[data-baseweb="radio"] > div:first-child {
+        display: none;
+    }
+
+    .st-key-view label[data-baseweb="radio"]:has(input:checked) {
         color: #1A1A1A;
         border-bottom: 2px solid #4A4A4A;
     }
@@ -101,76 +123,151 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # Cache data loading
-@st.cache_data
-def load_pbp_data(season):
-    """Load play-by-play data with caching"""
+@st.cache_resource
+def season_frames():
+    """Memory-bounded season cache shared by every session (NFL_SEASON_CACHE_MB)
+
+    Frames come memory-mapped from the shared season store, so replicas on
+    one host share a single copy of each season through the page cache.
+    """
+    return season_cache.SeasonCache(
+        lambda key: season_store.load_store(key[0], columns=DASHBOARD_COLUMNS))
+
+def season_version(season):
+    """Version of a season's shared store, or None if it can't be built
+
+    Every cached table, cube and store below takes it as part of its key,
+    so when any replica rebuilds the store they all recompute from the new
+    data, and entries for the old version age out.
+    """
     try:
-        pbp = nfl.load_pbp(season)
-        # Convert Polars DataFrame to Pandas DataFrame
-        if hasattr(pbp, 'to_pandas'):
-            pbp = pbp.to_pandas()
-        return pbp
+        return season_store.store_version(season)
+    except Exception as e:
+        st.error(f"Error loading data: {e}")
+        return None
+
+def load_pbp_data(season, version):
+    """Load play-by-play data through the shared season cache (not copied, read-only)"""
+    if version is None:
+        return None
+    try:
+        return season_frames().get((season, version))
     except Exception as e:
         st.error(f"Error loading data: {e}")
         return None
 
 @st.cache_data
-def get_team_stats(pbp, team):
-    """Calculate team statistics"""
-    team_plays = pbp[pbp['posteam'] == team].copy()
-
-    # Passing stats
-    passes = team_plays[team_plays['pass'] == 1]
-    pass_stats = {
-        'attempts': len(passes),
-        'completions': passes['complete_pass'].sum(),
-        'pass_yards': passes['yards_gained'].sum(),
-        'pass_tds': passes['pass_touchdown'].sum(),
-        'interceptions': passes['interception'].sum(),
-    }
-    if len(passes) > 0:
-        pass_stats['completion_pct'] = (pass_stats['completions'] / pass_stats['attempts']) * 100
-        pass_stats['yards_per_attempt'] = pass_stats['pass_yards'] / pass_stats['attempts']
-        if 'epa' in passes.columns:
-            pass_stats['pass_epa'] = passes['epa'].mean()
-
-    # Rushing stats
-    rushes = team_plays[team_plays['rush'] == 1]
-    rush_stats = {
-        'rush_attempts': len(rushes),
-        'rush_yards': rushes['yards_gained'].sum(),
-        'rush_tds': rushes['rush_touchdown'].sum(),
-    }
-    if len(rushes) > 0:
-        rush_stats['yards_per_carry'] = rush_stats['rush_yards'] / rush_stats['rush_attempts']
-        if 'epa' in rushes.columns:
-            rush_stats['rush_epa'] = rushes['epa'].mean()
+def get_team_stats_table(season, version):
+    """Passing and rushing stats for every team, built once per season version"""
+    pbp = load_pbp_data(season, version)
+    if pbp is None:
+        return None
+    return season_stats.build_team_stats_table(pbp)
 
-    return {**pass_stats, **rush_stats}
+def get_team_stats(season, version, team):
+    """Look up one team's statistics in the season table"""
+    table = get_team_stats_table(season, version)
+    if table is None:
+        return {}
+    return season_stats.team_stats_lookup(table, team)
 
 @st.cache_data
-def get_all_teams_epa(pbp):
-    """Calculate offensive EPA for all teams"""
-    if 'epa' not in pbp.columns:
+def get_league_summary(season, version):
+    """League-wide totals and the available columns, or None if the season failed to load"""
+    pbp = load_pbp_data(season, version)
+    if pbp is None:
         return None
+    return {
+        'columns': list(pbp.columns),
+        'plays': len(pbp),
+        'touchdowns': int(pbp['touchdown'].sum()),
+        'passing_plays': int((pbp['pass'] == 1).sum()),
+        'rushing_plays': int((pbp['rush'] == 1).sum()),
+    }
 
-    # Filter for offensive plays only using play_type
-    # Exclude penalties, two-point conversions, and other non-standard plays
-    offensive_plays = pbp[
-        (pbp['play_type'].isin(['pass', 'run'])) &
-        (pbp['posteam'].notna()) &
-        (pbp['epa'].notna()) &
-        ((pbp['penalty'] == 0) | (pbp['penalty'].isna()))
-    ].copy()
+@st.cache_data
+def get_all_teams_epa(season, version):
+    """Calculate offensive and defensive EPA for all teams"""
+    return season_stats.team_epa_table(load_pbp_data(season, version))
+
+@st.cache_data
+def get_all_teams_epa_polars(season, version):
+    """Calculate offensive EPA for all teams with the Polars lazy engine"""
+    return polars_engine.get_all_teams_epa(polars_engine.scan_season(season))
 
-    # Filter to regular season only (excludes playoffs, preseason)
-    if 'season_type' in offensive_plays.columns:
-        offensive_plays = offensive_plays[offensive_plays['season_type'] == 'REG']
+@st.cache_data
+def get_qb_leaderboard(season, version, min_attempts=100, top=20):
+    """QB leaderboard, cached per season version and parameters"""
+    return season_stats.qb_leaderboard(load_pbp_data(season, version), min_attempts=min_attempts, top=top)
 
-    team_epa = offensive_plays.groupby('posteam')['epa'].agg(['mean', 'sum', 'count']).reset_index()
-    team_epa.columns = ['Team', 'EPA/Play', 'Total EPA', 'Plays']
-    team_epa = team_epa.sort_values('EPA/Play', ascending=False)
-    return team_epa
+@st.cache_data
+def get_rb_leaderboard(season, version, min_attempts=50, top=20):
+    """RB leaderboard, cached per season version and parameters"""
+    return season_stats.rb_leaderboard(load_pbp_data(season, version), min_attempts=min_attempts, top=top)
+
+@st.cache_data
+def get_epa_histogram(season, version, play_column, bins):
+    """Binned EPA for one play type, cached per season version, play type and bin count"""
+    pbp = load_pbp_data(season, version)
+    return season_stats.epa_histogram(pbp, play_column, bins)
+
+def epa_histogram_figure(histogram, title, team=None):
+    """Bar chart of pre-binned EPA counts, optionally with one team's share overlaid"""
+    edges, league_counts, team_counts = histogram
+    centers = (edges[:-1] + edges[1:]) / 2
+    widths = edges[1:] - edges[:-1]
+
+    fig = go.Figure()
+    if team is None:
+        fig.add_trace(go.Bar(x=centers, y=league_counts, width=widths, marker_color='#666666', name='League'))
+        yaxis_title = 'Frequency'
+    else:
+        # Compare shapes, not volumes: each distribution as a share of its plays
+        fig.add_trace(go.Bar(x=centers, y=league_counts / max(league_counts.sum(), 1), width=widths,
+                             marker_color='#CCCCCC', name='League'))
+        if team in team_counts.index:
+            counts = team_counts.loc[team].to_numpy()
+            fig.add_trace(go.Bar(x=centers, y=counts / max(counts.sum(), 1), width=widths,
+                                 marker_color='#4A4A4A', opacity=0.7, name=team))
+        yaxis_title = 'Share of Plays'
+
+    fig.update_layout(
+        title=title,
+        xaxis_title='EPA',
+        yaxis_title=yaxis_title,
+        barmode='overlay',
+        bargap=0,
+        showlegend=team is not None,
+        plot_bgcolor='#FAFAFA',
+        paper_bgcolor='#FAFAFA',
+        font=dict(color='#1A1A1A', size=11),
+        title_font=dict(size=14, color='#1A1A1A')
+    )
+    return fig
+
+@st.cache_data
+def load_team_cube(season, version):
+    """Team x week x play-type EPA cube for a season"""
+    try:
+        return team_cube.load_cube(season)
+    except Exception as e:
+        st.warning(f"Weekly data unavailable: {e}")
+        return None
+
+@st.cache_resource(max_entries=12)  # Mappings of superseded versions are dropped
+def load_wp_store(season, version):
+    """Game index and memory-mapped win probability curves for a season"""
+    try:
+        return wp_store.load_store(season)
+    except Exception as e:
+        st.warning(f"Win probability data unavailable: {e}")
+        return None
+
+def load_team_epa(season, version):
+    """Team EPA table from the configured backend"""
+    if BACKEND == 'polars':
+        return get_all_teams_epa_polars(season, version)
+    return get_all_teams_epa(season, version)
 
 # Header
 st.markdown('<h1 class="main-header">NFL Analysis Dashboard</h1>', unsafe_allow_html=True)
@@ -203,46 +300,53 @@ with st.sidebar:
     st.markdown("---")
     st.caption("Data source: nflreadpy | Metrics include EPA (Expected Points Added)")
 
-# Load data
+    with st.expander("Season cache"):
+        st.json(season_frames().metrics())
+
+# Load data (everything below reads cached, season-keyed tables, so the
+# play-by-play itself is only touched when a season is first opened)
 with st.spinner(f"Loading {season} season data..."):
-    pbp = load_pbp_data(season)
+    version = season_version(season)
+    league = get_league_summary(season, version)
 
-if pbp is None:
+if league is None:
     st.error("Failed to load data. Please try again.")
     st.stop()
 
-# Main content
-tab1, tab2, tab3, tab4 = st.tabs(["League Overview", "Team Analysis", "Player Stats", "Advanced Metrics"])
+# Main content: only the selected view runs on a rerun
+view = st.radio(
+    "View",
+    options=["League Overview", "Team Analysis", "Player Stats", "Advanced Metrics"],
+    horizontal=True,
+    label_visibility='collapsed',
+    key='view'
+)
 
-# Tab 1: League Overview
-with tab1:
+# League Overview
+if view == "League Overview":
     st.header("League-Wide Statistics")
 
     # Key metrics
     col1, col2, col3, col4 = st.columns(4)
 
     with col1:
-        total_plays = len(pbp)
-        st.metric("Total Plays", f"{total_plays:,}")
+        st.metric("Total Plays", f"{league['plays']:,}")
 
     with col2:
-        total_touchdowns = pbp['touchdown'].sum()
-        st.metric("Total Touchdowns", f"{int(total_touchdowns):,}")
+        st.metric("Total Touchdowns", f"{league['touchdowns']:,}")
 
     with col3:
-        passing_plays = (pbp['pass'] == 1).sum()
-        st.metric("Passing Plays", f"{int(passing_plays):,}")
+        st.metric("Passing Plays", f"{league['passing_plays']:,}")
 
     with col4:
-        rushing_plays = (pbp['rush'] == 1).sum()
-        st.metric("Rushing Plays", f"{int(rushing_plays):,}")
+        st.metric("Rushing Plays", f"{league['rushing_plays']:,}")
 
     st.markdown("---")
 
     # Team EPA comparison
-    st.subheader("Team Offensive Efficiency (EPA)")
+    st.subheader("Team Offensive and Defensive Efficiency (EPA)")
 
-    team_epa = get_all_teams_epa(pbp)
+    team_epa = load_team_epa(season, version)
 
     if team_epa is not None:
         col1, col2 = st.columns(2)
@@ -289,21 +393,67 @@ with tab1:
             )
             st.plotly_chart(fig, use_container_width=True)
 
+        col1, col2 = st.columns(2)
+
+        with col1:
+            # Defense: lower EPA allowed is better
+            fig = px.bar(
+                team_epa.nsmallest(15, 'Def EPA/Play'),
+                x='Def EPA/Play',
+                y='Team',
+                orientation='h',
+                title='Top 15 Defenses by EPA/Play Allowed',
+                color='Def EPA/Play',
+                color_continuous_scale=['#4A4A4A', '#CCCCCC']
+            )
+            fig.update_layout(
+                height=500,
+                yaxis={'categoryorder': 'total descending'},
+                plot_bgcolor='#FAFAFA',
+                paper_bgcolor='#FAFAFA',
+                font=dict(color='#1A1A1A', size=11),
+                title_font=dict(size=14, color='#1A1A1A')
+            )
+            st.plotly_chart(fig, use_container_width=True)
+
+        with col2:
+            # Net EPA chart
+            fig = px.bar(
+                team_epa.nlargest(15, 'Net EPA/Play'),
+                x='Net EPA/Play',
+                y='Team',
+                orientation='h',
+                title='Top 15 Teams by Net EPA/Play',
+                color='Net EPA/Play',
+                color_continuous_scale=['#CCCCCC', '#4A4A4A']
+            )
+            fig.update_layout(
+                height=500,
+                yaxis={'categoryorder': 'total ascending'},
+                plot_bgcolor='#FAFAFA',
+                paper_bgcolor='#FAFAFA',
+                font=dict(color='#1A1A1A', size=11),
+                title_font=dict(size=14, color='#1A1A1A')
+            )
+            st.plotly_chart(fig, use_container_width=True)
+
         # Full rankings table
         st.subheader("Complete Team Rankings")
         st.dataframe(
-            team_epa.style.background_gradient(subset=['EPA/Play'], cmap='RdYlGn'),
+            team_epa.style
+                .background_gradient(subset=['EPA/Play', 'Net EPA/Play'], cmap='RdYlGn')
+                .background_gradient(subset=['Def EPA/Play'], cmap='RdYlGn_r'),
             use_container_width=True,
             height=400
         )
     else:
         st.warning("EPA data not available for this season.")
 
-# Tab 2: Team Analysis
-with tab2:
+# Team Analysis
+if view == "Team Analysis":
     st.header(f"{selected_team} Team Analysis")
 
-    team_stats = get_team_stats(pbp, selected_team)
+    team_stats = get_team_stats(season, version, selected_team)
 
     # Passing metrics
     st.subheader("Passing Statistics")
@@ -349,26 +499,42 @@ with tab2:
         with col1:
             st.metric("EPA/Rush", f"{team_stats['rush_epa']:.3f}")
 
-# Tab 3: Player Stats
-with tab3:
+    # Weekly trends, sliced from the team x week cube
+    cube = load_team_cube(season, version)
+    if cube is not None and selected_team in cube['teams']:
+        st.markdown("---")
+        st.subheader("Weekly Trends")
+
+        window = st.slider("Rolling window (weeks)", min_value=1, max_value=8, value=4)
+        offense = team_cube.rolling_epa(cube, window, 'offense').loc[selected_team]
+        defense = team_cube.rolling_epa(cube, window, 'defense').loc[selected_team]
+
+        fig = go.Figure()
+        fig.add_trace(go.Scatter(x=offense.index, y=offense.values, mode='lines+markers',
+                                 name='Offense EPA/Play', line=dict(color='#4A4A4A', width=2)))
+        fig.add_trace(go.Scatter(x=defense.index, y=defense.values, mode='lines+markers',
+                                 name='Defense EPA/Play Allowed', line=dict(color='#999999', width=2, dash='dot')))
+        fig.add_hline(y=0, line_color='#CCCCCC')
+        fig.update_layout(
+            title=f'{selected_team} EPA/Play, {window}-Week Rolling',
+            xaxis_title='Week',
+            yaxis_title='EPA/Play',
+            plot_bgcolor='#FAFAFA',
+            paper_bgcolor='#FAFAFA',
+            font=dict(color='#1A1A1A', size=11),
+            title_font=dict(size=14, color='#1A1A1A')
+        )
+        st.plotly_chart(fig, use_container_width=True)
+
+# Player Stats
+if view == "Player Stats":
     st.header("Player Statistics")
 
     # Top QBs
-    if 'epa' in pbp.columns and 'passer_player_name' in pbp.columns:
+    if 'epa' in league['columns'] and 'passer_player_name' in league['columns']:
         st.subheader("Top Quarterbacks by EPA/Play")
 
-        qb_stats = pbp[pbp['pass'] == 1].groupby('passer_player_name').agg({
-            'epa': ['mean', 'count'],
-            'yards_gained': 'sum',
-            'pass_touchdown': 'sum',
-            'interception': 'sum',
-            'complete_pass': 'sum'
-        }).reset_index()
-
-        qb_stats.columns = ['Player', 'EPA/Play', 'Attempts', 'Pass Yards', 'TDs', 'INTs', 'Completions']
-        qb_stats = qb_stats[qb_stats['Attempts'] >= 100]
-        qb_stats['Comp %'] = (qb_stats['Completions'] / qb_stats['Attempts'] * 100).round(1)
-        qb_stats = qb_stats.sort_values('EPA/Play', ascending=False).head(20)
+        qb_stats = get_qb_leaderboard(season, version)
 
         # QBs visualization
         fig = px.scatter(
@@ -391,7 +557,7 @@ with tab3:
 
         # QBs table
         st.dataframe(
-            qb_stats[['Player', 'Attempts', 'Pass Yards', 'TDs', 'INTs', 'Comp %', 'EPA/Play']].style.background_gradient(subset=['EPA/Play'], cmap='RdYlGn'),
+            qb_stats[['Player', 'Attempts', 'Pass Yards', 'TDs', 'INTs', 'Comp %', 'EPA/Play', 'CI Low', 'CI High']].style.background_gradient(subset=['EPA/Play'], cmap='RdYlGn'),
             use_container_width=True,
             height=400
         )
@@ -399,19 +565,10 @@ with tab3:
     st.markdown("---")
 
     # Top RBs
-    if 'epa' in pbp.columns and 'rusher_player_name' in pbp.columns:
+    if 'epa' in league['columns'] and 'rusher_player_name' in league['columns']:
         st.subheader("Top Running Backs by EPA/Rush")
 
-        rb_stats = pbp[pbp['rush'] == 1].groupby('rusher_player_name').agg({
-            'epa': ['mean', 'count'],
-            'yards_gained': 'sum',
-            'rush_touchdown': 'sum'
-        }).reset_index()
-
-        rb_stats.columns = ['Player', 'EPA/Rush', 'Attempts', 'Rush Yards', 'TDs']
-        rb_stats = rb_stats[rb_stats['Attempts'] >= 50]
-        rb_stats['Yards/Carry'] = (rb_stats['Rush Yards'] / rb_stats['Attempts']).round(2)
-        rb_stats = rb_stats.sort_values('EPA/Rush', ascending=False).head(20)
+        rb_stats = get_rb_leaderboard(season, version)
 
         # RBs visualization
         fig = px.bar(
@@ -434,68 +591,76 @@ with tab3:
 
         # RBs table
         st.dataframe(
-            rb_stats[['Player', 'Attempts', 'Rush Yards', 'TDs', 'Yards/Carry', 'EPA/Rush']].style.background_gradient(subset=['EPA/Rush'], cmap='RdYlGn'),
+            rb_stats[['Player', 'Attempts', 'Rush Yards', 'TDs', 'Yards/Carry', 'EPA/Rush', 'CI Low', 'CI High']].style.background_gradient(subset=['EPA/Rush'], cmap='RdYlGn'),
             use_container_width=True,
             height=400
         )
 
-# Tab 4: Advanced Metrics
-with tab4:
+# Advanced Metrics
+if view == "Advanced Metrics":
     st.header("Advanced Metrics & Insights")
 
-    if 'epa' in pbp.columns:
+    if 'epa' in league['columns']:
         st.subheader("EPA Distribution")
 
+        bins = 50
+        overlay = st.checkbox(f"Overlay {selected_team}", value=False)
+
         col1, col2 = st.columns(2)
 
         with col1:
             # Pass EPA distribution
-            pass_epa = pbp[pbp['pass'] == 1]['epa'].dropna()
-            fig = go.Figure()
-            fig.add_trace(go.Histogram(
-                x=pass_epa,
-                nbinsx=50,
-                name='Pass EPA',
-                marker_color='#666666'
-            ))
-            fig.update_layout(
-                title='Passing EPA Distribution',
-                xaxis_title='EPA',
-                yaxis_title='Frequency',
-                showlegend=False,
-                plot_bgcolor='#FAFAFA',
-                paper_bgcolor='#FAFAFA',
-                font=dict(color='#1A1A1A', size=11),
-                title_font=dict(size=14, color='#1A1A1A')
-            )
+            fig = epa_histogram_figure(get_epa_histogram(season, version, 'pass', bins), 'Passing EPA Distribution',
+                                       selected_team if overlay else None)
             st.plotly_chart(fig, use_container_width=True)
 
         with col2:
             # Rush EPA distribution
-            rush_epa = pbp[pbp['rush'] == 1]['epa'].dropna()
-            fig = go.Figure()
-            fig.add_trace(go.Histogram(
-                x=rush_epa,
-                nbinsx=50,
-                name='Rush EPA',
-                marker_color='#666666'
-            ))
-            fig.update_layout(
-                title='Rushing EPA Distribution',
-                xaxis_title='EPA',
-                yaxis_title='Frequency',
-                showlegend=False,
-                plot_bgcolor='#FAFAFA',
-                paper_bgcolor='#FAFAFA',
-                font=dict(color='#1A1A1A', size=11),
-                title_font=dict(size=14, color='#1A1A1A')
-            )
+            fig = epa_histogram_figure(get_epa_histogram(season, version, 'rush', bins), 'Rushing EPA Distribution',
+                                       selected_team if overlay else None)
             st.plotly_chart(fig, use_container_width=True)
 
         # Win Probability
-        if 'wp' in pbp.columns:
+        store = load_wp_store(season, version)
+        if store is not None:
             st.subheader("Win Probability Trends")
-            st.caption("Select a specific game to view probability chart")
+            games, curves = store
+
+            team_games = games[(games['home_team'] == selected_team) | (games['away_team'] == selected_team)]
+            game_id = st.selectbox(
+                "Select Game",
+                options=team_games.index.tolist(),
+                format_func=lambda gid: (f"Week {team_games.loc[gid, 'week']}: "
+                                         f"{team_games.loc[gid, 'away_team']} @ {team_games.loc[gid, 'home_team']}")
+            )
+
+            if game_id is not None:
+                curve = wp_store.game_curve(games, curves, game_id)
+                home = games.loc[game_id, 'home_team']
+                away = games.loc[game_id, 'away_team']
+                wp = curve['home_wp'] if home == selected_team else 1 - curve['home_wp']
+
+                fig = go.Figure()
+                fig.add_trace(go.Scatter(
+                    x=(3600 - curve['game_seconds_remaining']) / 60,
+                    y=wp,
+                    mode='lines',
+                    line=dict(color='#4A4A4A', width=2),
+                    name=f'{selected_team} win probability'
+                ))
+                fig.add_hline(y=0.5, line_dash='dash', line_color='#999999')
+                fig.update_layout(
+                    title=f'{away} @ {home}: {selected_team} Win Probability',
+                    xaxis_title='Game Minute',
+                    yaxis_title='Win Probability',
+                    yaxis=dict(range=[0, 1], tickformat='.0%'),
+                    showlegend=False,
+                    plot_bgcolor='#FAFAFA',
+                    paper_bgcolor='#FAFAFA',
+                    font=dict(color='#1A1A1A', size=11),
+                    title_font=dict(size=14, color='#1A1A1A')
+                )
+                st.plotly_chart(fig, use_container_width=True)
 
     # Data export
     st.markdown("---")
@@ -505,7 +670,7 @@ with tab4:
 
     with col1:
         if st.button("Export Team Stats to CSV"):
-            team_epa = get_all_teams_epa(pbp)
+            team_epa = load_team_epa(season, version)
             if team_epa is not None:
                 csv = team_epa.to_csv(index=False)
                 st.download_button(
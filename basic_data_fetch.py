@@ -3,15 +3,16 @@ Basic NFL Data Fetching Example
 This script shows how to download and explore NFL play-by-play data
 """
 
-import nflreadpy as nfl
 import pandas as pd
 
+import data_cache
+
 def fetch_recent_season_data(season=2024):
     """Fetch play-by-play data for a season"""
     print(f"Fetching NFL data for {season} season...")
 
-    # Load play-by-play data
-    pbp = nfl.load_pbp(season)
+    # Load play-by-play data (all columns, served from the local cache after the first run)
+    pbp = data_cache.load_pbp(season)
 
     print(f"\nDataset shape: {pbp.shape}")
     print(f"Columns: {pbp.shape[1]}")
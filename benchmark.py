@@ -0,0 +1,178 @@
+"""
+Offline Benchmark Suite
+Times and memory-profiles the stat pipeline on synthetic play-by-play, so
+regressions can be measured without network access
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import data_cache
+import fetch_nfl_data as export
+import season_stats
+import synthetic_pbp
+
+RESULTS_DIR = Path(__file__).parent / '.benchmarks'
+
+# Relative slowdown reported as a regression by --compare
+REGRESSION_THRESHOLD = 0.10
+
+def git_commit():
+    """Current commit hash, or None outside a git checkout"""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True, cwd=Path(__file__).parent).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def measure(func, repeats):
+    """Wall time over several runs, then peak traced memory on one extra run"""
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+
+    # tracemalloc slows allocation-heavy code, so memory is measured on its own run
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'min_s': min(times),
+        'median_s': statistics.median(times),
+        'peak_mb': peak / 1024 ** 2,
+    }
+
+def build_cases(pbp, seasons, output_dir):
+    """Benchmark cases: name -> zero-argument callable"""
+    first_season = seasons[0]
+    team_table = season_stats.build_team_stats_table(pbp)
+
+    def get_team_stats():
+        table = season_stats.build_team_stats_table(pbp)
+        return [season_stats.team_stats_lookup(table, team) for team in synthetic_pbp.TEAMS]
+
+    def json_export():
+        for season in seasons:
+            export.export_season(season, output_dir, offline=True)
+
+    cases = {
+        'calculate_team_stats': lambda: export.calculate_team_stats(pbp),
+        'calculate_player_stats': lambda: export.calculate_player_stats(pbp, first_season, offline=True),
+        'get_all_teams_epa': lambda: season_stats.team_epa_table(pbp),
+        'get_team_stats': get_team_stats,
+        'team_stats_lookup': lambda: [season_stats.team_stats_lookup(team_table, team)
+                                      for team in synthetic_pbp.TEAMS],
+        'qb_leaderboard': lambda: season_stats.qb_leaderboard(pbp),
+        'rb_leaderboard': lambda: season_stats.rb_leaderboard(pbp),
+        'epa_histogram': lambda: season_stats.epa_histogram(pbp, 'pass'),
+        'json_export': json_export,
+    }
+    return cases
+
+def run_benchmarks(n_seasons=1, plays=None, repeats=5, only=None, seed=0):
+    """Generate synthetic seasons into a temporary cache and benchmark each case"""
+    seasons = [2000 + i for i in range(n_seasons)]
+    rosters = synthetic_pbp.generate_rosters(seed)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        original_cache_dir = data_cache.CACHE_DIR
+        data_cache.CACHE_DIR = Path(tmp) / 'cache'
+        output_dir = Path(tmp) / 'export'
+        output_dir.mkdir()
+
+        try:
+            frames = []
+            for season in seasons:
+                season_pbp = synthetic_pbp.generate_season(season, n_plays=plays, rosters=rosters, seed=seed)
+                synthetic_pbp.write_to_cache(season_pbp, rosters, season)
+                frames.append(season_pbp)
+            pbp = pd.concat(frames, ignore_index=True)
+            del frames
+            print(f"Generated {len(pbp):,} synthetic plays over {n_seasons} season(s)")
+
+            results = {}
+            for name, func in build_cases(pbp, seasons, output_dir).items():
+                if only and name not in only:
+                    continue
+                results[name] = measure(func, repeats)
+                print(f"   {name:<24} {results[name]['median_s'] * 1000:9.1f} ms "
+                      f"(min {results[name]['min_s'] * 1000:.1f} ms)  peak {results[name]['peak_mb']:7.1f} MB")
+        finally:
+            data_cache.CACHE_DIR = original_cache_dir
+
+    return {
+        'commit': git_commit(),
+        'timestamp': pd.Timestamp.now().isoformat(),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'seasons': n_seasons,
+        'rows': len(pbp),
+        'repeats': repeats,
+        'results': results,
+    }
+
+def compare_results(old_file, new_file):
+    """Print per-case changes between two saved benchmark runs"""
+    with open(old_file) as f:
+        old = json.load(f)
+    with open(new_file) as f:
+        new = json.load(f)
+
+    print(f"{old.get('commit')} ({old['rows']:,} rows) -> {new.get('commit')} ({new['rows']:,} rows)")
+    regressions = 0
+    for name, after in new['results'].items():
+        before = old['results'].get(name)
+        if before is None:
+            print(f"   {name:<24} new")
+            continue
+
+        time_change = after['median_s'] / before['median_s'] - 1
+        memory_change = after['peak_mb'] / before['peak_mb'] - 1 if before['peak_mb'] else 0
+        flag = '❌' if time_change > REGRESSION_THRESHOLD else '✅'
+        regressions += time_change > REGRESSION_THRESHOLD
+        print(f"   {flag} {name:<24} time {time_change:+7.1%}   peak memory {memory_change:+7.1%}")
+
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the stat pipeline on synthetic play-by-play')
+    parser.add_argument('--seasons', type=int, default=1, choices=range(1, 26), metavar='1-25',
+                        help='Number of synthetic seasons (default: 1)')
+    parser.add_argument('--plays', type=int, default=None,
+                        help='Approximate rows per season (default: real-season size)')
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--only', nargs='+', default=None, help='Only run these cases')
+    parser.add_argument('--output', type=Path, default=None,
+                        help='Results file (default: .benchmarks/<commit>.json)')
+    parser.add_argument('--compare', nargs=2, type=Path, metavar=('OLD', 'NEW'),
+                        help='Compare two saved results files instead of running')
+    args = parser.parse_args()
+
+    if args.compare:
+        regressions = compare_results(*args.compare)
+        raise SystemExit(1 if regressions else 0)
+
+    report = run_benchmarks(args.seasons, plays=args.plays, repeats=args.repeats, only=args.only)
+
+    output_file = args.output or RESULTS_DIR / f"{report['commit'] or 'results'}.json"
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_file, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n✅ Results written to {output_file}")
+
+if __name__ == '__main__':
+    main()
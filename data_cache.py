@@ -0,0 +1,269 @@
+"""
+Local Parquet Cache for nflverse Data
+Downloads each season once and reads only the columns a script needs from disk
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows - refreshes there are not coordinated
+    fcntl = None
+
+import nflreadpy as nfl
+import pandas as pd
+import polars as pl
+import pyarrow.parquet as pq
+
+# Cache location and behaviour can be overridden from the environment
+CACHE_DIR = Path(os.environ.get('NFL_CACHE_DIR', Path(__file__).parent / '.nfl_cache'))
+OFFLINE = os.environ.get('NFL_OFFLINE', '').lower() in ('1', 'true', 'yes')
+
+# The in-progress season changes every week, so its cached files expire
+CURRENT_SEASON_TTL_HOURS = float(os.environ.get('NFL_CACHE_TTL_HOURS', 24))
+
+# Downloads: how many run at once, and how often a failed one is retried
+MAX_CONCURRENT_LOADS = int(os.environ.get('NFL_MAX_CONCURRENT_LOADS', 4))
+DOWNLOAD_RETRIES = int(os.environ.get('NFL_DOWNLOAD_RETRIES', 3))
+RETRY_BACKOFF_SECONDS = float(os.environ.get('NFL_RETRY_BACKOFF_SECONDS', 2))
+
+# Read "downloads" from a local directory of {dataset}_{season}.parquet files instead of nflverse
+SOURCE_DIR = os.environ.get('NFL_SOURCE_DIR')
+
+# Dtype conversions applied by downcast_pbp
+CATEGORY_COLUMNS = [
+    'posteam', 'defteam', 'home_team', 'away_team', 'game_id', 'season_type', 'play_type',
+    'passer_player_name', 'passer_player_id',
+    'rusher_player_name', 'rusher_player_id',
+    'receiver_player_name', 'receiver_player_id',
+]
+# 0/1 indicators where a missing value means "no"
+FLAG_COLUMNS = [
+    'pass', 'rush', 'touchdown', 'complete_pass', 'incomplete_pass', 'penalty',
+    'pass_attempt', 'rush_attempt', 'pass_touchdown', 'rush_touchdown', 'interception',
+    'sack', 'fumble', 'qb_scramble', 'first_down',
+]
+# success is missing on plays without EPA; it stays a float so those don't count as failures
+FLOAT32_COLUMNS = [
+    'epa', 'wp', 'wpa', 'cpoe', 'air_yards', 'yards_gained',
+    'passing_yards', 'rushing_yards', 'receiving_yards', 'success',
+]
+
+LOADERS = {
+    'pbp': nfl.load_pbp,
+    'rosters': nfl.load_rosters,
+    'schedules': nfl.load_schedules,
+}
+
+def local_source(directory):
+    """Loaders with the LOADERS interface that read a local mirror of nflverse files"""
+    directory = Path(directory)
+
+    def reader(dataset):
+        def load(season):
+            return pl.read_parquet(directory / f'{dataset}_{season}.parquet')
+        return load
+
+    return {dataset: reader(dataset) for dataset in LOADERS}
+
+def default_source():
+    """The configured data source: a local mirror if NFL_SOURCE_DIR is set, else nflverse"""
+    return local_source(SOURCE_DIR) if SOURCE_DIR else LOADERS
+
+def download(dataset, season, source=None):
+    """Fetch a dataset for a season, retrying failures with exponential backoff"""
+    source = source or default_source()
+    for attempt in range(DOWNLOAD_RETRIES + 1):
+        try:
+            return source[dataset](season)
+        except Exception as e:
+            if attempt == DOWNLOAD_RETRIES:
+                raise
+            delay = RETRY_BACKOFF_SECONDS * 2 ** attempt
+            print(f"⚠️ {season} {dataset} download failed ({e!r}); retrying in {delay:g}s")
+            time.sleep(delay)
+
+def cache_path(dataset, season):
+    """Path of the cached Parquet file for a dataset and season"""
+    return CACHE_DIR / f'{dataset}_{season}.parquet'
+
+def is_stale(path, season):
+    """Check whether a cached file should be downloaded again"""
+    if not path.exists():
+        return True
+    if season != nfl.get_current_season():
+        return False
+    age_hours = (time.time() - path.stat().st_mtime) / 3600
+    return age_hours > CURRENT_SEASON_TTL_HOURS
+
+def temporary_path(path):
+    """Hidden temporary name next to path, unique to this process and thread"""
+    return path.with_name(f'.{path.name}.{os.getpid()}.{threading.get_ident()}.tmp')
+
+@contextmanager
+def refresh_lock(path, blocking=True):
+    """Exclusive lock for rewriting a cached file, shared by every thread and process
+
+    Yields True once held. With blocking=False it yields False straight
+    away if someone else is already rewriting the file.
+    """
+    if fcntl is None:
+        yield True
+        return
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # flock locks belong to the open file, so threads exclude each other too
+    with open(path.with_name(f'.{path.name}.lock'), 'w') as lock_file:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def ensure_cached(dataset, season, offline=None, refresh=False, source=None):
+    """Make sure a season is on disk, downloading it if needed
+
+    source maps dataset names to loaders (default: default_source()).
+    Only one thread or process downloads a file at a time. While a stale
+    copy is being refreshed elsewhere the others keep using it, and callers
+    with no copy (or refresh=True) wait and take the new one.
+    """
+    if offline is None:
+        offline = OFFLINE
+
+    path = cache_path(dataset, season)
+
+    if offline:
+        if not path.exists():
+            raise FileNotFoundError(
+                f"No cached {dataset} data for {season} at {path} (offline mode)"
+            )
+        return path
+
+    if refresh or is_stale(path, season):
+        requested = time.time()
+        with refresh_lock(path, blocking=refresh or not path.exists()) as locked:
+            if not locked:
+                return path
+
+            # Someone else may have downloaded it while this caller waited
+            if path.exists() and (path.stat().st_mtime >= requested or
+                                  not (refresh or is_stale(path, season))):
+                return path
+
+            print(f"Downloading {season} {dataset} data...")
+            df = download(dataset, season, source)
+
+            # Write to a temporary file first so readers never see a partial file
+            tmp_path = temporary_path(path)
+            df.write_parquet(tmp_path)
+            os.replace(tmp_path, path)
+
+    return path
+
+def prefetch(datasets, seasons, offline=None, refresh=False, source=None, max_workers=None):
+    """Make sure several datasets and seasons are on disk, downloading them concurrently
+
+    Downloads are I/O bound, so they run on a thread pool of at most
+    max_workers (default MAX_CONCURRENT_LOADS) at a time. Returns the cached
+    paths keyed by (dataset, season); raises the first failure once every
+    download has finished.
+    """
+    jobs = [(dataset, season) for season in seasons for dataset in datasets]
+    paths = {}
+    errors = []
+
+    with ThreadPoolExecutor(max_workers=max_workers or MAX_CONCURRENT_LOADS) as pool:
+        futures = {
+            pool.submit(ensure_cached, dataset, season, offline=offline, refresh=refresh, source=source): (dataset, season)
+            for dataset, season in jobs
+        }
+        for future in as_completed(futures):
+            dataset, season = futures[future]
+            try:
+                paths[dataset, season] = future.result()
+            except Exception as e:
+                print(f"❌ Could not cache {season} {dataset}: {e!r}")
+                errors.append(e)
+
+    if errors:
+        raise errors[0]
+    return paths
+
+def read_cached(dataset, season, columns=None, filters=None, offline=None, refresh=False):
+    """Read a cached dataset, projecting to the requested columns
+
+    filters are pyarrow row filters, e.g. [('week', '>=', 5)]
+    """
+    path = ensure_cached(dataset, season, offline=offline, refresh=refresh)
+
+    # Older seasons may lack newer columns - read whatever is available
+    if columns is not None:
+        available = set(pq.read_schema(path).names)
+        columns = [col for col in columns if col in available]
+
+    return pd.read_parquet(path, columns=columns, filters=filters)
+
+def memory_mb(df):
+    """Deep memory usage of a DataFrame in MB"""
+    return df.memory_usage(deep=True).sum() / 1024 ** 2
+
+def downcast_pbp(pbp, float32=True):
+    """Shrink play-by-play dtypes in place and report the memory saved
+
+    Team, player and play-type strings become categoricals, 0/1 flags
+    become int8 (missing counts as 0) and EPA/WP-style metrics float32.
+    float32=False keeps the metrics at full precision, for callers whose
+    sums must match a regular load.
+    """
+    before = memory_mb(pbp)
+
+    for column in CATEGORY_COLUMNS:
+        if column in pbp.columns:
+            pbp[column] = pbp[column].astype('category')
+
+    for column in FLAG_COLUMNS:
+        if column in pbp.columns:
+            pbp[column] = pbp[column].fillna(0).astype('int8')
+
+    for column in FLOAT32_COLUMNS if float32 else []:
+        if column in pbp.columns:
+            pbp[column] = pbp[column].astype('float32')
+
+    after = memory_mb(pbp)
+    print(f"Play-by-play memory: {before:.1f} MB -> {after:.1f} MB")
+
+    return pbp
+
+def load_pbp(season, columns=None, filters=None, offline=None, refresh=False, lean=False):
+    """Load play-by-play data for a season from the local cache
+
+    lean=True downcasts dtypes with downcast_pbp to cut memory use.
+    """
+    pbp = read_cached('pbp', season, columns=columns, filters=filters,
+                      offline=offline, refresh=refresh)
+    if lean:
+        pbp = downcast_pbp(pbp)
+    return pbp
+
+def scan_pbp(season, offline=None, refresh=False):
+    """Lazily scan cached play-by-play with Polars (projection and predicate pushdown)"""
+    path = ensure_cached('pbp', season, offline=offline, refresh=refresh)
+    return pl.scan_parquet(path)
+
+def load_rosters(season, columns=None, offline=None, refresh=False):
+    """Load roster data for a season from the local cache"""
+    return read_cached('rosters', season, columns=columns, offline=offline, refresh=refresh)
+
+def load_schedules(season, columns=None, offline=None, refresh=False):
+    """Load the game schedule for a season from the local cache"""
+    return read_cached('schedules', season, columns=columns, offline=offline, refresh=refresh)
@@ -2,63 +2,401 @@
 Fetch NFL data and export as JSON for the Next.js app
 """
 
-import nflreadpy as nfl
+import argparse
+import gzip
+import hashlib
+import os
+import sys
+import numpy as np
 import pandas as pd
 import json
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from pathlib import Path
-
-def fetch_season_data(season=2025):
+from statistics import NormalDist
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+try:
+    import brotli
+except ImportError:  # Optional - .br siblings are skipped without it
+    brotli = None
+
+import data_cache
+
+SEASONS = [2025, 2024, 2023, 2022, 2021, 2020]
+
+# Players per position and season kept in the cross-season index
+INDEX_TOP_N = 25
+
+# Precompressed siblings written next to an export with compress=True
+COMPRESSED_SUFFIXES = ['.gz', '.br']
+
+# Confidence level and column names of the EPA/play intervals in the export. They are
+# normal approximations from the summed squares (the dashboard bootstraps plays instead),
+# so they can be rebuilt from the partial aggregates alone
+INTERVAL_CONFIDENCE = 0.95
+NORMAL_INTERVAL_COLUMNS = ['epaPerPlayNormalLow', 'epaPerPlayNormalHigh']
+
+# Play-by-play columns read by the stat calculations below
+EXPORT_COLUMNS = [
+    'game_id', 'week', 'play_type', 'posteam', 'defteam', 'epa', 'penalty', 'season_type',
+    'pass', 'rush', 'touchdown',
+    'passer_player_name', 'passer_player_id',
+    'rusher_player_name', 'rusher_player_id',
+    'receiver_player_name', 'receiver_player_id',
+    'passing_yards', 'rushing_yards', 'receiving_yards',
+    'pass_touchdown', 'rush_touchdown', 'interception',
+    'complete_pass', 'pass_attempt',
+]
+
+# Partial aggregate tables kept between refreshes
+TEAM_AGGREGATE_KEYS = ['posteam', 'defteam', 'play_type']
+TEAM_AGGREGATE_COLUMNS = [*TEAM_AGGREGATE_KEYS, 'plays', 'epaSum', 'epaSumSq']
+PLAYER_AGGREGATE_STATS = ['yards', 'touchdowns', 'interceptions', 'completions', 'attempts']
+PLAYER_AGGREGATE_SUMS = ['plays', 'epaSum', 'epaSumSq', *PLAYER_AGGREGATE_STATS]
+PLAYER_AGGREGATE_COLUMNS = ['role', 'player_id', 'player_name', *PLAYER_AGGREGATE_SUMS]
+
+# Player roles: which play-by-play player column they use and which stats they sum
+ROLE_PLAYER_PREFIX = {'pass': 'passer', 'rush': 'rusher', 'recv': 'receiver'}
+PLAYER_ROLE_STATS = {
+    'pass': {'yards': 'passing_yards', 'touchdowns': 'pass_touchdown', 'interceptions': 'interception',
+             'completions': 'complete_pass', 'attempts': 'pass_attempt'},
+    'rush': {'yards': 'rushing_yards', 'touchdowns': 'rush_touchdown'},
+    'recv': {'yards': 'receiving_yards', 'touchdowns': 'pass_touchdown', 'completions': 'complete_pass'},
+}
+
+def fetch_season_data(season=2025, offline=None, refresh=False, min_week=None, lean=False):
     """Fetch play-by-play data for a season"""
     print(f"Fetching {season} season data...")
-    pbp = nfl.load_pbp(season)
-
-    # Convert Polars to Pandas if needed
-    if hasattr(pbp, 'to_pandas'):
-        pbp = pbp.to_pandas()
+    filters = [('week', '>=', min_week)] if min_week is not None else None
+    pbp = data_cache.load_pbp(season, columns=EXPORT_COLUMNS, filters=filters,
+                              offline=offline, refresh=refresh)
+    if lean:
+        # EPA stays float64 so the exported sums match a regular run
+        pbp = data_cache.downcast_pbp(pbp, float32=False)
 
     return pbp
 
-def calculate_team_stats(pbp):
-    """Calculate team offensive EPA stats"""
-    # Filter for offensive plays only
-    offensive_plays = pbp[
+def roster_positions(rosters):
+    """Map gsis_id to roster position"""
+    return dict(zip(rosters['gsis_id'], rosters['position']))
+
+def load_position_lookup(season, offline=None):
+    """Map gsis_id to roster position for a season"""
+    return roster_positions(data_cache.load_rosters(season, columns=['gsis_id', 'position'], offline=offline))
+
+def offensive_play_mask(pbp):
+    """Pass and run plays with a valid EPA and no penalty"""
+    return (
         (pbp['play_type'].isin(['pass', 'run'])) &
-        (pbp['posteam'].notna()) &
         (pbp['epa'].notna()) &
         ((pbp['penalty'] == 0) | (pbp['penalty'].isna()))
-    ].copy()
+    )
+
+def filter_offensive_plays(pbp):
+    """Keep pass and run plays with a valid EPA and no penalty"""
+    return pbp[offensive_play_mask(pbp)]
+
+def aggregate_team_plays(pbp):
+    """Sum EPA per offense, defense and play type into a mergeable table
+
+    Keyed by both teams so offensive and defensive stats fold out of the
+    same pass over the plays.
+    """
+    offensive_plays = filter_offensive_plays(pbp)
+    offensive_plays = offensive_plays[offensive_plays['posteam'].notna()]
 
     # Filter to regular season only
     if 'season_type' in offensive_plays.columns:
         offensive_plays = offensive_plays[offensive_plays['season_type'] == 'REG']
 
+    # Sum in float64 even if the plays were loaded as float32
+    epa = offensive_plays['epa'].astype('float64')
+    frame = pd.DataFrame({
+        'posteam': offensive_plays['posteam'],
+        'defteam': offensive_plays['defteam'],
+        'play_type': offensive_plays['play_type'],
+        'epa': epa,
+        'epaSq': epa * epa,
+    })
+    # Keep plays without a recorded defense so offensive totals are unchanged
+    return frame.groupby(TEAM_AGGREGATE_KEYS, observed=True, dropna=False).agg(
+        plays=('epa', 'count'),
+        epaSum=('epa', 'sum'),
+        epaSumSq=('epaSq', 'sum'),
+    ).reset_index()
+
+def build_player_plays(pbp, keys=()):
+    """Reshape offensive plays into a long player-play table
+
+    One row per (play, role) with the player's gsis_id, the role
+    ('pass', 'rush' or 'recv') and the play attributes that role sums.
+    keys are extra numeric play columns (e.g. week) carried along.
+    """
+    offensive = offensive_play_mask(pbp)
+
+    role_masks = {
+        'pass': offensive & pbp['passer_player_id'].notna() & pbp['passer_player_name'].notna(),
+        'rush': (offensive & pbp['rusher_player_id'].notna() & pbp['rusher_player_name'].notna() &
+                 (pbp['play_type'] == 'run')),
+        'recv': (offensive & pbp['receiver_player_id'].notna() & pbp['receiver_player_name'].notna() &
+                 (pbp['pass_attempt'] == 1)),
+    }
+    rows = {role: np.flatnonzero(mask.to_numpy()) for role, mask in role_masks.items()}
+
+    def stack_players(field):
+        # Player id/name columns stay in their native string dtype
+        return pd.concat([pbp[f'{ROLE_PLAYER_PREFIX[role]}_player_{field}'].take(idx)
+                          for role, idx in rows.items()], ignore_index=True)
+
+    def stack_values(column_for_role):
+        # Numeric play attributes, zero-filled for stats a role doesn't track
+        parts = []
+        for role, idx in rows.items():
+            column = column_for_role(role)
+            if column is None:
+                parts.append(np.zeros(len(idx)))
+            else:
+                parts.append(pbp[column].to_numpy(dtype='float64', na_value=np.nan)[idx])
+        return np.concatenate(parts)
+
+    epa = stack_values(lambda role: 'epa')
+    player_plays = pd.DataFrame({
+        'role': pd.Categorical.from_codes(
+            np.repeat(np.arange(len(rows)), [len(idx) for idx in rows.values()]),
+            categories=list(rows)),
+        'player_id': stack_players('id'),
+        'player_name': stack_players('name'),
+        'epa': epa,
+        'epaSq': epa * epa,
+    })
+    for stat in PLAYER_AGGREGATE_STATS:
+        player_plays[stat] = stack_values(lambda role: PLAYER_ROLE_STATS[role].get(stat))
+    for key in keys:
+        player_plays[key] = stack_values(lambda role: key)
+
+    return player_plays
+
+def aggregate_player_plays(pbp):
+    """Sum EPA and box-score stats per player and role into a mergeable table"""
+    player_plays = build_player_plays(pbp)
+
+    # One grouped aggregation covers every role and position
+    players = player_plays.groupby(['role', 'player_id'], observed=True, sort=False).agg(
+        player_name=('player_name', 'last'),
+        plays=('epa', 'count'),
+        epaSum=('epa', 'sum'),
+        epaSumSq=('epaSq', 'sum'),
+        **{stat: (stat, 'sum') for stat in PLAYER_AGGREGATE_STATS},
+    ).reset_index()
+    players['role'] = players['role'].astype(str)
+
+    return players[PLAYER_AGGREGATE_COLUMNS]
+
+def calculate_aggregates(pbp):
+    """Calculate mergeable partial aggregates for a batch of plays"""
+    return {
+        'week': int(pbp['week'].max()) if len(pbp) > 0 else 0,
+        'games': sorted(pbp['game_id'].dropna().unique().tolist()),
+        'league': calculate_league_stats(pbp),
+        'teams': aggregate_team_plays(pbp),
+        'players': aggregate_player_plays(pbp),
+    }
+
+def calculate_split_aggregates(pbp):
+    """Partial aggregates of the latest week in pbp ('open') and the weeks before it ('settled')
+
+    The latest week may still have games in progress or stat corrections
+    to come, so it is kept apart and recalculated on the next refresh.
+    'settled' is None when pbp holds a single week; returns None if pbp is empty.
+    """
+    if len(pbp) == 0:
+        return None
+
+    latest = (pbp['week'] == pbp['week'].max()).to_numpy()
+    return {
+        'settled': calculate_aggregates(pbp[~latest]) if not latest.all() else None,
+        'open': calculate_aggregates(pbp[latest]),
+    }
+
+def merge_aggregates(previous, new):
+    """Combine the aggregates of two disjoint sets of games"""
+    return {
+        'week': max(previous['week'], new['week']),
+        'games': sorted(set(previous['games']) | set(new['games'])),
+        'league': {key: previous['league'][key] + new['league'][key] for key in previous['league']},
+        'teams': pd.concat([previous['teams'], new['teams']]).groupby(
+            TEAM_AGGREGATE_KEYS, as_index=False, dropna=False).sum(),
+        'players': pd.concat([previous['players'], new['players']]).groupby(
+            ['role', 'player_id'], as_index=False, sort=False).agg(
+            player_name=('player_name', 'last'),
+            **{column: (column, 'sum') for column in PLAYER_AGGREGATE_SUMS},
+        )[PLAYER_AGGREGATE_COLUMNS],
+    }
+
+def aggregates_match(a, b):
+    """Whether two partial aggregates cover the same games with the same sums (up to float rounding)"""
+    if a['games'] != b['games'] or a['league'] != b['league']:
+        return False
+
+    for table, keys in (('teams', TEAM_AGGREGATE_KEYS), ('players', ['role', 'player_id'])):
+        left, right = (aggregates[table].sort_values(keys, ignore_index=True) for aggregates in (a, b))
+        if len(left) != len(right):
+            return False
+        labels = [column for column in left.columns if not pd.api.types.is_numeric_dtype(left[column])]
+        sums = [column for column in left.columns if column not in labels]
+        if not left[labels].fillna('').astype(str).equals(right[labels].fillna('').astype(str)):
+            return False
+        if not np.allclose(left[sums].to_numpy(dtype='float64'), right[sums].to_numpy(dtype='float64'),
+                           rtol=1e-9, equal_nan=True):
+            return False
+    return True
+
+def season_totals(aggregates):
+    """Whole-season aggregates from the settled and open parts"""
+    if aggregates['settled'] is None:
+        return aggregates['open']
+    return merge_aggregates(aggregates['settled'], aggregates['open'])
+
+def aggregates_path(season):
+    """Location of the stored partial aggregates for a season"""
+    return data_cache.CACHE_DIR / 'aggregates' / f'nfl_{season}.json'
+
+def aggregates_record(aggregates):
+    """Partial aggregates as plain JSON-serializable values"""
+    if aggregates is None:
+        return None
+    return {
+        'week': aggregates['week'],
+        'games': aggregates['games'],
+        'league': aggregates['league'],
+        'teams': aggregates['teams'].to_dict('records'),
+        'players': aggregates['players'].to_dict('records'),
+    }
+
+def aggregates_from_record(record):
+    """Inverse of aggregates_record"""
+    if record is None:
+        return None
+    return {
+        'week': record['week'],
+        'games': record['games'],
+        'league': record['league'],
+        'teams': pd.DataFrame(record['teams'], columns=TEAM_AGGREGATE_COLUMNS),
+        'players': pd.DataFrame(record['players'], columns=PLAYER_AGGREGATE_COLUMNS),
+    }
+
+def save_aggregates(aggregates, season):
+    """Store a season's settled and open partial aggregates next to the cached play-by-play"""
+    path = aggregates_path(season)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    write_json_atomic({
+        'season': season,
+        'settled': aggregates_record(aggregates['settled']),
+        'open': aggregates_record(aggregates['open']),
+        'lastUpdated': pd.Timestamp.now().isoformat(),
+    }, path)
+
+def load_aggregates(season):
+    """Load stored partial aggregates, or None if there are none yet"""
+    path = aggregates_path(season)
+    if not path.exists():
+        return None
+
+    with open(path) as f:
+        stored = json.load(f)
+
+    # Aggregates from before the open week was kept apart, or before the
+    # defensive split, can't be folded into; rebuild them
+    if 'open' not in stored:
+        return None
+    parts = [stored['settled'], stored['open']]
+    if any('defteam' not in row for part in parts if part is not None for row in part['teams']):
+        return None
+
+    return {
+        'settled': aggregates_from_record(stored['settled']),
+        'open': aggregates_from_record(stored['open']),
+    }
+
+def summarize_epa(rows, key, name, columns, interval=None):
+    """Turn EPA sums and counts into per-play, total and count columns
+
+    interval names two extra columns for the low and high end of a normal
+    confidence interval on EPA/play, from the summed squares.
+    """
+    grouped = rows.groupby(key, observed=True)[['epaSum', 'epaSumSq', 'plays']].sum()
+    per_play = grouped['epaSum'] / grouped['plays']
+    summary = pd.DataFrame({
+        name: grouped.index,
+        columns[0]: per_play.values,
+        columns[1]: grouped['epaSum'].values,
+        columns[2]: grouped['plays'].values,
+    })
+
+    if interval is not None:
+        # Same sums the aggregates keep, so full and incremental exports agree
+        variance = (grouped['epaSumSq'] / grouped['plays'] - per_play ** 2).clip(lower=0)
+        margin = NormalDist().inv_cdf((1 + INTERVAL_CONFIDENCE) / 2) * np.sqrt(variance / grouped['plays'])
+        summary[interval[0]] = (per_play - margin).values
+        summary[interval[1]] = (per_play + margin).values
+    return summary
+
+def team_stats_from_aggregates(team_aggregates):
+    """Build the team stat records from offense x defense partial aggregates"""
     # Calculate overall team stats
-    team_stats = offensive_plays.groupby('posteam')['epa'].agg(['mean', 'sum', 'count']).reset_index()
-    team_stats.columns = ['team', 'epaPerPlay', 'totalEPA', 'plays']
+    team_stats = summarize_epa(team_aggregates, 'posteam', 'team', ['epaPerPlay', 'totalEPA', 'plays'],
+                               interval=NORMAL_INTERVAL_COLUMNS)
 
     # Calculate passing stats
-    pass_plays = offensive_plays[offensive_plays['play_type'] == 'pass']
-    pass_stats = pass_plays.groupby('posteam')['epa'].agg(['mean', 'sum', 'count']).reset_index()
-    pass_stats.columns = ['team', 'passEpaPerPlay', 'passTotalEPA', 'passPlays']
+    pass_rows = team_aggregates[team_aggregates['play_type'] == 'pass']
+    pass_stats = summarize_epa(pass_rows, 'posteam', 'team', ['passEpaPerPlay', 'passTotalEPA', 'passPlays'])
 
     # Calculate rushing stats
-    rush_plays = offensive_plays[offensive_plays['play_type'] == 'run']
-    rush_stats = rush_plays.groupby('posteam')['epa'].agg(['mean', 'sum', 'count']).reset_index()
-    rush_stats.columns = ['team', 'rushEpaPerPlay', 'rushTotalEPA', 'rushPlays']
+    rush_rows = team_aggregates[team_aggregates['play_type'] == 'run']
+    rush_stats = summarize_epa(rush_rows, 'posteam', 'team', ['rushEpaPerPlay', 'rushTotalEPA', 'rushPlays'])
+
+    # Defensive stats are the same rows summed by the team on defense
+    def_stats = summarize_epa(team_aggregates, 'defteam', 'team', ['defEpaPerPlay', 'defTotalEPA', 'defPlays'])
+    def_pass_stats = summarize_epa(pass_rows, 'defteam', 'team',
+                                   ['defPassEpaPerPlay', 'defPassTotalEPA', 'defPassPlays'])
+    def_rush_stats = summarize_epa(rush_rows, 'defteam', 'team',
+                                   ['defRushEpaPerPlay', 'defRushTotalEPA', 'defRushPlays'])
 
     # Merge all stats
-    team_stats = team_stats.merge(pass_stats, on='team', how='left')
-    team_stats = team_stats.merge(rush_stats, on='team', how='left')
+    for stats in [pass_stats, rush_stats, def_stats, def_pass_stats, def_rush_stats]:
+        team_stats = team_stats.merge(stats, on='team', how='left')
 
     # Fill NaN with 0
     team_stats = team_stats.fillna(0)
 
+    # Net EPA/play: offense gained minus defense allowed
+    team_stats['netEpaPerPlay'] = team_stats['epaPerPlay'] - team_stats['defEpaPerPlay']
+
     team_stats = team_stats.sort_values('epaPerPlay', ascending=False)
 
     return team_stats.to_dict('records')
 
-def calculate_player_stats(pbp, season):
-    """Calculate player statistics for QB, RB, WR, TE"""
+def player_leaderboard(rows, stat_rows, stat_columns, count_column, min_plays):
+    """Rank players by EPA/play from their partial aggregates, keyed by gsis_id"""
+    summary = summarize_epa(rows, 'player_id', 'playerId', ['epaPerPlay', 'totalEPA', count_column],
+                            interval=NORMAL_INTERVAL_COLUMNS)
+    names = rows.groupby('player_id')['player_name'].first()
+    summary.insert(0, 'player', summary['playerId'].map(names))
+
+    totals = stat_rows.groupby('player_id')[list(stat_columns)].sum().rename(columns=stat_columns)
+    leaderboard = summary.merge(totals.reset_index(names='playerId'), on='playerId', how='left')
+
+    leaderboard = leaderboard.fillna(0)
+    leaderboard = leaderboard[leaderboard[count_column] >= min_plays]
+    leaderboard = leaderboard.sort_values('epaPerPlay', ascending=False)
+    return leaderboard.head(50).to_dict('records')
+
+def player_stats_from_aggregates(player_aggregates, position_lookup):
+    """Build the QB, RB, WR and TE leaderboards from per-player partial aggregates"""
     player_stats = {
         'qb': [],
         'rb': [],
@@ -66,134 +404,48 @@ def calculate_player_stats(pbp, season):
         'te': []
     }
 
-    # Load roster data to get position information
-    rosters = nfl.load_rosters(season)
-    if hasattr(rosters, 'to_pandas'):
-        rosters = rosters.to_pandas()
+    position = player_aggregates['player_id'].map(position_lookup)
+    role = player_aggregates['role']
 
-    # Create position lookup dictionary
-    position_lookup = dict(zip(rosters['gsis_id'], rosters['position']))
-
-    # Filter for offensive plays
-    offensive_plays = pbp[
-        (pbp['play_type'].isin(['pass', 'run'])) &
-        (pbp['epa'].notna()) &
-        ((pbp['penalty'] == 0) | (pbp['penalty'].isna()))
-    ].copy()
-
-    # QB stats (passing + rushing plays for QBs)
-    # Get passing plays for QBs
-    qb_pass_plays = offensive_plays[offensive_plays['passer_player_name'].notna()].copy()
-    qb_pass_plays['position'] = qb_pass_plays['passer_player_id'].map(position_lookup)
-    qb_pass_plays = qb_pass_plays[qb_pass_plays['position'] == 'QB'].copy()
-    qb_pass_plays['player_name'] = qb_pass_plays['passer_player_name']
-    qb_pass_plays['player_id'] = qb_pass_plays['passer_player_id']
-
-    # Get rushing plays for QBs
-    qb_rush_plays = offensive_plays[
-        (offensive_plays['rusher_player_name'].notna()) &
-        (offensive_plays['play_type'] == 'run')
-    ].copy()
-    qb_rush_plays['position'] = qb_rush_plays['rusher_player_id'].map(position_lookup)
-    qb_rush_plays = qb_rush_plays[qb_rush_plays['position'] == 'QB'].copy()
-    qb_rush_plays['player_name'] = qb_rush_plays['rusher_player_name']
-    qb_rush_plays['player_id'] = qb_rush_plays['rusher_player_id']
-
-    # Combine passing and rushing plays for QBs
-    qb_all_plays = pd.concat([qb_pass_plays, qb_rush_plays])
-
-    if len(qb_all_plays) > 0:
-        # Calculate overall EPA (all plays)
-        qb_overall = qb_all_plays.groupby('player_name').agg({
-            'epa': ['mean', 'sum', 'count']
-        }).reset_index()
-        qb_overall.columns = ['player', 'epaPerPlay', 'totalEPA', 'plays']
-
-        # Calculate passing stats
-        if len(qb_pass_plays) > 0:
-            qb_passing = qb_pass_plays.groupby('player_name').agg({
-                'passing_yards': 'sum',
-                'pass_touchdown': 'sum',
-                'interception': 'sum',
-                'complete_pass': 'sum',
-                'pass_attempt': 'sum'
-            }).reset_index()
-            qb_passing.columns = ['player', 'passingYards', 'touchdowns', 'interceptions', 'completions', 'attempts']
-            qb_grouped = qb_overall.merge(qb_passing, on='player', how='left')
-        else:
-            qb_grouped = qb_overall
-            qb_grouped['passingYards'] = 0
-            qb_grouped['touchdowns'] = 0
-            qb_grouped['interceptions'] = 0
-            qb_grouped['completions'] = 0
-            qb_grouped['attempts'] = 0
-
-        qb_grouped = qb_grouped.fillna(0)
-        qb_grouped = qb_grouped[qb_grouped['plays'] >= 100]  # Min 100 plays
-        qb_grouped = qb_grouped.sort_values('epaPerPlay', ascending=False)
-        player_stats['qb'] = qb_grouped.head(50).to_dict('records')
+    # QB stats (passing + rushing plays, passing totals from passing plays only)
+    qb_rows = player_aggregates[(position == 'QB') & role.isin(['pass', 'rush'])]
+    if len(qb_rows) > 0:
+        passing = {'yards': 'passingYards', 'touchdowns': 'touchdowns', 'interceptions': 'interceptions',
+                   'completions': 'completions', 'attempts': 'attempts'}
+        qb_pass_rows = qb_rows[qb_rows['role'] == 'pass']
+        player_stats['qb'] = player_leaderboard(qb_rows, qb_pass_rows, passing, 'plays', 100)  # Min 100 plays
 
     # RB stats (rusher with position = RB)
-    rb_plays = offensive_plays[
-        (offensive_plays['rusher_player_name'].notna()) &
-        (offensive_plays['play_type'] == 'run')
-    ].copy()
-    rb_plays['position'] = rb_plays['rusher_player_id'].map(position_lookup)
-    rb_plays = rb_plays[rb_plays['position'] == 'RB']
-
-    if len(rb_plays) > 0:
-        rb_grouped = rb_plays.groupby('rusher_player_name').agg({
-            'epa': ['mean', 'sum', 'count'],
-            'rushing_yards': 'sum',
-            'rush_touchdown': 'sum'
-        }).reset_index()
-        rb_grouped.columns = ['player', 'epaPerPlay', 'totalEPA', 'plays', 'rushingYards', 'touchdowns']
-        rb_grouped = rb_grouped[rb_grouped['plays'] >= 50]  # Min 50 plays
-        rb_grouped = rb_grouped.sort_values('epaPerPlay', ascending=False)
-        player_stats['rb'] = rb_grouped.head(50).to_dict('records')
-
-    # WR stats (receiver with position = WR)
-    wr_plays = offensive_plays[
-        (offensive_plays['receiver_player_name'].notna()) &
-        (offensive_plays['pass_attempt'] == 1)
-    ].copy()
-    wr_plays['position'] = wr_plays['receiver_player_id'].map(position_lookup)
-    wr_plays = wr_plays[wr_plays['position'] == 'WR']
-
-    if len(wr_plays) > 0:
-        wr_grouped = wr_plays.groupby('receiver_player_name').agg({
-            'epa': ['mean', 'sum', 'count'],
-            'receiving_yards': 'sum',
-            'pass_touchdown': 'sum',
-            'complete_pass': 'sum'
-        }).reset_index()
-        wr_grouped.columns = ['player', 'epaPerPlay', 'totalEPA', 'targets', 'receivingYards', 'touchdowns', 'receptions']
-        wr_grouped = wr_grouped[wr_grouped['targets'] >= 30]  # Min 30 targets
-        wr_grouped = wr_grouped.sort_values('epaPerPlay', ascending=False)
-        player_stats['wr'] = wr_grouped.head(50).to_dict('records')
-
-    # TE stats (receiver with position = TE)
-    te_plays = offensive_plays[
-        (offensive_plays['receiver_player_name'].notna()) &
-        (offensive_plays['pass_attempt'] == 1)
-    ].copy()
-    te_plays['position'] = te_plays['receiver_player_id'].map(position_lookup)
-    te_plays = te_plays[te_plays['position'] == 'TE']
-
-    if len(te_plays) > 0:
-        te_grouped = te_plays.groupby('receiver_player_name').agg({
-            'epa': ['mean', 'sum', 'count'],
-            'receiving_yards': 'sum',
-            'pass_touchdown': 'sum',
-            'complete_pass': 'sum'
-        }).reset_index()
-        te_grouped.columns = ['player', 'epaPerPlay', 'totalEPA', 'targets', 'receivingYards', 'touchdowns', 'receptions']
-        te_grouped = te_grouped[te_grouped['targets'] >= 30]  # Min 30 targets
-        te_grouped = te_grouped.sort_values('epaPerPlay', ascending=False)
-        player_stats['te'] = te_grouped.head(50).to_dict('records')
+    rb_rows = player_aggregates[(position == 'RB') & (role == 'rush')]
+    if len(rb_rows) > 0:
+        rushing = {'yards': 'rushingYards', 'touchdowns': 'touchdowns'}
+        player_stats['rb'] = player_leaderboard(rb_rows, rb_rows, rushing, 'plays', 50)  # Min 50 plays
+
+    # WR and TE stats (receiver with position = WR / TE)
+    receiving = {'yards': 'receivingYards', 'touchdowns': 'touchdowns', 'completions': 'receptions'}
+    for pos in ['WR', 'TE']:
+        rows = player_aggregates[(position == pos) & (role == 'recv')]
+        if len(rows) > 0:
+            player_stats[pos.lower()] = player_leaderboard(rows, rows, receiving, 'targets', 30)  # Min 30 targets
 
     return player_stats
 
+def calculate_team_stats(pbp):
+    """Calculate team offensive and defensive EPA stats"""
+    return team_stats_from_aggregates(aggregate_team_plays(pbp))
+
+def calculate_player_stats(pbp, season, offline=None, rosters=None):
+    """Calculate player statistics for QB, RB, WR, TE
+
+    Pass already loaded rosters (gsis_id and position) to skip loading them.
+    """
+    # Load roster data to get position information
+    if rosters is not None:
+        position_lookup = roster_positions(rosters)
+    else:
+        position_lookup = load_position_lookup(season, offline=offline)
+    return player_stats_from_aggregates(aggregate_player_plays(pbp), position_lookup)
+
 def calculate_league_stats(pbp):
     """Calculate overall league statistics"""
     stats = {
@@ -204,42 +456,451 @@ def calculate_league_stats(pbp):
     }
     return stats
 
+def write_bytes_atomic(payload, output_file):
+    """Write bytes to a temporary file and rename it into place"""
+    tmp_file = output_file.with_name(f'.{output_file.name}.tmp')
+    with open(tmp_file, 'wb') as f:
+        f.write(payload)
+    os.replace(tmp_file, output_file)
+
+def write_json_atomic(data, output_file):
+    """Write JSON to a temporary file and rename it into place"""
+    write_bytes_atomic(json.dumps(data, indent=2).encode(), output_file)
+
+def round_floats(value, precision):
+    """Round every float in a nested export structure"""
+    if isinstance(value, float):
+        return round(value, precision)
+    if isinstance(value, dict):
+        return {key: round_floats(item, precision) for key, item in value.items()}
+    if isinstance(value, list):
+        return [round_floats(item, precision) for item in value]
+    return value
+
+def to_columnar(records):
+    """Turn a list of row objects into one array per field"""
+    columns = list(records[0]) if records else []
+    return {column: [record[column] for record in records] for column in columns}
+
+def encode_json(data, export_format='rows'):
+    """Indented JSON for the row layout, compact JSON for the columnar one"""
+    if export_format == 'rows':
+        return json.dumps(data, indent=2).encode()
+    return json.dumps(data, separators=(',', ':')).encode()
+
+def encode_table(records, export_format='rows'):
+    """A list of row objects in the requested layout"""
+    return records if export_format == 'rows' else to_columnar(records)
+
+def encode_export(data, export_format='rows', precision=None):
+    """Serialize a season export
+
+    'rows' is the original indented layout with one object per team/player;
+    'columnar' stores each table as arrays per field in compact JSON.
+    """
+    if precision is not None:
+        data = round_floats(data, precision)
+
+    if export_format == 'columnar':
+        data = {
+            **data,
+            'format': 'columnar',
+            'teamStats': to_columnar(data['teamStats']),
+            'playerStats': {position: to_columnar(players)
+                            for position, players in data['playerStats'].items()},
+        }
+    return encode_json(data, export_format)
+
+def write_payload(payload, output_file, compress=False):
+    """Write bytes plus optional precompressed .gz/.br siblings, returning their sizes
+
+    Siblings that aren't written this time are removed, so a server never
+    serves a precompressed copy of an older export.
+    """
+    write_bytes_atomic(payload, output_file)
+
+    sizes = {'': len(payload)}
+    compressed = {}
+    if compress:
+        # mtime=0 keeps the gzip bytes identical when the data hasn't changed
+        compressed['.gz'] = gzip.compress(payload, compresslevel=9, mtime=0)
+        if brotli is not None:
+            compressed['.br'] = brotli.compress(payload, quality=11)
+
+    for suffix in COMPRESSED_SUFFIXES:
+        sibling = output_file.with_name(output_file.name + suffix)
+        if suffix in compressed:
+            write_bytes_atomic(compressed[suffix], sibling)
+            sizes[suffix] = len(compressed[suffix])
+        else:
+            sibling.unlink(missing_ok=True)
+
+    return sizes
+
+def format_sizes(sizes):
+    """Human-readable byte counts from write_payload"""
+    return ', '.join(f"{suffix} {size:,} bytes".strip() for suffix, size in sizes.items())
+
+def write_export(data, output_file, export_format='rows', precision=None, compress=False):
+    """Write a season export, optionally with precompressed .gz/.br siblings"""
+    if compress and brotli is None:
+        print("   brotli is not installed - skipping .br")
+
+    sizes = write_payload(encode_export(data, export_format, precision), output_file, compress)
+    print(f"   Size: {format_sizes(sizes)}")
+
+def shard_payloads(data, export_format='rows', precision=None):
+    """Split a season export into the pieces each page needs: name -> bytes"""
+    if precision is not None:
+        data = round_floats(data, precision)
+
+    shards = {
+        'league': data['leagueStats'],
+        'teams': encode_table(data['teamStats'], export_format),
+    }
+    for position, players in data['playerStats'].items():
+        shards[f'players_{position}'] = encode_table(players, export_format)
+
+    return {name: encode_json(shard, export_format) for name, shard in shards.items()}
+
+def manifest_path(output_dir, season):
+    """Path of a season's shard manifest"""
+    return output_dir / f'nfl_{season}.manifest.json'
+
+def write_shards(data, output_dir, export_format='rows', precision=None, compress=False):
+    """Write content-hashed shards for one season and a manifest pointing at them
+
+    Shard names include a hash of their bytes, so a shard that didn't change
+    keeps its URL (and its immutable cache entry) across rebuilds. Only the
+    small manifest has to be revalidated by clients.
+    """
+    season = data['season']
+    shard_dir = output_dir / 'shards'
+    shard_dir.mkdir(parents=True, exist_ok=True)
+
+    manifest_file = manifest_path(output_dir, season)
+    previous_files = set()
+    if manifest_file.exists():
+        with open(manifest_file) as f:
+            previous_files = {shard['file'] for shard in json.load(f)['shards'].values()}
+
+    shards = {}
+    written = 0
+    for name, payload in shard_payloads(data, export_format, precision).items():
+        digest = hashlib.sha256(payload).hexdigest()
+        shard_file = shard_dir / f'{season}_{name}.{digest[:12]}.json'
+        if not shard_file.exists():
+            write_payload(payload, shard_file, compress)
+            written += 1
+        shards[name] = {
+            'file': f'shards/{shard_file.name}',
+            'sha256': digest,
+            'bytes': len(payload),
+        }
+
+    write_json_atomic({
+        'season': season,
+        'format': export_format,
+        'lastUpdated': data['lastUpdated'],
+        'shards': shards,
+    }, manifest_file)
+
+    # Keep the previous generation for clients still holding the old manifest
+    keep = {shard['file'] for shard in shards.values()} | previous_files
+    for old_file in shard_dir.glob(f'{season}_*.json*'):
+        if f'shards/{old_file.name.split(".json")[0]}.json' not in keep:
+            old_file.unlink()
+
+    print(f"   Shards: {written} of {len(shards)} changed")
+
+def limit_worker_memory(max_memory_mb):
+    """Cap the data segment of a worker process so one season can't take down the box"""
+    if max_memory_mb and resource is not None:
+        limit = int(max_memory_mb) * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_DATA, (limit, limit))
+
+def calculate_season_aggregates(season, offline=None, refresh=False, lean=False, backend='pandas',
+                                min_week=None):
+    """Load a season (or its weeks from min_week on) and calculate settled and open partial aggregates"""
+    if backend == 'polars':
+        # Imported here because polars_engine builds on this module
+        import polars_engine
+        print(f"Scanning {season} season data...")
+        lf = polars_engine.scan_season(season, offline=offline, refresh=refresh, min_week=min_week)
+        return polars_engine.calculate_split_aggregates(lf)
+
+    pbp = fetch_season_data(season, offline=offline, refresh=refresh, min_week=min_week, lean=lean)
+    return calculate_split_aggregates(pbp)
+
+def load_season_aggregates(season, previous, load_options):
+    """Partial aggregates for a season: a full rebuild, or previous with its open week recalculated
+
+    The open week is read again along with any later weeks and replaces
+    its stored partials, so games that were still in progress and stat
+    corrections published since the last refresh are picked up. Returns
+    None if nothing changed.
+    """
+    if previous is None:
+        # Full rebuild from the whole season
+        return calculate_season_aggregates(season, **load_options)
+
+    # Only read weeks from the open one on; its old partials are dropped, not subtracted
+    open_week = previous['open']['week']
+    new = calculate_season_aggregates(season, min_week=open_week, **load_options)
+
+    unchanged = new is None or (new['settled'] is None and aggregates_match(new['open'], previous['open']))
+    if unchanged:
+        print(f"✅ {season} is up to date through week {open_week}")
+        return None
+
+    settled = new['settled']
+    if previous['settled'] is not None:
+        settled = previous['settled'] if settled is None else merge_aggregates(previous['settled'], settled)
+
+    print(f"Recalculated weeks {open_week}-{new['open']['week']} "
+          f"({season_totals(new)['league']['totalPlays']:,} plays)")
+    return {'settled': settled, 'open': new['open']}
+
+def season_index_entry(data, top_n=INDEX_TOP_N, precision=None):
+    """The slice of one season export kept in the cross-season index"""
+    entry = {
+        'teams': {
+            row['team']: {'rank': rank, 'epaPerPlay': row['epaPerPlay'],
+                          'totalEPA': row['totalEPA'], 'plays': row['plays']}
+            for rank, row in enumerate(data['teamStats'], start=1)
+        },
+        'leaders': {
+            position: [{'playerId': row['playerId'], 'player': row['player'],
+                        'epaPerPlay': row['epaPerPlay'], 'totalEPA': row['totalEPA']}
+                       for row in players[:top_n]]
+            for position, players in data['playerStats'].items()
+        },
+    }
+    return round_floats(entry, precision) if precision is not None else entry
+
+def index_path(output_dir):
+    """Path of the cross-season index"""
+    return output_dir / 'nfl_index.json'
+
+def update_index(output_dir, entries, compress=False):
+    """Fold per-season index entries into nfl_index.json
+
+    The index is keyed by team and player ID so trend views need one request:
+    teams[team][season], players[playerId].seasons[season] and
+    leaders[season][position] (player IDs in rank order). Seasons whose
+    entry hash is unchanged are left alone, and the file is only rewritten
+    when at least one season changed.
+    """
+    output_file = index_path(output_dir)
+    if output_file.exists():
+        with open(output_file) as f:
+            index = json.load(f)
+    else:
+        index = {'seasons': [], 'hashes': {}, 'teams': {}, 'players': {}, 'leaders': {}}
+
+    changed = []
+    for season, entry in sorted(entries.items()):
+        key = str(season)
+        digest = hashlib.sha256(json.dumps(entry, sort_keys=True).encode()).hexdigest()
+        if index['hashes'].get(key) == digest:
+            continue
+        changed.append(season)
+
+        # Drop the season's old entries before adding the new ones
+        for seasons in index['teams'].values():
+            seasons.pop(key, None)
+        for player in index['players'].values():
+            player['seasons'].pop(key, None)
+        index['players'] = {player_id: player for player_id, player in index['players'].items()
+                            if player['seasons']}
+
+        for team, stats in entry['teams'].items():
+            index['teams'].setdefault(team, {})[key] = stats
+        index['leaders'][key] = {}
+        for position, leaders in entry['leaders'].items():
+            index['leaders'][key][position] = [row['playerId'] for row in leaders]
+            for rank, row in enumerate(leaders, start=1):
+                player = index['players'].setdefault(row['playerId'], {'player': row['player'], 'seasons': {}})
+                player['player'] = row['player']
+                player['seasons'][key] = {'position': position, 'rank': rank,
+                                          'epaPerPlay': row['epaPerPlay'], 'totalEPA': row['totalEPA']}
+        index['hashes'][key] = digest
+
+    if not changed:
+        print("✅ Season index is up to date")
+        return output_file
+
+    index['seasons'] = sorted({int(key) for key in index['hashes']})
+    sizes = write_payload(encode_json(index, 'columnar'), output_file, compress)
+    print(f"✅ Season index updated for {', '.join(str(s) for s in changed)} ({format_sizes(sizes)})")
+    return output_file
+
+def export_season(season, output_dir, offline=None, refresh=False, incremental=False, lean=False,
+                  backend='pandas', export_format='rows', precision=None, compress=False, shards=False):
+    """Load one season, calculate all stats and write its JSON export
+
+    With incremental=True only the stored open week and later weeks are
+    read and folded into the settled partial aggregates. export_format, precision and
+    compress control the file layout (see write_export); shards=True
+    also writes per-view shards and a manifest (see write_shards). A season
+    that already has a manifest keeps getting its shards refreshed, since
+    the pages read through the manifest whenever one exists.
+
+    Returns the season's cross-season index entry, or None if an
+    incremental run found nothing new.
+    """
+    print(f"\n--- Processing {season} season ---")
+    output_file = output_dir / f'nfl_{season}.json'
+
+    previous = load_aggregates(season) if incremental else None
+    load_options = {'offline': offline, 'refresh': refresh, 'lean': lean, 'backend': backend}
+
+    # Read the rosters on a worker thread while the play-by-play loads
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        positions = pool.submit(load_position_lookup, season, offline=offline)
+        aggregates = load_season_aggregates(season, previous, load_options)
+        position_lookup = positions.result()
+
+    if aggregates is None:
+        return None
+
+    # Calculate stats
+    totals = season_totals(aggregates)
+    team_stats = team_stats_from_aggregates(totals['teams'])
+    player_stats = player_stats_from_aggregates(totals['players'], position_lookup)
+    league_stats = totals['league']
+
+    # Prepare data structure
+    data = {
+        'season': season,
+        'leagueStats': league_stats,
+        'teamStats': team_stats,
+        'playerStats': player_stats,
+        'epaInterval': {'method': 'normal', 'confidence': INTERVAL_CONFIDENCE,
+                        'columns': NORMAL_INTERVAL_COLUMNS},
+        'lastUpdated': pd.Timestamp.now().isoformat()
+    }
+
+    # Write JSON file, then the aggregates it was built from
+    write_export(data, output_file, export_format, precision, compress)
+    if shards or manifest_path(output_dir, season).exists():
+        write_shards(data, output_dir, export_format, precision, compress)
+    save_aggregates(aggregates, season)
+
+    print(f"✅ Data exported to {output_file}")
+    print(f"   Teams: {len(team_stats)}")
+    print(f"   Total plays: {league_stats['totalPlays']:,}")
+    print(f"   Top team: {team_stats[0]['team']} (EPA/Play: {team_stats[0]['epaPerPlay']:.3f})")
+
+    return season_index_entry(data, precision=precision)
+
+def export_seasons_parallel(seasons, output_dir, workers, max_memory_mb=None, **options):
+    """Export each season in its own worker process (options go to export_season)
+
+    Returns the index entries of the exported seasons and the seasons that failed.
+    """
+    entries = {}
+    failed = []
+
+    with ProcessPoolExecutor(max_workers=workers,
+                             initializer=limit_worker_memory,
+                             initargs=(max_memory_mb,)) as executor:
+        futures = {
+            executor.submit(export_season, season, output_dir, **options): season
+            for season in seasons
+        }
+        for future in as_completed(futures):
+            season = futures[future]
+            try:
+                entries[season] = future.result()
+            except Exception as e:
+                print(f"❌ {season} season failed: {e!r}")
+                failed.append(season)
+
+    return entries, failed
+
+def prefetch_seasons(seasons, options, max_workers=None):
+    """Download every season's play-by-play and rosters up front, several at a time
+
+    Returns the export options with downloads switched off: everything the
+    exports read is cached by then. A season whose download failed is
+    exported from whatever copy is cached, or fails below if there is none;
+    it is not downloaded again one season at a time.
+    """
+    try:
+        data_cache.prefetch(['pbp', 'rosters'], seasons, offline=options['offline'],
+                            refresh=options['refresh'], max_workers=max_workers)
+    except Exception as e:
+        print(f"⚠️ Not every download succeeded (first error: {e!r}). Seasons that failed are "
+              f"exported from the local cache if they have a copy there, and fail otherwise")
+
+    return {**options, 'offline': True, 'refresh': False}
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Export NFL season data as JSON for the Next.js app')
+    parser.add_argument('--offline', action='store_true',
+                        help='Only read from the local cache, never download')
+    parser.add_argument('--refresh', action='store_true',
+                        help='Download fresh data even if a cached copy exists')
+    parser.add_argument('--seasons', type=int, nargs='+', default=SEASONS,
+                        help='Seasons to export (default: all)')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Only process games newer than the stored aggregates')
+    parser.add_argument('--lean', action='store_true',
+                        help='Downcast play-by-play dtypes (categoricals, int8 flags, float32 EPA) to save memory')
+    parser.add_argument('--backend', choices=['pandas', 'polars'], default='pandas',
+                        help='Engine for the stat aggregations (default: pandas)')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Number of seasons to export in parallel (default: 1, sequential)')
+    parser.add_argument('--max-memory-mb', type=int, default=None,
+                        help='Memory cap per worker process in MB (parallel mode only)')
+    parser.add_argument('--format', dest='export_format', choices=['rows', 'columnar'], default='rows',
+                        help='JSON layout: rows (one object per team/player) or columnar (arrays per field)')
+    parser.add_argument('--precision', type=int, default=None,
+                        help='Round floats to this many decimal places (default: full precision)')
+    parser.add_argument('--compress', action='store_true',
+                        help='Also write precompressed .gz (and .br, if brotli is installed) files')
+    parser.add_argument('--shards', action='store_true',
+                        help='Also write content-hashed league/team/player shards and a manifest per season')
+    parser.add_argument('--download-workers', type=int, default=data_cache.MAX_CONCURRENT_LOADS,
+                        help=f'Downloads to run at once (default: {data_cache.MAX_CONCURRENT_LOADS})')
+    return parser.parse_args()
+
 def main():
-    seasons = [2025, 2024, 2023, 2022, 2021, 2020]
+    args = parse_args()
+    seasons = args.seasons
+    options = {
+        'offline': args.offline or None,
+        'refresh': args.refresh,
+        'incremental': args.incremental,
+        'lean': args.lean,
+        'backend': args.backend,
+        'export_format': args.export_format,
+        'precision': args.precision,
+        'compress': args.compress,
+        'shards': args.shards,
+    }
 
     # Create output directory
     output_dir = Path(__file__).parent / 'web' / 'public' / 'data'
     output_dir.mkdir(parents=True, exist_ok=True)
 
-    for season in seasons:
-        print(f"\n--- Processing {season} season ---")
-
-        # Fetch data
-        pbp = fetch_season_data(season)
+    options = prefetch_seasons(seasons, options, max_workers=args.download_workers)
 
-        # Calculate stats
-        team_stats = calculate_team_stats(pbp)
-        player_stats = calculate_player_stats(pbp, season)
-        league_stats = calculate_league_stats(pbp)
-
-        # Prepare data structure
-        data = {
-            'season': season,
-            'leagueStats': league_stats,
-            'teamStats': team_stats,
-            'playerStats': player_stats,
-            'lastUpdated': pd.Timestamp.now().isoformat()
-        }
+    if args.workers > 1:
+        entries, failed = export_seasons_parallel(seasons, output_dir, args.workers,
+                                                  max_memory_mb=args.max_memory_mb, **options)
+    else:
+        entries = {season: export_season(season, output_dir, **options) for season in seasons}
+        failed = []
 
-        # Write JSON file
-        output_file = output_dir / f'nfl_{season}.json'
-        with open(output_file, 'w') as f:
-            json.dump(data, f, indent=2)
+    # Seasons that failed or had nothing new keep their current index entry
+    update_index(output_dir, {season: entry for season, entry in entries.items() if entry is not None},
+                 compress=args.compress)
 
-        print(f"✅ Data exported to {output_file}")
-        print(f"   Teams: {len(team_stats)}")
-        print(f"   Total plays: {league_stats['totalPlays']:,}")
-        print(f"   Top team: {team_stats[0]['team']} (EPA/Play: {team_stats[0]['epaPerPlay']:.3f})")
+    if failed:
+        print(f"\n❌ Failed seasons: {', '.join(str(s) for s in sorted(failed))}")
+        sys.exit(1)
 
     print(f"\n✅ All seasons exported successfully!")
 
@@ -0,0 +1,236 @@
+"""
+Weekly Anomaly Detection Job
+Keeps per-team and per-player weekly EPA aggregates up to date as new games
+arrive, flags unusual weeks with z-scores and writes insights.json for the
+Next.js Insights page
+"""
+
+import argparse
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+import data_cache
+import fetch_nfl_data as export
+
+WEEKLY_KEYS = ['kind', 'entity', 'role', 'week']
+WEEKLY_SUMS = ['plays', 'epaSum', 'epaSumSq']
+
+# Smallest weekly sample worth flagging, and how many earlier weeks form the baseline
+MIN_PLAYS = {'team': 15, 'player': 8}
+MIN_PRIOR_WEEKS = 3
+Z_THRESHOLD = 2.5
+MAX_INSIGHTS = 50
+
+ROLE_LABELS = {'pass': 'passing', 'run': 'rushing', 'rush': 'rushing', 'recv': 'receiving'}
+
+# Key of the watermark in the state file's Parquet metadata
+WATERMARK_KEY = b'insights_watermark'
+
+def state_path(season):
+    """Weekly aggregate table for a season, with its watermark in the file metadata"""
+    return data_cache.CACHE_DIR / 'insights' / f'weekly_{season}.parquet'
+
+def empty_state():
+    """Weekly aggregates and watermark before any games were read"""
+    return pd.DataFrame(columns=[*WEEKLY_KEYS, 'name', *WEEKLY_SUMS]), {'openWeek': None}
+
+def load_state(season):
+    """Stored weekly aggregates and watermark, or empty ones on the first run"""
+    path = state_path(season)
+    if not path.exists():
+        return empty_state()
+
+    table = pq.read_table(path)
+    watermark = (table.schema.metadata or {}).get(WATERMARK_KEY)
+    # State from before the watermark lived in the table file, or from when games
+    # were skipped by ID (which froze partially read games), can't be trusted; start over
+    if watermark is None or 'openWeek' not in json.loads(watermark):
+        return empty_state()
+    return table.to_pandas(), json.loads(watermark)
+
+def save_state(weekly, meta, season):
+    """Write the weekly aggregates and watermark together, atomically
+
+    One file replaced in one step, so a run killed mid-write leaves the
+    previous state intact and the table never disagrees with its watermark.
+    """
+    path = state_path(season)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    table = pa.Table.from_pandas(weekly, preserve_index=False)
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}),
+                                           WATERMARK_KEY: json.dumps(meta).encode()})
+    tmp_path = data_cache.temporary_path(path)
+    pq.write_table(table, tmp_path)
+    os.replace(tmp_path, path)
+
+def weekly_aggregates(pbp):
+    """EPA sums per team/play type and player/role for each week in a batch of plays"""
+    plays = export.filter_offensive_plays(pbp)
+    plays = plays[plays['posteam'].notna()]
+
+    teams = pd.DataFrame({
+        'entity': plays['posteam'].astype(str),
+        'role': plays['play_type'].astype(str),
+        'week': plays['week'],
+        'epa': plays['epa'],
+        'epaSq': plays['epa'] ** 2,
+    }).groupby(['entity', 'role', 'week'], observed=True).agg(
+        plays=('epa', 'count'), epaSum=('epa', 'sum'), epaSumSq=('epaSq', 'sum'),
+    ).reset_index()
+    teams['kind'] = 'team'
+    teams['name'] = teams['entity']
+
+    player_plays = export.build_player_plays(pbp, keys=['week'])
+    players = player_plays.groupby(['role', 'player_id', 'week'], observed=True).agg(
+        name=('player_name', 'last'), plays=('epa', 'count'),
+        epaSum=('epa', 'sum'), epaSumSq=('epaSq', 'sum'),
+    ).reset_index().rename(columns={'player_id': 'entity'})
+    players['kind'] = 'player'
+    players['role'] = players['role'].astype(str)
+
+    weekly = pd.concat([teams, players], ignore_index=True)
+    weekly['entity'] = weekly['entity'].astype(str)
+    weekly['week'] = weekly['week'].astype('int64')
+    return weekly[[*WEEKLY_KEYS, 'name', *WEEKLY_SUMS]]
+
+def weekly_match(a, b):
+    """Whether two sets of weekly sums agree (up to float rounding)"""
+    if len(a) != len(b):
+        return False
+    left, right = (weekly.sort_values(WEEKLY_KEYS, ignore_index=True) for weekly in (a, b))
+    labels = [*WEEKLY_KEYS, 'name']
+    if not left[labels].astype(str).equals(right[labels].astype(str)):
+        return False
+    return np.allclose(left[WEEKLY_SUMS].to_numpy(dtype='float64'),
+                       right[WEEKLY_SUMS].to_numpy(dtype='float64'), rtol=1e-9, equal_nan=True)
+
+def update_weekly(season, offline=None, refresh=False, reset=False):
+    """Recalculate the weekly aggregates from the open week on
+
+    The open week (the latest one read last time) is read again with any
+    later weeks and replaces its stored sums, so games that were still in
+    progress and stat corrections published since are picked up. Earlier
+    weeks are never read again. Returns the updated table and the number
+    of plays read, or 0 if nothing changed.
+    """
+    weekly, meta = empty_state() if reset else load_state(season)
+    open_week = meta['openWeek']
+
+    filters = [('week', '>=', open_week)] if open_week is not None else None
+    pbp = data_cache.load_pbp(season, columns=export.EXPORT_COLUMNS, filters=filters,
+                              offline=offline, refresh=refresh)
+    pbp = pbp[pbp['game_id'].notna()]
+
+    if len(pbp) == 0:
+        return weekly, 0
+
+    recalculated = weekly_aggregates(pbp)
+    if open_week is not None:
+        settled = weekly['week'] < open_week
+        if weekly_match(weekly[~settled], recalculated):
+            return weekly, 0
+        # The open week's old sums are dropped, not subtracted
+        recalculated = pd.concat([weekly[settled], recalculated], ignore_index=True)
+
+    save_state(recalculated, {'openWeek': int(pbp['week'].max())}, season)
+    return recalculated, len(pbp)
+
+def detect_anomalies(weekly, z_threshold=Z_THRESHOLD):
+    """Score every entity-week against that entity's earlier weeks, all at once
+
+    The baseline is the EPA/play over all prior weeks; the z-score uses the
+    play-level standard deviation from those weeks (via the sums of squares)
+    scaled to the week's sample size.
+    """
+    weekly = weekly.sort_values(WEEKLY_KEYS).reset_index(drop=True)
+    groups = weekly.groupby(['kind', 'entity', 'role'], sort=False)
+
+    # Totals over earlier weeks only: running sum minus the current week
+    prior = groups[WEEKLY_SUMS].cumsum() - weekly[WEEKLY_SUMS]
+    prior_weeks = groups.cumcount()
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        baseline = prior['epaSum'] / prior['plays']
+        variance = (prior['epaSumSq'] / prior['plays'] - baseline ** 2).clip(lower=0)
+        epa_per_play = weekly['epaSum'] / weekly['plays']
+        z = (epa_per_play - baseline) / np.sqrt(variance / weekly['plays'])
+
+    scored = weekly.assign(epaPerPlay=epa_per_play, baseline=baseline, priorWeeks=prior_weeks, zScore=z)
+    min_plays = scored['kind'].map(MIN_PLAYS)
+    flagged = scored[
+        (scored['plays'] >= min_plays) &
+        (scored['priorWeeks'] >= MIN_PRIOR_WEEKS) &
+        np.isfinite(scored['zScore']) &
+        (scored['zScore'].abs() >= z_threshold)
+    ]
+    return flagged.assign(absZ=flagged['zScore'].abs()).sort_values(
+        ['week', 'absZ'], ascending=[False, False]).drop(columns='absZ')
+
+def headline(row):
+    """One-line description of an anomaly"""
+    direction = 'jumped to' if row['zScore'] > 0 else 'fell to'
+    return (f"{row['name']} {ROLE_LABELS.get(row['role'], row['role'])} EPA/play {direction} "
+            f"{row['epaPerPlay']:+.2f} in week {row['week']} ({int(row['plays'])} plays), "
+            f"vs {row['baseline']:+.2f} over the previous {row['priorWeeks']} weeks")
+
+def build_insights(flagged, season, limit=MAX_INSIGHTS):
+    """insights.json payload from flagged entity-weeks"""
+    insights = []
+    for row in flagged.head(limit).to_dict('records'):
+        insights.append({
+            'type': 'anomaly',
+            'kind': row['kind'],
+            'entity': row['entity'],
+            'name': row['name'],
+            'role': row['role'],
+            'week': int(row['week']),
+            'plays': int(row['plays']),
+            'epaPerPlay': round(float(row['epaPerPlay']), 4),
+            'baseline': round(float(row['baseline']), 4),
+            'zScore': round(float(row['zScore']), 2),
+            'headline': headline(row),
+        })
+
+    return {
+        'season': season,
+        'generated': pd.Timestamp.now().isoformat(),
+        'insights': insights,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Update weekly EPA aggregates and flag anomalies')
+    parser.add_argument('--season', type=int, default=export.SEASONS[0])
+    parser.add_argument('--offline', action='store_true',
+                        help='Only read from the local cache, never download')
+    parser.add_argument('--refresh', action='store_true',
+                        help='Download fresh data even if a cached copy exists')
+    parser.add_argument('--reset', action='store_true',
+                        help='Discard the stored weekly aggregates and rebuild from week 1')
+    parser.add_argument('--z', type=float, default=Z_THRESHOLD,
+                        help=f'|z| needed to flag a week (default: {Z_THRESHOLD})')
+    parser.add_argument('--output', type=Path,
+                        default=Path(__file__).parent / 'web' / 'public' / 'data' / 'insights.json')
+    args = parser.parse_args()
+
+    weekly, new_plays = update_weekly(args.season, offline=args.offline or None,
+                                      refresh=args.refresh, reset=args.reset)
+    if new_plays == 0 and args.output.exists():
+        print(f"✅ Nothing changed for {args.season}; insights are up to date")
+        return
+
+    print(f"Recalculated {new_plays:,} plays from the open week on ({len(weekly):,} weekly aggregates)")
+    flagged = detect_anomalies(weekly, z_threshold=args.z)
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    export.write_json_atomic(build_insights(flagged, args.season), args.output)
+    print(f"✅ {len(flagged)} anomalies flagged; wrote {args.output}")
+
+if __name__ == '__main__':
+    main()
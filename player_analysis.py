@@ -3,21 +3,101 @@ Player Performance Analysis
 Analyze individual player statistics and performance
 """
 
-import nflreadpy as nfl
+import argparse
+from pathlib import Path
+
+import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 
+import data_cache
+
+# Play-by-play columns used by the player analysis
+PLAYER_COLUMNS = [
+    'passer_player_name', 'rusher_player_name', 'receiver_player_name',
+    'passer_player_id', 'rusher_player_id', 'receiver_player_id',
+    'pass', 'rush', 'epa', 'cpoe', 'air_yards', 'yards_gained',
+    'complete_pass', 'pass_touchdown', 'rush_touchdown', 'interception',
+]
+
+# Per-role profile columns for batch reports: output name -> (play-by-play column, aggregation)
+PROFILE_ROLES = {
+    'passer': {
+        'pass_attempts': ('epa', 'size'),
+        'completions': ('complete_pass', 'sum'),
+        'pass_yards': ('yards_gained', 'sum'),
+        'pass_tds': ('pass_touchdown', 'sum'),
+        'interceptions': ('interception', 'sum'),
+        'pass_epa': ('epa', 'mean'),
+        'pass_total_epa': ('epa', 'sum'),
+        'cpoe': ('cpoe', 'mean'),
+        'air_yards': ('air_yards', 'mean'),
+    },
+    'rusher': {
+        'rush_attempts': ('epa', 'size'),
+        'rush_yards': ('yards_gained', 'sum'),
+        'rush_tds': ('rush_touchdown', 'sum'),
+        'rush_epa': ('epa', 'mean'),
+        'rush_total_epa': ('epa', 'sum'),
+    },
+    'receiver': {
+        'targets': ('epa', 'size'),
+        'receptions': ('complete_pass', 'sum'),
+        'rec_yards': ('yards_gained', 'sum'),
+        'rec_tds': ('pass_touchdown', 'sum'),
+        'rec_epa': ('epa', 'mean'),
+        'rec_total_epa': ('epa', 'sum'),
+        'target_air_yards': ('air_yards', 'mean'),
+    },
+}
+
+# "All qualifying players" - the same minimums as the leaderboards
+QUALIFYING_MINIMUMS = {'pass_attempts': 100, 'rush_attempts': 50, 'targets': 30}
+
 def load_season_data(season=2024):
     """Load play-by-play data for analysis"""
     print(f"Loading {season} season data...")
-    pbp = nfl.load_pbp(season)
+    pbp = data_cache.load_pbp(season, columns=PLAYER_COLUMNS)
     return pbp
 
-def analyze_quarterback(pbp, qb_name):
-    """Analyze a quarterback's performance"""
-    # Filter for plays where this QB was the passer
-    qb_plays = pbp[pbp['passer_player_name'] == qb_name].copy()
+def build_player_index(pbp):
+    """Map each player's ID and name to their row positions, per role
+
+    Built once per season; index[role][player] holds the positions of the
+    rows where that player was the passer, rusher or receiver, so a lookup
+    only touches that player's plays.
+    """
+    index = {}
+    for role in ['passer', 'rusher', 'receiver']:
+        index[role] = {}
+        for column in [f'{role}_player_id', f'{role}_player_name']:
+            if column not in pbp.columns:
+                continue
+            codes, players = pd.factorize(pbp[column])
+            has_player = codes >= 0
+
+            # Sort rows by player once, then cut the positions into one array per player
+            positions = np.flatnonzero(has_player)
+            order = np.argsort(codes[has_player], kind='stable')
+            counts = np.bincount(codes[has_player], minlength=len(players))
+            index[role].update(zip(players, np.split(positions[order], np.cumsum(counts)[:-1])))
+    return index
+
+def player_plays(pbp, index, role, player):
+    """Rows where a player (ID or name) had the given role"""
+    positions = index[role].get(player)
+    if positions is None:
+        return pbp.iloc[:0]
+    return pbp.take(positions)
+
+def analyze_quarterback(pbp, qb_name, index=None):
+    """Analyze a quarterback's performance (qb_name may also be a player ID)"""
+    if index is None:
+        index = build_player_index(pbp)
+
+    # Plays where this QB was the passer
+    qb_plays = player_plays(pbp, index, 'passer', qb_name)
 
     if len(qb_plays) == 0:
         print(f"No plays found for {qb_name}")
@@ -62,13 +142,16 @@ def analyze_quarterback(pbp, qb_name):
 
     return qb_plays
 
-def analyze_running_back(pbp, rb_name):
-    """Analyze a running back's performance"""
-    # Filter for rushing plays
-    rb_rushes = pbp[pbp['rusher_player_name'] == rb_name].copy()
+def analyze_running_back(pbp, rb_name, index=None):
+    """Analyze a running back's performance (rb_name may also be a player ID)"""
+    if index is None:
+        index = build_player_index(pbp)
+
+    # Rushing plays
+    rb_rushes = player_plays(pbp, index, 'rusher', rb_name)
 
     # Also get receiving plays
-    rb_targets = pbp[pbp['receiver_player_name'] == rb_name].copy()
+    rb_targets = player_plays(pbp, index, 'receiver', rb_name)
 
     if len(rb_rushes) == 0 and len(rb_targets) == 0:
         print(f"No plays found for {rb_name}")
@@ -110,6 +193,83 @@ def analyze_running_back(pbp, rb_name):
 
     return {'rushes': rb_rushes, 'targets': rb_targets}
 
+def player_profiles(pbp, players=None):
+    """Passing, rushing and receiving profile for every player in one grouped pass per role
+
+    players optionally limits the table to these names or player IDs.
+    Returns one row per player ID; rate columns are NaN for roles a
+    player never had.
+    """
+    profiles = []
+    names = []
+    for role, columns in PROFILE_ROLES.items():
+        id_column, name_column = f'{role}_player_id', f'{role}_player_name'
+        rows = pbp[pbp[id_column].notna()]
+        if players is not None:
+            rows = rows[rows[id_column].isin(players) | rows[name_column].isin(players)]
+
+        grouped = rows.groupby(id_column, observed=True)
+        profiles.append(grouped.agg(**{name: spec for name, spec in columns.items() if spec[0] in rows.columns}))
+        names.append(grouped[name_column].last())
+
+    table = pd.concat(profiles, axis=1)
+    table.insert(0, 'player_name', pd.concat(names).groupby(level=0).last())
+
+    # Counts are missing for roles a player never had; those are zero
+    counts = [column for role in PROFILE_ROLES.values() for column, (_, how) in role.items()
+              if how in ('size', 'sum') and column in table.columns]
+    table[counts] = table[counts].fillna(0)
+    attempts = [column for role in PROFILE_ROLES.values() for column, (_, how) in role.items()
+                if how == 'size']
+    table[attempts] = table[attempts].astype('int64')
+
+    table['completion_pct'] = table['completions'] / table['pass_attempts'].replace(0, np.nan) * 100
+    table['yards_per_carry'] = table['rush_yards'] / table['rush_attempts'].replace(0, np.nan)
+    table['catch_rate'] = table['receptions'] / table['targets'].replace(0, np.nan) * 100
+
+    table.index = table.index.astype(str)
+    table.index.name = 'player_id'
+    return table
+
+def qualifying(table):
+    """Players with enough passing, rushing or receiving volume to rank"""
+    mask = np.zeros(len(table), dtype=bool)
+    for column, minimum in QUALIFYING_MINIMUMS.items():
+        mask |= (table[column] >= minimum).to_numpy()
+    return table[mask]
+
+def season_range(value):
+    """Parse a season or an inclusive range like 2020-2024"""
+    first, _, last = value.partition('-')
+    return list(range(int(first), int(last or first) + 1))
+
+def batch_report(seasons, players=None, output=None):
+    """Profiles for many players across seasons, as one table (written to output if given)"""
+    reports = []
+    for season in seasons:
+        pbp = load_season_data(season)
+        table = player_profiles(pbp, players)
+        if players is None:
+            table = qualifying(table)
+        table.insert(0, 'season', season)
+        reports.append(table.reset_index())
+
+    report = pd.concat(reports, ignore_index=True)
+
+    if output is not None:
+        output = Path(output)
+        if output.suffix == '.parquet':
+            report.to_parquet(output, index=False)
+        elif output.suffix == '.csv':
+            report.to_csv(output, index=False)
+        elif output.suffix == '.json':
+            report.to_json(output, orient='records', indent=2)
+        else:
+            raise ValueError(f"Unsupported report format: {output.suffix} (use .parquet, .csv or .json)")
+        print(f"✅ Wrote {len(report):,} player-seasons to {output}")
+
+    return report
+
 def top_players_by_position(pbp):
     """Find top performing players by position"""
 
@@ -153,13 +313,33 @@ def top_players_by_position(pbp):
         for idx, (name, row) in enumerate(rb_stats.head(10).iterrows(), 1):
             print(f"{idx:2d}. {name:25s} EPA/Rush: {row[('epa', 'mean')]:.3f} ({int(row[('epa', 'count')])} att)")
 
+def parse_args():
+    parser = argparse.ArgumentParser(description='Player performance analysis')
+    parser.add_argument('--players', nargs='+', default=None,
+                        help='Batch report for these player names or IDs')
+    parser.add_argument('--all', action='store_true',
+                        help='Batch report for all qualifying players')
+    parser.add_argument('--seasons', type=season_range, nargs='+', default=[[2024]],
+                        help='Seasons or ranges, e.g. 2024 or 2020-2024 (default: 2024)')
+    parser.add_argument('--output', default='player_report.csv',
+                        help='Report file: .parquet, .csv or .json (default: player_report.csv)')
+    return parser.parse_args()
+
 if __name__ == "__main__":
+    args = parse_args()
+    seasons = sorted({season for seasons in args.seasons for season in seasons})
+
+    if args.players or args.all:
+        batch_report(seasons, players=args.players, output=args.output)
+        raise SystemExit(0)
+
     # Load data
-    pbp = load_season_data(2024)
+    pbp = load_season_data(seasons[-1])
+    index = build_player_index(pbp)
 
     # Analyze specific players (change to your favorite players)
-    analyze_quarterback(pbp, "P.Mahomes")
-    analyze_running_back(pbp, "C.McCaffrey")
+    analyze_quarterback(pbp, "P.Mahomes", index)
+    analyze_running_back(pbp, "C.McCaffrey", index)
 
     # Show top players
     top_players_by_position(pbp)
@@ -0,0 +1,233 @@
+"""
+Polars Lazy Engine
+Runs the season stat aggregations as Polars LazyFrames, so only the needed
+columns and rows are read from the Parquet cache and group-bys run multi-threaded
+"""
+
+import argparse
+import math
+import sys
+
+import polars as pl
+
+import data_cache
+import fetch_nfl_data as export
+import season_stats
+
+def scan_season(season, offline=None, refresh=False, min_week=None):
+    """Lazily scan a cached season, optionally only from min_week on"""
+    lf = data_cache.scan_pbp(season, offline=offline, refresh=refresh)
+
+    if min_week is not None:
+        lf = lf.filter(pl.col('week') >= min_week)
+
+    # pandas treats NaN as missing - make Polars do the same
+    return lf.with_columns(pl.col(pl.Float32, pl.Float64).fill_nan(None))
+
+def offensive_plays(lf):
+    """Pass and run plays with a valid EPA and no penalty"""
+    return lf.filter(
+        pl.col('play_type').is_in(['pass', 'run']) &
+        pl.col('epa').is_not_null() &
+        ((pl.col('penalty') == 0) | pl.col('penalty').is_null())
+    )
+
+def regular_season_offense(lf):
+    """Offensive plays with a known possession team, regular season only"""
+    plays = offensive_plays(lf).filter(pl.col('posteam').is_not_null())
+    if 'season_type' in lf.collect_schema().names():
+        plays = plays.filter(pl.col('season_type') == 'REG')
+    return plays
+
+def aggregate_team_plays(lf):
+    """Sum EPA per offense, defense and play type (lazy)"""
+    return regular_season_offense(lf).group_by(export.TEAM_AGGREGATE_KEYS).agg(
+        plays=pl.col('epa').count().cast(pl.Int64),
+        epaSum=pl.col('epa').sum(),
+        epaSumSq=(pl.col('epa') ** 2).sum(),
+    ).sort(export.TEAM_AGGREGATE_KEYS)
+
+def aggregate_player_plays(lf):
+    """Sum EPA and box-score stats per player and role from a long player-play table (lazy)"""
+    plays = offensive_plays(lf)
+
+    role_filters = {
+        'pass': pl.lit(True),
+        'rush': pl.col('play_type') == 'run',
+        'recv': pl.col('pass_attempt') == 1,
+    }
+
+    parts = []
+    for role, prefix in export.ROLE_PLAYER_PREFIX.items():
+        stats = export.PLAYER_ROLE_STATS[role]
+        parts.append(plays.filter(
+            pl.col(f'{prefix}_player_id').is_not_null() &
+            pl.col(f'{prefix}_player_name').is_not_null() &
+            role_filters[role]
+        ).select(
+            pl.lit(role).alias('role'),
+            pl.col(f'{prefix}_player_id').alias('player_id'),
+            pl.col(f'{prefix}_player_name').alias('player_name'),
+            pl.col('epa').cast(pl.Float64),
+            *[(pl.col(stats[stat]) if stat in stats else pl.lit(0.0)).cast(pl.Float64).alias(stat)
+              for stat in export.PLAYER_AGGREGATE_STATS],
+        ))
+
+    return pl.concat(parts).group_by(['role', 'player_id'], maintain_order=True).agg(
+        player_name=pl.col('player_name').last(),
+        plays=pl.col('epa').count().cast(pl.Int64),
+        epaSum=pl.col('epa').sum(),
+        epaSumSq=(pl.col('epa') ** 2).sum(),
+        *[pl.col(stat).sum() for stat in export.PLAYER_AGGREGATE_STATS],
+    ).select(export.PLAYER_AGGREGATE_COLUMNS)
+
+def league_totals(lf):
+    """League-wide play and touchdown counts (lazy)"""
+    return lf.select(
+        totalPlays=pl.len().cast(pl.Int64),
+        totalTouchdowns=pl.col('touchdown').sum().cast(pl.Int64),
+        passingPlays=(pl.col('pass') == 1).sum().cast(pl.Int64),
+        rushingPlays=(pl.col('rush') == 1).sum().cast(pl.Int64),
+    )
+
+def calculate_aggregates(lf):
+    """Calculate the same partial aggregates as fetch_nfl_data in one shared scan"""
+    teams, players, league, week, games = pl.collect_all([
+        aggregate_team_plays(lf),
+        aggregate_player_plays(lf),
+        league_totals(lf),
+        lf.select(pl.col('week').max()),
+        lf.select(pl.col('game_id').drop_nulls().unique().sort()),
+    ])
+    week = week.item()
+
+    return {
+        'week': int(week) if week is not None else 0,
+        'games': games['game_id'].to_list(),
+        'league': league.row(0, named=True),
+        'teams': teams.to_pandas(),
+        'players': players.to_pandas(),
+    }
+
+def calculate_split_aggregates(lf):
+    """Settled and open partial aggregates, as fetch_nfl_data.calculate_split_aggregates"""
+    latest = lf.select(pl.col('week').max()).collect().item()
+    if latest is None:
+        return None
+
+    settled = lf.filter(pl.col('week') < latest)
+    has_settled = settled.select(pl.len()).collect().item() > 0
+    return {
+        'settled': calculate_aggregates(settled) if has_settled else None,
+        'open': calculate_aggregates(lf.filter(pl.col('week') == latest)),
+    }
+
+def calculate_team_stats(lf):
+    """Calculate team offensive EPA stats"""
+    return export.team_stats_from_aggregates(aggregate_team_plays(lf).collect().to_pandas())
+
+def calculate_player_stats(lf, season, offline=None, rosters=None):
+    """Calculate player statistics for QB, RB, WR, TE"""
+    if rosters is not None:
+        position_lookup = export.roster_positions(rosters)
+    else:
+        position_lookup = export.load_position_lookup(season, offline=offline)
+    player_aggregates = aggregate_player_plays(lf).collect().to_pandas()
+    return export.player_stats_from_aggregates(player_aggregates, position_lookup)
+
+def calculate_league_stats(lf):
+    """Calculate overall league statistics"""
+    return league_totals(lf).collect().row(0, named=True)
+
+def get_all_teams_epa(lf):
+    """Calculate offensive and defensive EPA for all teams (dashboard table layout)"""
+    if 'epa' not in lf.collect_schema().names():
+        return None
+
+    # One scan keyed by both teams; offense and defense fold out of the same cells
+    plays = regular_season_offense(lf).select(*export.TEAM_AGGREGATE_KEYS, 'epa').collect()
+    cells = plays.group_by(export.TEAM_AGGREGATE_KEYS).agg(
+        epaSum=pl.col('epa').sum(),
+        plays=pl.col('epa').count(),
+    )
+
+    offense = cells.group_by('posteam').agg(
+        (pl.col('epaSum').sum() / pl.col('plays').sum()).alias('EPA/Play'),
+        pl.col('epaSum').sum().alias('Total EPA'),
+        pl.col('plays').sum().alias('Plays'),
+    ).rename({'posteam': 'Team'})
+
+    def defense(rows, name):
+        return rows.filter(pl.col('defteam').is_not_null()).group_by('defteam').agg(
+            (pl.col('epaSum').sum() / pl.col('plays').sum()).alias(name),
+        ).rename({'defteam': 'Team'})
+
+    team_epa = offense
+    for rows, name in [(cells, 'Def EPA/Play'),
+                       (cells.filter(pl.col('play_type') == 'pass'), 'Def Pass EPA/Play'),
+                       (cells.filter(pl.col('play_type') == 'run'), 'Def Rush EPA/Play')]:
+        team_epa = team_epa.join(defense(rows, name), on='Team', how='left')
+
+    team_epa = team_epa.with_columns(
+        (pl.col('EPA/Play') - pl.col('Def EPA/Play')).alias('Net EPA/Play'),
+    ).sort('EPA/Play', descending=True).to_pandas()
+
+    interval = season_stats.bootstrap_ci(plays['epa'].to_numpy(), plays['posteam'].cast(pl.String).to_numpy())
+    team_epa.insert(2, 'CI Low', team_epa['Team'].map(interval['low']))
+    team_epa.insert(3, 'CI High', team_epa['Team'].map(interval['high']))
+    return team_epa
+
+def values_match(a, b):
+    """Compare two exported values, allowing for float summation order"""
+    if isinstance(a, dict):
+        return a.keys() == b.keys() and all(values_match(a[k], b[k]) for k in a)
+    if isinstance(a, list):
+        return len(a) == len(b) and all(values_match(x, y) for x, y in zip(a, b))
+    if isinstance(a, float) or isinstance(b, float):
+        return math.isclose(a, b, rel_tol=1e-9, abs_tol=1e-12)
+    return a == b
+
+def check_parity(season, offline=None):
+    """Run both backends on a season and report whether their numbers agree"""
+    pbp = export.fetch_season_data(season, offline=offline)
+    lf = scan_season(season, offline=offline)
+
+    results = {
+        'teamStats': (export.calculate_team_stats(pbp), calculate_team_stats(lf)),
+        'playerStats': (export.calculate_player_stats(pbp, season, offline=offline),
+                        calculate_player_stats(lf, season, offline=offline)),
+        'leagueStats': (export.calculate_league_stats(pbp), calculate_league_stats(lf)),
+    }
+
+    # The dashboard table uses the same plays as the team stats export
+    team_epa = get_all_teams_epa(lf)
+    results['teamEPA'] = (
+        [[row['team'], row['epaPerPlay'], row['totalEPA'], row['plays'], row['defEpaPerPlay'],
+          row['defPassEpaPerPlay'], row['defRushEpaPerPlay'], row['netEpaPerPlay']]
+         for row in results['teamStats'][0]],
+        team_epa[['Team', 'EPA/Play', 'Total EPA', 'Plays', 'Def EPA/Play',
+                  'Def Pass EPA/Play', 'Def Rush EPA/Play', 'Net EPA/Play']].values.tolist(),
+    )
+
+    ok = True
+    for name, (pandas_result, polars_result) in results.items():
+        match = values_match(pandas_result, polars_result)
+        ok &= match
+        print(f"   {name}: {'identical' if match else 'MISMATCH'}")
+
+    return ok
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Check that the Polars and pandas backends agree')
+    parser.add_argument('--seasons', type=int, nargs='+', default=export.SEASONS)
+    parser.add_argument('--offline', action='store_true',
+                        help='Only read from the local cache, never download')
+    args = parser.parse_args()
+
+    all_ok = True
+    for season in args.seasons:
+        print(f"\n--- {season} season parity ---")
+        all_ok &= check_parity(season, offline=args.offline or None)
+
+    print(f"\n{'✅ Backends agree' if all_ok else '❌ Backends disagree'}")
+    sys.exit(0 if all_ok else 1)
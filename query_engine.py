@@ -0,0 +1,315 @@
+"""
+Ad-hoc Query Engine
+Answers chart-builder queries (metrics grouped by team, player, week or play
+type, with filters) from an in-memory play-by-play store, and serves them
+over a local HTTP endpoint for the Next.js Custom Analysis page
+"""
+
+import argparse
+import json
+import threading
+import time
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+
+import data_cache
+import fetch_nfl_data as export
+
+QUERY_COLUMNS = [
+    'game_id', 'week', 'season_type', 'posteam', 'defteam', 'play_type', 'penalty',
+    'pass', 'rush', 'epa', 'success', 'yards_gained', 'touchdown',
+    'complete_pass', 'pass_attempt', 'interception', 'sack', 'air_yards', 'cpoe',
+    'passer_player_id', 'passer_player_name',
+    'rusher_player_id', 'rusher_player_name',
+    'receiver_player_id', 'receiver_player_name',
+]
+
+# Metric name -> (play-by-play column, aggregation)
+METRICS = {
+    'plays': ('epa', 'count'),
+    'epaPerPlay': ('epa', 'mean'),
+    'totalEPA': ('epa', 'sum'),
+    'successRate': ('success', 'mean'),
+    'yards': ('yards_gained', 'sum'),
+    'yardsPerPlay': ('yards_gained', 'mean'),
+    'touchdowns': ('touchdown', 'sum'),
+    'completions': ('complete_pass', 'sum'),
+    'completionRate': ('complete_pass', 'mean'),
+    'interceptions': ('interception', 'sum'),
+    'sacks': ('sack', 'sum'),
+    'airYards': ('air_yards', 'mean'),
+    'cpoe': ('cpoe', 'mean'),
+}
+
+# Group-by name -> play-by-play column ('player' depends on the position, see player_prefix)
+GROUP_COLUMNS = {
+    'team': 'posteam',
+    'defense': 'defteam',
+    'week': 'week',
+    'playType': 'play_type',
+}
+
+POSITION_PLAYER_PREFIX = {'QB': 'passer', 'RB': 'rusher', 'WR': 'receiver', 'TE': 'receiver'}
+PLAY_TYPES = {'pass': 'pass', 'run': 'run', 'rush': 'run'}
+
+DEFAULT_QUERY = {
+    'season': 2025,
+    'groupBy': 'team',
+    'metrics': ['epaPerPlay', 'plays'],
+    'teams': [],
+    'position': None,
+    'playType': None,
+    'regularSeason': True,
+    'minAttempts': 0,
+}
+
+# Seasons loaded so far: season -> (offensive plays, position lookup)
+STORE = {}
+STORE_LOCK = threading.Lock()
+OFFLINE = None
+
+def load_season(season):
+    """Offensive plays and roster positions for a season, loaded once and kept in memory"""
+    with STORE_LOCK:
+        if season not in STORE:
+            pbp = data_cache.load_pbp(season, columns=QUERY_COLUMNS, offline=OFFLINE, lean=True)
+            plays = pbp[export.offensive_play_mask(pbp)].reset_index(drop=True)
+            STORE[season] = (plays, export.load_position_lookup(season, offline=OFFLINE))
+        return STORE[season]
+
+def string_list(value, field):
+    """A string or list of strings as a list, rejecting anything else"""
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return [value]
+    if not isinstance(value, list) or not all(isinstance(item, str) for item in value):
+        raise ValueError(f"{field} must be a string or a list of strings")
+    return value
+
+def optional_string(value, field):
+    """A string or None, rejecting anything else"""
+    if value is not None and not isinstance(value, str):
+        raise ValueError(f"{field} must be a string")
+    return value
+
+def integer(value, field):
+    """An integer, or a string holding one (bools and fractions are rejected)"""
+    if isinstance(value, str):
+        try:
+            return int(value)
+        except ValueError:
+            raise ValueError(f"{field} must be an integer") from None
+    if isinstance(value, bool) or not (isinstance(value, int) or
+                                       (isinstance(value, float) and value.is_integer())):
+        raise ValueError(f"{field} must be an integer")
+    return int(value)
+
+def normalize_query(query):
+    """Fill defaults, validate and canonicalize a query so equal queries share a cache entry
+
+    Raises ValueError for anything malformed, including fields of the wrong type.
+    """
+    if not isinstance(query, dict):
+        raise ValueError("A query must be a JSON object")
+
+    unknown = set(query) - set(DEFAULT_QUERY)
+    if unknown:
+        raise ValueError(f"Unknown query fields: {', '.join(sorted(unknown))}")
+
+    normalized = {**DEFAULT_QUERY, **query}
+
+    metrics = string_list(normalized['metrics'], 'metrics')
+    bad = [metric for metric in metrics if metric not in METRICS]
+    if bad or not metrics:
+        raise ValueError(f"Unknown metrics: {bad}. Choose from {', '.join(METRICS)}")
+    normalized['metrics'] = list(dict.fromkeys(metrics))
+
+    if optional_string(normalized['groupBy'], 'groupBy') not in [*GROUP_COLUMNS, 'player']:
+        raise ValueError(f"groupBy must be one of {', '.join([*GROUP_COLUMNS, 'player'])}")
+
+    normalized['teams'] = sorted(set(string_list(normalized['teams'], 'teams')))
+
+    position = optional_string(normalized['position'], 'position')
+    if position is not None:
+        position = position.upper()
+        if position not in POSITION_PLAYER_PREFIX:
+            raise ValueError(f"position must be one of {', '.join(POSITION_PLAYER_PREFIX)}")
+    normalized['position'] = position
+
+    play_type = optional_string(normalized['playType'], 'playType')
+    if play_type is not None and play_type not in PLAY_TYPES:
+        raise ValueError("playType must be 'pass' or 'run'")
+    normalized['playType'] = PLAY_TYPES.get(play_type)
+
+    if not isinstance(normalized['regularSeason'], bool):
+        raise ValueError("regularSeason must be true or false")
+
+    normalized['season'] = integer(normalized['season'], 'season')
+    normalized['minAttempts'] = integer(normalized['minAttempts'] or 0, 'minAttempts')
+    if normalized['minAttempts'] < 0:
+        raise ValueError("minAttempts must not be negative")
+    return normalized
+
+def player_prefix(query):
+    """Which player column a player query groups by"""
+    if query['position'] is not None:
+        return POSITION_PLAYER_PREFIX[query['position']]
+    return 'rusher' if query['playType'] == 'run' else 'passer'
+
+def run_query(query):
+    """Answer a normalized query: one row per group with the requested metrics
+
+    Weeks come back in week order; other groups by the first metric, highest first.
+    """
+    plays, positions = load_season(query['season'])
+
+    mask = np.ones(len(plays), dtype=bool)
+    if query['regularSeason']:
+        mask &= (plays['season_type'] == 'REG').to_numpy()
+    if query['playType'] is not None:
+        mask &= (plays['play_type'] == query['playType']).to_numpy()
+    if query['teams']:
+        mask &= plays['posteam'].isin(query['teams']).to_numpy()
+
+    group_by = query['groupBy']
+    if group_by == 'player' or query['position'] is not None:
+        prefix = player_prefix(query)
+        player_ids = plays[f'{prefix}_player_id']
+        mask &= player_ids.notna().to_numpy()
+        if query['position'] is not None:
+            mask &= (player_ids.astype(object).map(positions) == query['position']).to_numpy()
+
+    # The lean store keeps metrics as float32; aggregate them in float64
+    selected = plays[mask]
+    selected = selected.astype({column: 'float64' for column in selected.select_dtypes('float32').columns})
+
+    if group_by == 'player':
+        keys = [f'{prefix}_player_id']
+    else:
+        keys = [GROUP_COLUMNS[group_by]]
+
+    aggregations = {'_attempts': ('epa', 'count')}
+    for metric in query['metrics']:
+        aggregations[metric] = METRICS[metric]
+    if group_by == 'player':
+        aggregations['player'] = (f'{prefix}_player_name', 'last')
+
+    result = selected.groupby(keys, observed=True).agg(**aggregations)
+    result = result[result['_attempts'] >= query['minAttempts']].drop(columns='_attempts')
+    result.index.name = 'playerId' if group_by == 'player' else group_by
+    if group_by == 'week':
+        return result.reset_index().sort_values('week')
+    return result.reset_index().sort_values(query['metrics'][0], ascending=False)
+
+@lru_cache(maxsize=512)
+def cached_query(key):
+    """Run a query by its canonical JSON key, caching the JSON-ready result"""
+    query = json.loads(key)
+    result = run_query(query)
+    rows = json.loads(result.to_json(orient='records'))
+    return {'query': query, 'rows': rows}
+
+def query(raw_query):
+    """Normalize, run (or reuse) a query and time it"""
+    start = time.perf_counter()
+    key = json.dumps(normalize_query(raw_query), sort_keys=True)
+    response = dict(cached_query(key))
+    response['elapsedMs'] = round((time.perf_counter() - start) * 1000, 2)
+    return response
+
+class QueryHandler(BaseHTTPRequestHandler):
+    """POST /query with a JSON body, or GET /query?q=<json>; GET /metrics lists the options"""
+
+    def send_cors_headers(self):
+        # The Next.js dev server runs on another port
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+
+    def send_json(self, status, body):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.send_cors_headers()
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def answer(self, raw_query):
+        try:
+            self.send_json(200, query(raw_query))
+        except (ValueError, TypeError) as e:
+            self.send_json(400, {'error': str(e)})
+        except FileNotFoundError as e:
+            self.send_json(404, {'error': str(e)})
+        except Exception as e:
+            # Never leave the client without a response
+            print(f"❌ Query failed: {e!r}")
+            self.send_json(500, {'error': f"Internal error: {e}"})
+
+    def do_OPTIONS(self):
+        # CORS preflight: headers only, a 204 has no body
+        self.send_response(204)
+        self.send_cors_headers()
+        self.end_headers()
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == '/metrics':
+            self.send_json(200, {'metrics': list(METRICS), 'groupBy': [*GROUP_COLUMNS, 'player'],
+                                 'positions': list(POSITION_PLAYER_PREFIX)})
+        elif url.path == '/query':
+            try:
+                raw_query = json.loads(parse_qs(url.query).get('q', ['{}'])[0])
+            except json.JSONDecodeError as e:
+                self.send_json(400, {'error': f"Invalid JSON: {e}"})
+                return
+            self.answer(raw_query)
+        else:
+            self.send_json(404, {'error': 'Not found'})
+
+    def do_POST(self):
+        if urlparse(self.path).path != '/query':
+            self.send_json(404, {'error': 'Not found'})
+            return
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            raw_query = json.loads(self.rfile.read(length) or b'{}')
+        except json.JSONDecodeError as e:
+            self.send_json(400, {'error': f"Invalid JSON: {e}"})
+            return
+        self.answer(raw_query)
+
+    def log_message(self, format, *args):
+        # Quieter than the default per-request stderr lines
+        pass
+
+def main():
+    global OFFLINE
+
+    parser = argparse.ArgumentParser(description='Serve ad-hoc play-by-play queries over HTTP')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--seasons', type=int, nargs='+', default=[],
+                        help='Seasons to load up front (others load on first query)')
+    parser.add_argument('--offline', action='store_true',
+                        help='Only read from the local cache, never download')
+    args = parser.parse_args()
+
+    OFFLINE = args.offline or None
+    for season in args.seasons:
+        load_season(season)
+        print(f"✅ Loaded {season} season")
+
+    server = ThreadingHTTPServer((args.host, args.port), QueryHandler)
+    print(f"Query engine listening on http://{args.host}:{args.port}/query")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""
+Season Frame Cache
+Memory-bounded LRU of loaded play-by-play seasons for long-running processes,
+with hit, miss and eviction metrics
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import data_cache
+
+# Total in-memory size of the cached seasons before the least recently used is dropped
+BUDGET_MB = float(os.environ.get('NFL_SEASON_CACHE_MB', 512))
+
+class SeasonCache:
+    """LRU cache of season frames bounded by their combined memory use
+
+    Frames are handed out as shallow views, never deep-copied or pickled,
+    and callers must treat them as read-only (see get).
+    """
+
+    def __init__(self, loader, budget_mb=BUDGET_MB):
+        self.loader = loader
+        self.budget_mb = budget_mb
+        self.entries = OrderedDict()  # key -> (frame, size in MB)
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.load_seconds = 0.0
+
+    def get(self, key):
+        """The frame for key, loading it (and evicting older ones) on a miss
+
+        Loads happen under the lock so concurrent sessions opening the same
+        season load it once.
+
+        The view is read-only on purpose. While the frame is cached,
+        copy-on-write gives a caller that modifies its view a private copy.
+        Once it is evicted the view is the data's only owner, so in-place
+        writes go to the loader's buffers; for season_store frames those
+        are read-only and the write raises ValueError. Call .copy() before
+        changing values.
+        """
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self.entries[key][0].copy(deep=False)
+
+            self.misses += 1
+            start = time.perf_counter()
+            frame = self.loader(key)
+            self.load_seconds += time.perf_counter() - start
+
+            self.entries[key] = (frame, float(data_cache.memory_mb(frame)))
+            self.evict()
+            return frame.copy(deep=False)
+
+    def used_mb(self):
+        """Combined size of the cached frames"""
+        return sum(size for _, size in self.entries.values())
+
+    def evict(self):
+        """Drop least recently used frames until within budget (the newest always stays)"""
+        while len(self.entries) > 1 and self.used_mb() > self.budget_mb:
+            key, _ = self.entries.popitem(last=False)
+            self.evictions += 1
+            print(f"Season cache: evicted {key} ({self.used_mb():.0f} MB still cached)")
+
+    def clear(self):
+        """Drop every cached frame"""
+        with self.lock:
+            self.entries.clear()
+
+    def metrics(self):
+        """Cache contents and counters"""
+        with self.lock:
+            requests = self.hits + self.misses
+            return {
+                'seasons': list(self.entries),
+                'used_mb': round(self.used_mb(), 1),
+                'budget_mb': self.budget_mb,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / requests if requests else None,
+                'load_seconds': round(self.load_seconds, 2),
+            }
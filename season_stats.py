@@ -0,0 +1,226 @@
+"""
+Season Stat Tables
+Vectorized per-season tables shared by the dashboard and the analysis scripts
+"""
+
+import numpy as np
+import pandas as pd
+
+# Bootstrap settings for the EPA/play intervals on the leaderboards
+BOOTSTRAP_RESAMPLES = 1000
+BOOTSTRAP_CONFIDENCE = 0.95
+# Resampled values held in memory at once (resamples per chunk x plays)
+BOOTSTRAP_CHUNK_VALUES = 4_000_000
+
+def bootstrap_ci(values, groups, resamples=BOOTSTRAP_RESAMPLES, confidence=BOOTSTRAP_CONFIDENCE, seed=0):
+    """Percentile bootstrap interval of the mean for every group at once
+
+    Plays are sorted by group once so each group is a contiguous slice. A
+    resample replaces every play with a random play from its own slice, and
+    np.add.reduceat sums all slices of a whole chunk of resamples in one
+    call, so there is no per-group loop. Returns a DataFrame of 'low' and
+    'high' indexed by group.
+    """
+    values = np.asarray(values, dtype='float64')
+    groups = np.asarray(groups)
+    valid = ~np.isnan(values) & pd.notna(groups)
+
+    codes, labels = pd.factorize(groups[valid], sort=True)
+    order = np.argsort(codes, kind='stable')
+    values, codes = values[valid][order], codes[order]
+    if len(values) == 0:
+        return pd.DataFrame({'low': [], 'high': []})
+
+    sizes = np.bincount(codes, minlength=len(labels))
+    starts = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+    play_start, play_size = starts[codes], sizes[codes]
+
+    rng = np.random.default_rng(seed)
+    chunk = max(1, BOOTSTRAP_CHUNK_VALUES // len(values))
+    means = np.empty((resamples, len(labels)))
+    for first in range(0, resamples, chunk):
+        count = min(chunk, resamples - first)
+        draws = play_start + (rng.random((count, len(values))) * play_size).astype('int64')
+        means[first:first + count] = np.add.reduceat(values[draws], starts, axis=1) / sizes
+
+    tail = (1 - confidence) / 2
+    low, high = np.quantile(means, [tail, 1 - tail], axis=0)
+    return pd.DataFrame({'low': low, 'high': high}, index=pd.Index(labels))
+
+def build_team_stats_table(pbp):
+    """Passing and rushing stat block for every team in one grouped pass"""
+    is_pass = pbp['pass'] == 1
+    is_rush = pbp['rush'] == 1
+    epa = pbp['epa'] if 'epa' in pbp.columns else pd.Series(np.nan, index=pbp.index)
+    has_epa = epa.notna()
+
+    def on(mask, column):
+        # Column values on the masked plays, 0 elsewhere, so one sum covers every team
+        return pbp[column].where(mask, 0)
+
+    frame = pd.DataFrame({
+        'posteam': pbp['posteam'],
+        'plays': 1,
+        'attempts': is_pass.astype('int64'),
+        'completions': on(is_pass, 'complete_pass'),
+        'pass_yards': on(is_pass, 'yards_gained'),
+        'pass_tds': on(is_pass, 'pass_touchdown'),
+        'interceptions': on(is_pass, 'interception'),
+        'pass_epa_sum': epa.where(is_pass & has_epa, 0),
+        'pass_epa_plays': (is_pass & has_epa).astype('int64'),
+        'rush_attempts': is_rush.astype('int64'),
+        'rush_yards': on(is_rush, 'yards_gained'),
+        'rush_tds': on(is_rush, 'rush_touchdown'),
+        'rush_epa_sum': epa.where(is_rush & has_epa, 0),
+        'rush_epa_plays': (is_rush & has_epa).astype('int64'),
+    })
+    table = frame.groupby('posteam', observed=True).sum()
+
+    # Rates, left as NaN where a team has no plays of that kind
+    table['completion_pct'] = table['completions'] / table['attempts'].replace(0, np.nan) * 100
+    table['yards_per_attempt'] = table['pass_yards'] / table['attempts'].replace(0, np.nan)
+    table['pass_epa'] = table['pass_epa_sum'] / table['pass_epa_plays'].replace(0, np.nan)
+    table['yards_per_carry'] = table['rush_yards'] / table['rush_attempts'].replace(0, np.nan)
+    table['rush_epa'] = table['rush_epa_sum'] / table['rush_epa_plays'].replace(0, np.nan)
+
+    table.index = table.index.astype(str)
+    return table
+
+def team_stats_lookup(table, team):
+    """One team's stats from a prebuilt team table, in the dashboard's dict layout"""
+    if team not in table.index:
+        return {'attempts': 0, 'completions': 0, 'pass_yards': 0, 'pass_tds': 0, 'interceptions': 0,
+                'rush_attempts': 0, 'rush_yards': 0, 'rush_tds': 0}
+
+    row = table.loc[team]
+    stats = {
+        'plays': int(row['plays']),
+        'attempts': int(row['attempts']),
+        'completions': row['completions'],
+        'pass_yards': row['pass_yards'],
+        'pass_tds': row['pass_tds'],
+        'interceptions': row['interceptions'],
+        'rush_attempts': int(row['rush_attempts']),
+        'rush_yards': row['rush_yards'],
+        'rush_tds': row['rush_tds'],
+    }
+
+    # Rate stats only exist when the team has plays of that kind
+    for key in ['completion_pct', 'yards_per_attempt', 'pass_epa', 'yards_per_carry', 'rush_epa']:
+        if pd.notna(row[key]):
+            stats[key] = row[key]
+
+    return stats
+
+def team_epa_table(pbp):
+    """Offensive and defensive EPA for all teams, ranked by offensive EPA/play"""
+    if 'epa' not in pbp.columns:
+        return None
+
+    # Filter for offensive plays only using play_type
+    # Exclude penalties, two-point conversions, and other non-standard plays
+    offensive_plays = pbp[
+        (pbp['play_type'].isin(['pass', 'run'])) &
+        (pbp['posteam'].notna()) &
+        (pbp['epa'].notna()) &
+        ((pbp['penalty'] == 0) | (pbp['penalty'].isna()))
+    ]
+
+    # Filter to regular season only (excludes playoffs, preseason)
+    if 'season_type' in offensive_plays.columns:
+        offensive_plays = offensive_plays[offensive_plays['season_type'] == 'REG']
+
+    # One grouped pass keyed by both teams; offense and defense are sums over either key
+    cells = offensive_plays.groupby(['posteam', 'defteam', 'play_type'], observed=True, dropna=False)['epa'].agg(
+        ['sum', 'count'])
+    offense = cells.groupby(level='posteam', observed=True).sum()
+    defense = cells.groupby(level='defteam', observed=True).sum()
+    defense_by_type = cells.groupby(level=['defteam', 'play_type'], observed=True).sum()
+
+    def per_play(totals):
+        return totals['sum'] / totals['count']
+
+    team_epa = pd.DataFrame({
+        'Team': offense.index.astype(str),
+        'EPA/Play': per_play(offense).values,
+        'Total EPA': offense['sum'].values,
+        'Plays': offense['count'].values,
+    })
+    defense_epa = per_play(defense)
+    defense_epa.index = defense_epa.index.astype(str)
+    defense_by_type = per_play(defense_by_type).unstack('play_type').reindex(columns=['pass', 'run'])
+    defense_by_type.index = defense_by_type.index.astype(str)
+
+    team_epa['Def EPA/Play'] = team_epa['Team'].map(defense_epa)
+    team_epa['Def Pass EPA/Play'] = team_epa['Team'].map(defense_by_type['pass'])
+    team_epa['Def Rush EPA/Play'] = team_epa['Team'].map(defense_by_type['run'])
+    team_epa['Net EPA/Play'] = team_epa['EPA/Play'] - team_epa['Def EPA/Play']
+
+    interval = bootstrap_ci(offensive_plays['epa'], offensive_plays['posteam'].astype(str))
+    team_epa.insert(2, 'CI Low', team_epa['Team'].map(interval['low']))
+    team_epa.insert(3, 'CI High', team_epa['Team'].map(interval['high']))
+
+    team_epa = team_epa.sort_values('EPA/Play', ascending=False)
+    return team_epa
+
+def add_player_ci(leaderboard, plays, player_column, epa_column):
+    """Add bootstrap CI columns after epa_column for the players on a leaderboard"""
+    players = plays[player_column]
+    plays = plays[players.isin(leaderboard['Player'])]
+    interval = bootstrap_ci(plays['epa'], plays[player_column].astype(str))
+    position = leaderboard.columns.get_loc(epa_column) + 1
+    leaderboard.insert(position, 'CI Low', leaderboard['Player'].astype(str).map(interval['low']))
+    leaderboard.insert(position + 1, 'CI High', leaderboard['Player'].astype(str).map(interval['high']))
+
+def qb_leaderboard(pbp, min_attempts=100, top=20):
+    """Top quarterbacks by EPA/play on passing plays"""
+    qb_stats = pbp[pbp['pass'] == 1].groupby('passer_player_name', observed=True).agg({
+        'epa': ['mean', 'count'],
+        'yards_gained': 'sum',
+        'pass_touchdown': 'sum',
+        'interception': 'sum',
+        'complete_pass': 'sum'
+    }).reset_index()
+
+    qb_stats.columns = ['Player', 'EPA/Play', 'Attempts', 'Pass Yards', 'TDs', 'INTs', 'Completions']
+    qb_stats = qb_stats[qb_stats['Attempts'] >= min_attempts].copy()
+    qb_stats['Comp %'] = (qb_stats['Completions'] / qb_stats['Attempts'] * 100).round(1)
+    add_player_ci(qb_stats, pbp[pbp['pass'] == 1], 'passer_player_name', 'EPA/Play')
+    return qb_stats.sort_values('EPA/Play', ascending=False).head(top)
+
+def rb_leaderboard(pbp, min_attempts=50, top=20):
+    """Top running backs by EPA/rush"""
+    rb_stats = pbp[pbp['rush'] == 1].groupby('rusher_player_name', observed=True).agg({
+        'epa': ['mean', 'count'],
+        'yards_gained': 'sum',
+        'rush_touchdown': 'sum'
+    }).reset_index()
+
+    rb_stats.columns = ['Player', 'EPA/Rush', 'Attempts', 'Rush Yards', 'TDs']
+    rb_stats = rb_stats[rb_stats['Attempts'] >= min_attempts].copy()
+    rb_stats['Yards/Carry'] = (rb_stats['Rush Yards'] / rb_stats['Attempts']).round(2)
+    add_player_ci(rb_stats, pbp[pbp['rush'] == 1], 'rusher_player_name', 'EPA/Rush')
+    return rb_stats.sort_values('EPA/Rush', ascending=False).head(top)
+
+def epa_histogram(pbp, play_column, bins=50):
+    """Binned EPA for one play type ('pass' or 'rush'), league-wide and per team
+
+    Returns the bin edges, league counts and a team x bin count table, all
+    from one bincount so the raw EPA values never leave the server.
+    """
+    plays = pbp[pbp[play_column] == 1]
+    epa = plays['epa'].to_numpy(dtype='float64', na_value=np.nan)
+    valid = ~np.isnan(epa)
+    epa = epa[valid]
+
+    edges = np.histogram_bin_edges(epa, bins=bins)
+    # Same bins as np.histogram: right-open, except the last which includes its edge
+    bin_index = np.clip(np.searchsorted(edges, epa, side='right') - 1, 0, bins - 1)
+    league_counts = np.bincount(bin_index, minlength=bins)
+
+    team_codes, teams = pd.factorize(plays['posteam'].to_numpy()[valid])
+    has_team = team_codes >= 0
+    team_counts = np.bincount(team_codes[has_team] * bins + bin_index[has_team],
+                              minlength=len(teams) * bins).reshape(len(teams), bins)
+
+    return edges, league_counts, pd.DataFrame(team_counts, index=pd.Index(teams, dtype=str))
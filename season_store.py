@@ -0,0 +1,139 @@
+"""
+Shared Season Store
+Materializes each season's play-by-play once as an uncompressed Arrow IPC
+(Feather v2) file with the dashboard's lean dtypes. Every process memory-maps
+it, so numeric columns are read zero-copy and replicas share one copy of the
+data through the OS page cache
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+import data_cache
+
+def store_dir():
+    """Directory holding the Arrow season stores"""
+    return data_cache.CACHE_DIR / 'arrow'
+
+def store_path(season):
+    """Arrow IPC file for a season"""
+    return store_dir() / f'pbp_{season}.arrow'
+
+def sorted_dictionary(column):
+    """Dictionary-encode a string column with sorted categories, like astype('category')"""
+    column = column.combine_chunks()
+    categories = pc.unique(column).drop_null()
+    categories = categories.take(pc.sort_indices(categories))
+    return pa.DictionaryArray.from_arrays(pc.index_in(column, value_set=categories), categories)
+
+def lean_table(table):
+    """Apply data_cache.downcast_pbp's dtypes at the Arrow level
+
+    Strings that repeat become dictionaries (categoricals in pandas), 0/1
+    flags int8 with missing as 0 and EPA/WP-style metrics float32. Missing
+    floats are stored as NaN rather than nulls, which is what pandas uses
+    anyway and lets those columns convert without a copy.
+    """
+    columns = []
+    for name, column in zip(table.column_names, table.columns):
+        is_string = pa.types.is_string(column.type) or pa.types.is_large_string(column.type)
+        if name in data_cache.CATEGORY_COLUMNS and is_string:
+            column = sorted_dictionary(column)
+        elif name in data_cache.FLAG_COLUMNS:
+            if pa.types.is_floating(column.type):
+                column = pc.if_else(pc.is_nan(column), 0, column)
+            column = pc.fill_null(column, 0).cast(pa.int8())
+        elif name in data_cache.FLOAT32_COLUMNS:
+            column = pc.fill_null(column.cast(pa.float32()), np.float32(np.nan))
+        elif pa.types.is_floating(column.type):
+            column = pc.fill_null(column, np.nan)
+        columns.append(column)
+    return pa.table(columns, names=table.column_names).combine_chunks()
+
+def build_store(season, offline=None, refresh=False):
+    """Write a season's store from the cached play-by-play, swapping it in atomically
+
+    Processes that already mapped the previous file keep reading it until
+    they reopen; new readers see the new one.
+    """
+    start = time.perf_counter()
+    pbp_path = data_cache.ensure_cached('pbp', season, offline=offline, refresh=refresh)
+    table = lean_table(pq.read_table(pbp_path))
+
+    # Uncompressed, one chunk per column, so readers can map buffers directly.
+    # The temporary name is per process and thread, so concurrent builds don't collide.
+    path = store_path(season)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = data_cache.temporary_path(path)
+    with pa.OSFile(str(tmp_path), 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, path)
+
+    print(f"✅ Season store for {season}: {table.num_rows:,} plays, "
+          f"{path.stat().st_size / 1024 ** 2:.1f} MB in {time.perf_counter() - start:.1f}s")
+    return path
+
+def ensure_store(season, offline=None, refresh=False):
+    """Build the store if it is missing or older than the cached play-by-play
+
+    Only one thread or process rebuilds it; the rest wait and reuse its file,
+    so the store (and its version) is swapped once per refresh.
+    """
+    path = store_path(season)
+    pbp_path = data_cache.ensure_cached('pbp', season, offline=offline, refresh=refresh)
+
+    def stale():
+        return not path.exists() or path.stat().st_mtime < pbp_path.stat().st_mtime
+
+    if refresh or stale():
+        requested = time.time()
+        with data_cache.refresh_lock(path):
+            rebuilt = path.exists() and path.stat().st_mtime >= requested
+            if not rebuilt and (refresh or stale()):
+                build_store(season, offline=offline)
+    return path
+
+def store_version(season, offline=None):
+    """Identifies the current store file, so caches can tell when it was swapped"""
+    return ensure_store(season, offline=offline).stat().st_mtime_ns
+
+def load_store(season, columns=None, offline=None, refresh=False):
+    """Season play-by-play as a pandas frame backed by the memory-mapped store
+
+    Numeric columns point straight into the mapped file; only the columns
+    asked for are touched. The frame is read-only on purpose, since mapped
+    Arrow buffers cannot be made writable: writing values in place (e.g.
+    frame.loc[i, column] = x) raises ValueError. Adding or replacing whole
+    columns is fine; call .copy() first to change values.
+    """
+    path = ensure_store(season, offline=offline, refresh=refresh)
+    table = pa.ipc.open_file(pa.memory_map(str(path), 'r')).read_all()
+
+    # Older seasons may lack newer columns - read whatever is available
+    if columns is not None:
+        table = table.select([column for column in columns if column in table.column_names])
+
+    # split_blocks keeps each column in its own block instead of copying into 2D blocks
+    return table.to_pandas(split_blocks=True)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Materialize memory-mappable Arrow season stores')
+    parser.add_argument('--seasons', type=int, nargs='+', default=[2025, 2024, 2023, 2022, 2021, 2020])
+    parser.add_argument('--offline', action='store_true',
+                        help='Only read from the local cache, never download')
+    parser.add_argument('--refresh', action='store_true',
+                        help='Download fresh data and rebuild even if the store is up to date')
+    args = parser.parse_args()
+
+    for season in args.seasons:
+        if args.refresh:
+            build_store(season, offline=args.offline or None, refresh=True)
+        else:
+            ensure_store(season, offline=args.offline or None)
@@ -0,0 +1,280 @@
+"""
+Situational Split Cube
+Per-season cube of EPA and success counts by down, distance, field zone,
+quarter, score differential and win probability, for every team (offense and
+defense) and player, with the league and single-dimension rollups precomputed.
+Any combination of slices is answered by summing cube cells, not by
+rescanning plays
+"""
+
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+import data_cache
+import fetch_nfl_data as export
+
+CUBE_COLUMNS = [
+    *export.EXPORT_COLUMNS, 'success',
+    'down', 'ydstogo', 'yardline_100', 'qtr', 'score_differential', 'wp',
+]
+
+# Dimension -> (play-by-play column, bucket edges, bucket labels); buckets are right-closed
+DIMENSIONS = {
+    'down': ('down', [0, 1, 2, 3, 4], ['1', '2', '3', '4']),
+    'distance': ('ydstogo', [0, 3, 6, 10, np.inf], ['short', 'medium', 'long', 'very_long']),
+    'field': ('yardline_100', [0, 20, 50, 80, 100], ['red_zone', 'opp', 'own', 'own_deep']),
+    'quarter': ('qtr', [0, 1, 2, 3, 4, np.inf], ['1', '2', '3', '4', 'OT']),
+    'score': ('score_differential', [-np.inf, -9, -1, 0, 8, np.inf],
+              ['down_9+', 'down_1_8', 'tied', 'up_1_8', 'up_9+']),
+    'wp': ('wp', [0, 0.2, 0.4, 0.6, 0.8, 1], ['0-20', '20-40', '40-60', '60-80', '80-100']),
+}
+
+SIDES = ['offense', 'defense']
+STATS = ['count', 'sum', 'sumsq', 'success']
+
+SITUATION_SHAPE = tuple(len(labels) for _, _, labels in DIMENSIONS.values())
+
+def cube_path(season):
+    """Path of a season's situational cube"""
+    return data_cache.CACHE_DIR / 'cubes' / f'situations_{season}.npz'
+
+def situation_cells(plays):
+    """Flat situation index of every play, -1 where a situation field is missing"""
+    codes = []
+    for column, edges, labels in DIMENSIONS.values():
+        codes.append(pd.cut(plays[column].astype('float64'), edges, labels=False,
+                            include_lowest=True).to_numpy(dtype='float64', na_value=np.nan))
+    codes = np.stack(codes)
+    known = ~np.isnan(codes).any(axis=0)
+
+    cells = np.full(len(plays), -1, dtype='int64')
+    cells[known] = np.ravel_multi_index(codes[:, known].astype('int64'), SITUATION_SHAPE)
+    return cells
+
+def cell_stats(cells, epa, success, size):
+    """(size, stat) array of play count, EPA sum, EPA sum of squares and successes per cell"""
+    return np.stack([
+        np.bincount(cells, minlength=size),
+        np.bincount(cells, weights=epa, minlength=size),
+        np.bincount(cells, weights=epa * epa, minlength=size),
+        np.bincount(cells, weights=success, minlength=size),
+    ], axis=-1)
+
+def build_player_cells(plays, cells):
+    """Non-empty situation cells per player and role, sorted by player
+
+    Stored sparse: for each role the sorted player ids, their names, offsets
+    into the cell list and the stats of each of their cells.
+    """
+    player_plays = export.build_player_plays(plays.assign(cell=cells), keys=['cell', 'success'])
+    player_plays = player_plays[player_plays['cell'] >= 0]
+
+    stored = {}
+    for role in export.ROLE_PLAYER_PREFIX:
+        rows = player_plays[player_plays['role'] == role]
+        grouped = pd.DataFrame({
+            'player_id': rows['player_id'].astype(str),
+            'cell': rows['cell'].astype('int64'),
+            'count': 1.0,
+            'sum': rows['epa'],
+            'sumsq': rows['epaSq'],
+            'success': rows['success'].fillna(0),
+        }).groupby(['player_id', 'cell'], sort=True)[STATS].sum()
+
+        players, counts = np.unique(grouped.index.get_level_values('player_id').to_numpy(dtype=str),
+                                    return_counts=True)
+        names = rows.groupby(rows['player_id'].astype(str))['player_name'].last()
+        stored[f'players_{role}'] = players
+        stored[f'names_{role}'] = names.reindex(players).to_numpy(dtype=str)
+        stored[f'offsets_{role}'] = np.concatenate([[0], np.cumsum(counts)])
+        stored[f'cells_{role}'] = grouped.index.get_level_values('cell').to_numpy()
+        stored[f'stats_{role}'] = grouped.to_numpy()
+    return stored
+
+def build_cube(pbp):
+    """Situational cube of shape (side, team, *situation, stat) plus rollups
+
+    Regular-season pass and run plays only; plays missing any situation
+    field (e.g. no down on two-point tries) are left out.
+    """
+    plays = export.filter_offensive_plays(pbp)
+    plays = plays[plays['posteam'].notna() & plays['defteam'].notna()]
+    if 'season_type' in plays.columns:
+        plays = plays[plays['season_type'] == 'REG']
+
+    cells = situation_cells(plays)
+    plays, cells = plays[cells >= 0], cells[cells >= 0]
+
+    teams = np.array(sorted(set(plays['posteam'].astype(str)) | set(plays['defteam'].astype(str))))
+    team_index = pd.Index(teams)
+    offense = team_index.get_indexer(plays['posteam'].astype(str))
+    defense = team_index.get_indexer(plays['defteam'].astype(str))
+    epa = plays['epa'].to_numpy(dtype='float64')
+    success = plays['success'].to_numpy(dtype='float64', na_value=0)
+
+    # One flat bin per (side, team, situation); bincount fills every cell at once
+    n_situations = int(np.prod(SITUATION_SHAPE))
+    size = len(SIDES) * len(teams) * n_situations
+    flat = np.concatenate([offense * n_situations + cells,
+                           (len(teams) + defense) * n_situations + cells])
+    cube = cell_stats(flat, np.concatenate([epa, epa]), np.concatenate([success, success]), size)
+    cube = cube.reshape(len(SIDES), len(teams), *SITUATION_SHAPE, len(STATS))
+
+    stored = {'cube': cube, 'teams': teams, 'league': cube[0].sum(axis=0)}
+
+    # Single-dimension rollups: (side, team, bucket, stat) and league (bucket, stat)
+    for axis, dimension in enumerate(DIMENSIONS):
+        others = tuple(2 + other for other in range(len(DIMENSIONS)) if other != axis)
+        stored[f'marginal_{dimension}'] = cube.sum(axis=others)
+        stored[f'league_{dimension}'] = stored[f'marginal_{dimension}'][0].sum(axis=0)
+
+    stored.update(build_player_cells(plays, cells))
+    return stored
+
+def save_cube(cube, season):
+    """Write a cube with its labels and rollups"""
+    path = cube_path(season)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = data_cache.temporary_path(path)
+    with open(tmp_path, 'wb') as f:
+        np.savez_compressed(f, **cube)
+    os.replace(tmp_path, path)
+
+def load_cube(season, offline=None, refresh=False, rebuild=False):
+    """Season cube, rebuilt when missing or older than the cached play-by-play"""
+    path = cube_path(season)
+    pbp_path = data_cache.ensure_cached('pbp', season, offline=offline, refresh=refresh)
+
+    if rebuild or not path.exists() or path.stat().st_mtime < pbp_path.stat().st_mtime:
+        pbp = data_cache.load_pbp(season, columns=CUBE_COLUMNS, offline=offline)
+        cube = build_cube(pbp)
+        save_cube(cube, season)
+        return cube
+
+    with np.load(path) as stored:
+        return {name: stored[name] for name in stored.files}
+
+def player_situations(cube, player, role='pass'):
+    """Dense (*situation, stat) array for one player (gsis_id or name) in a role"""
+    players = cube[f'players_{role}']
+    position = np.searchsorted(players, player)
+    if position == len(players) or players[position] != player:
+        matches = np.flatnonzero(cube[f'names_{role}'] == player)
+        if len(matches) == 0:
+            raise ValueError(f"No {role} plays for {player}")
+        position = matches[0]
+
+    start, stop = cube[f'offsets_{role}'][position:position + 2]
+    values = np.zeros((int(np.prod(SITUATION_SHAPE)), len(STATS)))
+    values[cube[f'cells_{role}'][start:stop]] = cube[f'stats_{role}'][start:stop]
+    return values.reshape(*SITUATION_SHAPE, len(STATS))
+
+def situations(cube, team=None, side='offense', player=None, role='pass'):
+    """(*situation, stat) array for the league, one team or one player"""
+    if player is not None:
+        return player_situations(cube, player, role)
+    if team is None:
+        return cube['league']
+
+    team_position = np.flatnonzero(cube['teams'] == team)
+    if len(team_position) == 0:
+        raise ValueError(f"Unknown team: {team}")
+    return cube['cube'][SIDES.index(side), team_position[0]]
+
+def bucket_index(dimension, labels):
+    """Positions of bucket labels along a dimension"""
+    if dimension not in DIMENSIONS:
+        raise ValueError(f"Unknown dimension: {dimension} (choose from {', '.join(DIMENSIONS)})")
+    known = DIMENSIONS[dimension][2]
+    unknown = [label for label in labels if label not in known]
+    if unknown:
+        raise ValueError(f"Unknown {dimension} buckets: {', '.join(unknown)} (choose from {', '.join(known)})")
+    return [known.index(label) for label in labels]
+
+def query(cube, where=None, by=(), team=None, side='offense', player=None, role='pass'):
+    """EPA and success rate for a slice of situations, broken out by some dimensions
+
+    where maps dimensions to the bucket labels to keep, e.g.
+    {'down': ['3'], 'distance': ['long', 'very_long']}; by lists the
+    dimensions to group on. Single-dimension questions for the league or a
+    team read the precomputed rollups; everything else sums cube cells.
+    """
+    where = where or {}
+    by = list(by)
+    for dimension in by:
+        bucket_index(dimension, [])
+
+    if not where and len(by) == 1 and player is None:
+        # Precomputed rollup
+        if team is None:
+            values = cube[f'league_{by[0]}']
+        else:
+            team_position = np.flatnonzero(cube['teams'] == team)
+            if len(team_position) == 0:
+                raise ValueError(f"Unknown team: {team}")
+            values = cube[f'marginal_{by[0]}'][SIDES.index(side), team_position[0]]
+    else:
+        values = situations(cube, team, side, player, role)
+        for axis, dimension in enumerate(DIMENSIONS):
+            if dimension in where:
+                values = np.take(values, bucket_index(dimension, where[dimension]), axis=axis)
+        values = values.sum(axis=tuple(axis for axis, dimension in enumerate(DIMENSIONS)
+                                       if dimension not in by))
+
+    # One row per combination of the grouped dimensions' (kept) buckets
+    labels = [[label for label in DIMENSIONS[dimension][2]
+               if dimension not in where or label in where[dimension]] for dimension in DIMENSIONS
+              if dimension in by]
+    values = values.reshape(-1, len(STATS))
+    index = pd.MultiIndex.from_product(labels, names=[d for d in DIMENSIONS if d in by]) if by else [0]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        table = pd.DataFrame({
+            'plays': values[:, 0].astype('int64'),
+            'epaPerPlay': values[:, 1] / values[:, 0],
+            'totalEPA': values[:, 1],
+            'successRate': values[:, 3] / values[:, 0],
+        }, index=index)
+    return table.reset_index() if by else table.reset_index(drop=True)
+
+def parse_where(items):
+    """Parse DIMENSION=LABEL[,LABEL...] arguments"""
+    where = {}
+    for item in items:
+        dimension, _, labels = item.partition('=')
+        if not labels:
+            raise ValueError(f"Expected DIMENSION=LABEL[,LABEL...], got {item}")
+        where[dimension] = labels.split(',')
+        bucket_index(dimension, where[dimension])
+    return where
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Query situational EPA splits from a season cube')
+    parser.add_argument('--season', type=int, default=export.SEASONS[0])
+    parser.add_argument('--where', nargs='*', default=[], metavar='DIMENSION=LABEL[,LABEL]',
+                        help=f"Buckets to keep; dimensions: {', '.join(DIMENSIONS)}")
+    parser.add_argument('--by', nargs='*', default=[], choices=list(DIMENSIONS),
+                        help='Dimensions to break the result out by')
+    parser.add_argument('--team', help='Team abbreviation (default: whole league)')
+    parser.add_argument('--side', choices=SIDES, default='offense')
+    parser.add_argument('--player', help='Player gsis_id or name')
+    parser.add_argument('--role', choices=list(export.ROLE_PLAYER_PREFIX), default='pass')
+    parser.add_argument('--offline', action='store_true',
+                        help='Only read from the local cache, never download')
+    parser.add_argument('--rebuild', action='store_true',
+                        help='Rebuild the cube even if it is up to date')
+    args = parser.parse_args()
+
+    try:
+        where = parse_where(args.where)
+        cube = load_cube(args.season, offline=args.offline or None, rebuild=args.rebuild)
+        table = query(cube, where=where, by=args.by, team=args.team, side=args.side,
+                      player=args.player, role=args.role)
+    except ValueError as e:
+        print(f"❌ {e}")
+        raise SystemExit(1)
+
+    print(table.to_string(index=False, float_format=lambda value: f'{value:.3f}'))
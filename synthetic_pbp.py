@@ -0,0 +1,297 @@
+"""
+Synthetic Play-by-Play Generator
+Builds nflverse-shaped play-by-play and roster data offline, for benchmarks and
+for trying the scripts without network access
+"""
+
+import argparse
+
+import numpy as np
+import pandas as pd
+
+import data_cache
+
+TEAMS = ['ARI', 'ATL', 'BAL', 'BUF', 'CAR', 'CHI', 'CIN', 'CLE',
+         'DAL', 'DEN', 'DET', 'GB', 'HOU', 'IND', 'JAX', 'KC',
+         'LA', 'LAC', 'LV', 'MIA', 'MIN', 'NE', 'NO', 'NYG',
+         'NYJ', 'PHI', 'PIT', 'SEA', 'SF', 'TB', 'TEN', 'WAS']
+
+# Skill players per team; the first of each position gets most of the snaps
+ROSTER_SLOTS = {'QB': 2, 'RB': 3, 'WR': 5, 'TE': 3}
+
+# Share of all play-by-play rows by play type (None = timeouts, quarter ends)
+PLAY_TYPE_SHARES = {
+    'pass': 0.40, 'run': 0.29, 'no_play': 0.07, 'kickoff': 0.05, 'punt': 0.045,
+    'extra_point': 0.025, 'field_goal': 0.02, 'qb_kneel': 0.01, 'qb_spike': 0.002,
+    None: 0.088,
+}
+
+PLAYS_PER_GAME = 172
+REGULAR_SEASON_WEEKS = 18
+PLAYOFF_GAMES = [6, 4, 2, 1]
+
+LAST_NAMES = ['Smith', 'Johnson', 'Williams', 'Brown', 'Jones', 'Miller', 'Davis', 'Wilson',
+              'Moore', 'Taylor', 'Thomas', 'Jackson', 'White', 'Harris', 'Martin', 'Allen',
+              'Young', 'Hill', 'Scott', 'Green', 'Adams', 'Baker', 'Nelson', 'Carter',
+              'Mitchell', 'Roberts', 'Turner', 'Phillips', 'Campbell', 'Parker', 'Evans', 'Edwards']
+
+def generate_rosters(seed=0):
+    """Skill-position roster for every team (gsis_id, full_name, position, team)"""
+    rng = np.random.default_rng(seed)
+    rows = []
+    player_number = 0
+    for team in TEAMS:
+        for position, count in ROSTER_SLOTS.items():
+            for depth in range(count):
+                player_number += 1
+                # Abbreviated names collide across teams, just like the real data
+                name = f"{chr(65 + rng.integers(0, 26))}.{LAST_NAMES[rng.integers(0, len(LAST_NAMES))]}"
+                rows.append({
+                    'gsis_id': f'00-00{player_number:05d}',
+                    'full_name': name,
+                    'position': position,
+                    'team': team,
+                    'depth': depth,
+                })
+    return pd.DataFrame(rows)
+
+def generate_schedule(season, rng):
+    """Regular season and playoff games for one season"""
+    games = []
+    for week in range(1, REGULAR_SEASON_WEEKS + 1):
+        order = rng.permutation(len(TEAMS))
+        # Two teams on bye each week keeps the total close to 272 games
+        if week <= 16:
+            order = order[:-2]
+        for home, away in zip(order[::2], order[1::2]):
+            games.append((season, week, 'REG', TEAMS[home], TEAMS[away]))
+
+    for round_number, count in enumerate(PLAYOFF_GAMES):
+        order = rng.permutation(len(TEAMS))[:count * 2]
+        for home, away in zip(order[::2], order[1::2]):
+            games.append((season, REGULAR_SEASON_WEEKS + 1 + round_number, 'POST', TEAMS[home], TEAMS[away]))
+
+    schedule = pd.DataFrame(games, columns=['season', 'week', 'season_type', 'home_team', 'away_team'])
+    schedule['game_id'] = (schedule['season'].astype(str) + '_' + schedule['week'].map('{:02d}'.format) +
+                           '_' + schedule['away_team'] + '_' + schedule['home_team'])
+    return schedule
+
+def pick_players(rng, team_idx, weights, rosters_by_slot):
+    """Choose a player per play from the offense's depth chart"""
+    n = len(team_idx)
+    slot_names = list(weights)
+    slot = rng.choice(len(slot_names), size=n, p=list(weights.values()))
+    ids = np.empty(n, dtype=object)
+    names = np.empty(n, dtype=object)
+    for i, key in enumerate(slot_names):
+        mask = slot == i
+        position, depth = key
+        table = rosters_by_slot[(position, depth)]
+        ids[mask] = table['gsis_id'][team_idx[mask]]
+        names[mask] = table['full_name'][team_idx[mask]]
+    return ids, names
+
+def generate_season(season=2024, n_plays=None, rosters=None, seed=0):
+    """Synthetic play-by-play for one season
+
+    n_plays rescales the season to roughly that many rows by scaling
+    the number of plays per game.
+    """
+    rng = np.random.default_rng([seed, season])
+    if rosters is None:
+        rosters = generate_rosters(seed)
+
+    schedule = generate_schedule(season, rng)
+    plays_per_game = PLAYS_PER_GAME if n_plays is None else max(1, n_plays // len(schedule))
+    game_sizes = rng.poisson(plays_per_game, size=len(schedule)).clip(min=1)
+    game_idx = np.repeat(np.arange(len(schedule)), game_sizes)
+    n = len(game_idx)
+
+    # Position within the game drives the clock, quarter and win probability
+    starts = np.repeat(np.cumsum(game_sizes) - game_sizes, game_sizes)
+    play_number = np.arange(n) - starts
+    progress = play_number / np.repeat(game_sizes, game_sizes)
+    game_seconds_remaining = np.round(3600 * (1 - progress)).astype('float64')
+    qtr = np.minimum(4, 1 + (progress * 4).astype(int)).astype('float64')
+
+    home = schedule['home_team'].to_numpy()[game_idx]
+    away = schedule['away_team'].to_numpy()[game_idx]
+    home_has_ball = rng.random(n) < 0.5
+    posteam = np.where(home_has_ball, home, away)
+    defteam = np.where(home_has_ball, away, home)
+
+    play_types = list(PLAY_TYPE_SHARES)
+    play_type_idx = rng.choice(len(play_types), size=n, p=list(PLAY_TYPE_SHARES.values()))
+    play_type = np.array(play_types, dtype=object)[play_type_idx]
+    is_pass = play_type == 'pass'
+    is_run = play_type == 'run'
+    no_type = pd.isna(play_type)
+
+    # Passing plays: sacks, completions, interceptions and touchdowns
+    sack = is_pass & (rng.random(n) < 0.07)
+    thrown = is_pass & ~sack
+    interception = thrown & (rng.random(n) < 0.023)
+    complete = thrown & ~interception & (rng.random(n) < 0.66)
+    air_yards = np.where(thrown, np.round(rng.normal(8, 9, n)).clip(-5, 60), np.nan)
+    yac = np.round(rng.exponential(5, n))
+    pass_yards = np.where(complete, np.maximum(air_yards, 0) + yac, 0)
+    pass_td = complete & (rng.random(n) < 0.045)
+
+    # Running plays
+    rush_yards = np.round(rng.normal(4.3, 6, n)).clip(-8, 80)
+    rush_td = is_run & (rng.random(n) < 0.03)
+    scramble = is_run & (rng.random(n) < 0.06)
+
+    yards_gained = np.select(
+        [complete, thrown, sack, is_run],
+        [pass_yards, 0, -np.round(rng.exponential(6, n)), rush_yards],
+        default=np.nan,
+    )
+    yards_gained[no_type] = np.nan
+
+    # Penalties: accepted penalties on no_play rows, plus some on live plays
+    penalty = np.where(play_type == 'no_play', 1.0, (rng.random(n) < 0.03).astype('float64'))
+    penalty[no_type] = np.nan
+
+    # EPA follows the outcome of the play
+    epa = np.select(
+        [pass_td, complete, interception, sack, thrown, rush_td, is_run],
+        [rng.normal(3.6, 0.9, n), rng.normal(0.7, 1.1, n), rng.normal(-3.6, 1.0, n),
+         rng.normal(-1.7, 0.8, n), rng.normal(-0.65, 0.4, n), rng.normal(3.0, 0.9, n),
+         rng.normal(-0.1, 0.9, n)],
+        default=rng.normal(0, 0.7, n),
+    )
+    epa[no_type] = np.nan
+    wpa = epa * 0.025 * (1 + progress * 2)
+
+    # Win probability drifts with the home team's cumulative EPA as the clock runs down
+    home_sign = np.where(home_has_ball, 1.0, -1.0)
+    home_epa = np.nan_to_num(epa * home_sign)
+    cumulative = np.cumsum(home_epa)
+    home_margin = cumulative - np.repeat(np.concatenate([[0], cumulative[np.cumsum(game_sizes)[:-1] - 1]]),
+                                         game_sizes)
+    home_wp = 1 / (1 + np.exp(-home_margin * 0.05 * (1 + 3 * progress)))
+    wp = np.where(home_has_ball, home_wp, 1 - home_wp)
+    score_differential = np.round(home_margin * home_sign).astype('float64')
+
+    # Players, picked from each offense's depth chart
+    rosters_by_slot = {
+        (position, depth): rosters[(rosters['position'] == position) & (rosters['depth'] == depth)]
+        .set_index('team').reindex(TEAMS)[['gsis_id', 'full_name']].to_dict('list')
+        for position, count in ROSTER_SLOTS.items() for depth in range(count)
+    }
+    rosters_by_slot = {key: {col: np.array(values, dtype=object) for col, values in table.items()}
+                       for key, table in rosters_by_slot.items()}
+    team_idx = pd.Index(TEAMS).get_indexer(posteam)
+
+    passer_id, passer_name = pick_players(
+        rng, team_idx, {('QB', 0): 0.95, ('QB', 1): 0.05}, rosters_by_slot)
+    receiver_id, receiver_name = pick_players(
+        rng, team_idx,
+        {('WR', 0): 0.22, ('WR', 1): 0.18, ('WR', 2): 0.12, ('WR', 3): 0.05, ('WR', 4): 0.03,
+         ('TE', 0): 0.15, ('TE', 1): 0.05, ('TE', 2): 0.02,
+         ('RB', 0): 0.12, ('RB', 1): 0.05, ('RB', 2): 0.01},
+        rosters_by_slot)
+    rusher_id, rusher_name = pick_players(
+        rng, team_idx,
+        {('RB', 0): 0.55, ('RB', 1): 0.25, ('RB', 2): 0.05, ('QB', 0): 0.10, ('WR', 0): 0.03,
+         ('WR', 1): 0.02},
+        rosters_by_slot)
+    rusher_id[scramble] = passer_id[scramble]
+    rusher_name[scramble] = passer_name[scramble]
+
+    has_target = thrown & (rng.random(n) < 0.97)
+
+    down = rng.choice([1.0, 2.0, 3.0, 4.0], size=n, p=[0.44, 0.32, 0.2, 0.04])
+    ydstogo = np.where(down == 1, 10.0, rng.integers(1, 16, n).astype('float64'))
+    cpoe = np.where(thrown & has_target, np.clip(rng.normal(0, 45, n), -100, 100), np.nan)
+
+    def flag(mask):
+        values = mask.astype('float64')
+        values[no_type] = np.nan
+        return values
+
+    schedule_cols = schedule.iloc[game_idx].reset_index(drop=True)
+    pbp = pd.DataFrame({
+        'play_id': play_number + 1,
+        'game_id': schedule_cols['game_id'],
+        'season': season,
+        'week': schedule_cols['week'].astype('int32'),
+        'season_type': schedule_cols['season_type'],
+        'home_team': home,
+        'away_team': away,
+        'posteam': np.where(no_type, None, posteam),
+        'defteam': np.where(no_type, None, defteam),
+        'play_type': play_type,
+        'qtr': qtr,
+        'down': np.where(is_pass | is_run, down, np.nan),
+        'ydstogo': np.where(is_pass | is_run, ydstogo, np.nan),
+        'yardline_100': rng.integers(1, 100, n).astype('float64'),
+        'game_seconds_remaining': game_seconds_remaining,
+        'score_differential': score_differential,
+        'yards_gained': yards_gained,
+        'epa': epa,
+        'wp': wp,
+        'home_wp': home_wp,
+        'wpa': wpa,
+        'success': flag(epa > 0),
+        'pass': flag(is_pass | scramble),
+        'rush': flag(is_run & ~scramble),
+        'pass_attempt': flag(is_pass),
+        'rush_attempt': flag(is_run),
+        'complete_pass': flag(complete),
+        'incomplete_pass': flag(thrown & ~complete & ~interception),
+        'interception': flag(interception),
+        'sack': flag(sack),
+        'qb_scramble': flag(scramble),
+        'touchdown': flag(pass_td | rush_td),
+        'pass_touchdown': flag(pass_td),
+        'rush_touchdown': flag(rush_td),
+        'penalty': penalty,
+        'air_yards': air_yards,
+        'cpoe': cpoe,
+        'passing_yards': np.where(complete, pass_yards, np.nan),
+        'receiving_yards': np.where(complete & has_target, pass_yards, np.nan),
+        'rushing_yards': np.where(is_run, rush_yards, np.nan),
+        'passer_player_id': np.where(is_pass, passer_id, None),
+        'passer_player_name': np.where(is_pass, passer_name, None),
+        'receiver_player_id': np.where(has_target, receiver_id, None),
+        'receiver_player_name': np.where(has_target, receiver_name, None),
+        'rusher_player_id': np.where(is_run, rusher_id, None),
+        'rusher_player_name': np.where(is_run, rusher_name, None),
+    })
+
+    return pbp
+
+def generate_pbp(seasons=1, n_plays=None, first_season=2000, seed=0):
+    """Synthetic play-by-play spanning several seasons in one frame
+
+    n_plays is the approximate number of rows per season.
+    """
+    rosters = generate_rosters(seed)
+    frames = [generate_season(first_season + i, n_plays=n_plays, rosters=rosters, seed=seed)
+              for i in range(seasons)]
+    return pd.concat(frames, ignore_index=True)
+
+def write_to_cache(pbp, rosters, season, cache_dir=None):
+    """Write synthetic data where data_cache expects a downloaded season"""
+    if cache_dir is not None:
+        data_cache.CACHE_DIR = cache_dir
+    data_cache.CACHE_DIR.mkdir(parents=True, exist_ok=True)
+
+    pbp.to_parquet(data_cache.cache_path('pbp', season), index=False)
+    rosters.drop(columns=['depth']).to_parquet(data_cache.cache_path('rosters', season), index=False)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Write synthetic seasons into the local data cache')
+    parser.add_argument('--seasons', type=int, nargs='+', default=[2024])
+    parser.add_argument('--plays', type=int, default=None,
+                        help='Approximate rows per season (default: real-season size)')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rosters = generate_rosters(args.seed)
+    for season in args.seasons:
+        pbp = generate_season(season, n_plays=args.plays, rosters=rosters, seed=args.seed)
+        write_to_cache(pbp, rosters, season)
+        print(f"✅ Wrote synthetic {season} season ({len(pbp):,} plays) to {data_cache.CACHE_DIR}")
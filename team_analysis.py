@@ -3,72 +3,101 @@ Team Performance Analysis
 Analyze offensive and defensive performance by team
 """
 
-import nflreadpy as nfl
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 
+import data_cache
+import season_stats
+
+# Play-by-play columns used by the team analysis
+TEAM_COLUMNS = [
+    'posteam', 'defteam', 'play_type', 'pass', 'rush', 'epa', 'yards_gained',
+    'complete_pass', 'pass_touchdown', 'rush_touchdown', 'interception',
+]
+
 def load_and_prepare_data(season=2024):
     """Load play-by-play data and prepare for analysis"""
     print(f"Loading {season} season data...")
-    pbp = nfl.load_pbp(season)
+    pbp = data_cache.load_pbp(season, columns=TEAM_COLUMNS)
     return pbp
 
-def analyze_team_offense(pbp, team_abbr):
-    """Analyze a team's offensive performance"""
-    team_offense = pbp[pbp['posteam'] == team_abbr].copy()
+def analyze_team_offense(pbp, team_abbr, team_table=None):
+    """Analyze a team's offensive performance
+
+    Pass a prebuilt season_stats.build_team_stats_table() to analyze many
+    teams without rescanning the play-by-play for each one.
+    """
+    if team_table is None:
+        team_table = season_stats.build_team_stats_table(pbp)
+    stats = season_stats.team_stats_lookup(team_table, team_abbr)
 
     print(f"\n{'='*60}")
     print(f"{team_abbr} OFFENSIVE STATS")
     print(f"{'='*60}")
 
     # Overall stats
-    total_plays = len(team_offense)
-    print(f"Total plays: {total_plays:,}")
+    print(f"Total plays: {stats.get('plays', 0):,}")
 
     # Passing stats
-    passes = team_offense[team_offense['pass'] == 1]
-    if len(passes) > 0:
+    if stats['attempts'] > 0:
         print(f"\nPassing:")
-        print(f"  Attempts: {len(passes):,}")
-        print(f"  Completions: {passes['complete_pass'].sum():,}")
-        print(f"  Completion %: {(passes['complete_pass'].sum() / len(passes) * 100):.1f}%")
-        print(f"  Total yards: {passes['yards_gained'].sum():,}")
-        print(f"  Yards/attempt: {passes['yards_gained'].mean():.2f}")
-        print(f"  TDs: {passes['pass_touchdown'].sum()}")
-        print(f"  INTs: {passes['interception'].sum()}")
+        print(f"  Attempts: {stats['attempts']:,}")
+        print(f"  Completions: {stats['completions']:,}")
+        print(f"  Completion %: {stats['completion_pct']:.1f}%")
+        print(f"  Total yards: {stats['pass_yards']:,}")
+        print(f"  Yards/attempt: {stats['yards_per_attempt']:.2f}")
+        print(f"  TDs: {stats['pass_tds']}")
+        print(f"  INTs: {stats['interceptions']}")
 
-        if 'epa' in passes.columns:
-            print(f"  EPA/play: {passes['epa'].mean():.3f}")
+        if 'pass_epa' in stats:
+            print(f"  EPA/play: {stats['pass_epa']:.3f}")
 
     # Rushing stats
-    rushes = team_offense[team_offense['rush'] == 1]
-    if len(rushes) > 0:
+    if stats['rush_attempts'] > 0:
         print(f"\nRushing:")
-        print(f"  Attempts: {len(rushes):,}")
-        print(f"  Total yards: {rushes['yards_gained'].sum():,}")
-        print(f"  Yards/attempt: {rushes['yards_gained'].mean():.2f}")
-        print(f"  TDs: {rushes['rush_touchdown'].sum()}")
+        print(f"  Attempts: {stats['rush_attempts']:,}")
+        print(f"  Total yards: {stats['rush_yards']:,}")
+        print(f"  Yards/attempt: {stats['yards_per_carry']:.2f}")
+        print(f"  TDs: {stats['rush_tds']}")
 
-        if 'epa' in rushes.columns:
-            print(f"  EPA/play: {rushes['epa'].mean():.3f}")
+        if 'rush_epa' in stats:
+            print(f"  EPA/play: {stats['rush_epa']:.3f}")
 
-    return team_offense
+    return stats
 
 def compare_all_teams(pbp):
-    """Compare offensive efficiency across all teams"""
+    """Compare offensive and defensive efficiency across all teams"""
     print(f"\n{'='*60}")
     print("ALL TEAMS OFFENSIVE EFFICIENCY (EPA)")
     print(f"{'='*60}")
 
     # Calculate EPA by team
     if 'epa' in pbp.columns:
-        team_epa = pbp.groupby('posteam')['epa'].agg(['mean', 'sum', 'count'])
-        team_epa = team_epa.sort_values('mean', ascending=False)
-        team_epa.columns = ['EPA/Play', 'Total EPA', 'Plays']
+        # One grouped pass keyed by both teams; defense sums the same cells by defteam
+        plays = pbp[pbp['posteam'].notna()]
+        cells = plays.groupby(['posteam', 'defteam', 'play_type'], dropna=False)['epa'].agg(['sum', 'count'])
+        offense = cells.groupby(level='posteam').sum()
+        defense = cells.groupby(level='defteam').sum()
+        defense_by_type = cells.groupby(level=['defteam', 'play_type']).sum()
+        defense_by_type = (defense_by_type['sum'] / defense_by_type['count']).unstack('play_type')
+
+        team_epa = pd.DataFrame({
+            'EPA/Play': offense['sum'] / offense['count'],
+            'Total EPA': offense['sum'],
+            'Plays': offense['count'],
+        })
+        team_epa['Def EPA/Play'] = defense['sum'] / defense['count']
+        team_epa['Def Pass EPA/Play'] = defense_by_type.get('pass')
+        team_epa['Def Rush EPA/Play'] = defense_by_type.get('run')
+        team_epa['Net EPA/Play'] = team_epa['EPA/Play'] - team_epa['Def EPA/Play']
+        team_epa = team_epa.sort_values('EPA/Play', ascending=False)
 
         print("\nTop 10 Offenses by EPA/Play:")
-        print(team_epa.head(10))
+        print(team_epa[['EPA/Play', 'Total EPA', 'Plays']].head(10))
+
+        print("\nTop 10 Defenses by EPA/Play allowed:")
+        print(team_epa[['Def EPA/Play', 'Def Pass EPA/Play', 'Def Rush EPA/Play']].nsmallest(10, 'Def EPA/Play'))
 
         return team_epa
     else:
@@ -0,0 +1,144 @@
+"""
+Team x Week x Play-Type Cube
+Dense per-season array of EPA count, sum and sum of squares for every team,
+week, play type and side of the ball, so weekly trends, rolling averages and
+week ranges are array slices instead of group-bys over raw plays
+"""
+
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+import data_cache
+import fetch_nfl_data as export
+
+CUBE_COLUMNS = ['week', 'play_type', 'posteam', 'defteam', 'epa', 'penalty']
+
+# Cube axes, in order (teams and weeks come from the season itself)
+SIDES = ['offense', 'defense']
+PLAY_TYPES = ['pass', 'run']
+STATS = ['count', 'sum', 'sumsq']
+
+def cube_path(season):
+    """Path of a season's cube"""
+    return data_cache.CACHE_DIR / 'cubes' / f'team_week_{season}.npz'
+
+def build_cube(pbp):
+    """Cube of shape (side, team, week, play type, stat) from play-by-play
+
+    Offense rows count a team's own plays, defense rows the plays it faced.
+    Weeks with no games for a team (byes) are zeros; playoff weeks follow
+    the regular season, so a week range also selects the season phase.
+    """
+    plays = export.filter_offensive_plays(pbp)
+    plays = plays[plays['posteam'].notna() & plays['defteam'].notna()]
+
+    teams = np.array(sorted(set(plays['posteam'].astype(str)) | set(plays['defteam'].astype(str))))
+    weeks = np.arange(1, int(plays['week'].max()) + 1 if len(plays) else 1)
+
+    team_index = pd.Index(teams)
+    offense = team_index.get_indexer(plays['posteam'].astype(str))
+    defense = team_index.get_indexer(plays['defteam'].astype(str))
+    week = plays['week'].to_numpy(dtype='int64') - 1
+    play_type = pd.Index(PLAY_TYPES).get_indexer(plays['play_type'].astype(str))
+    epa = plays['epa'].to_numpy(dtype='float64')
+
+    # One flat bin per (side, team, week, play type); bincount fills every cell at once
+    shape = (len(SIDES), len(teams), len(weeks), len(PLAY_TYPES))
+    cells = np.concatenate([
+        np.ravel_multi_index((np.zeros_like(offense), offense, week, play_type), shape),
+        np.ravel_multi_index((np.ones_like(defense), defense, week, play_type), shape),
+    ])
+    epa = np.concatenate([epa, epa])
+    size = int(np.prod(shape))
+
+    cube = np.stack([
+        np.bincount(cells, minlength=size),
+        np.bincount(cells, weights=epa, minlength=size),
+        np.bincount(cells, weights=epa * epa, minlength=size),
+    ], axis=-1).reshape(*shape, len(STATS))
+
+    return {'cube': cube, 'teams': teams, 'weeks': weeks}
+
+def save_cube(cube, season):
+    """Write a cube with its team and week labels"""
+    path = cube_path(season)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = data_cache.temporary_path(path)
+    with open(tmp_path, 'wb') as f:
+        np.savez(f, **cube)
+    os.replace(tmp_path, path)
+
+def load_cube(season, offline=None, refresh=False, rebuild=False):
+    """Season cube, rebuilt when missing or older than the cached play-by-play"""
+    path = cube_path(season)
+    pbp_path = data_cache.ensure_cached('pbp', season, offline=offline, refresh=refresh)
+
+    if rebuild or not path.exists() or path.stat().st_mtime < pbp_path.stat().st_mtime:
+        pbp = data_cache.load_pbp(season, columns=CUBE_COLUMNS, offline=offline)
+        cube = build_cube(pbp)
+        save_cube(cube, season)
+        return cube
+
+    with np.load(path) as stored:
+        return {name: stored[name] for name in stored.files}
+
+def select(cube, side='offense', play_types=PLAY_TYPES, weeks=None):
+    """Stat array of shape (team, week, stat) for one side, summed over play types
+
+    weeks is an optional (first, last) inclusive range.
+    """
+    play_type_index = [PLAY_TYPES.index(play_type) for play_type in play_types]
+    values = cube['cube'][SIDES.index(side)][:, :, play_type_index].sum(axis=2)
+    if weeks is not None:
+        first, last = weeks
+        values = values[:, first - 1:last]
+    return values
+
+def epa_per_play(values):
+    """EPA/play from a (..., stat) array, NaN where there were no plays"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return values[..., 1] / values[..., 0]
+
+def team_table(cube, side='offense', play_types=PLAY_TYPES, weeks=None):
+    """EPA per team over a week range, in the dashboard's team EPA table layout"""
+    totals = select(cube, side, play_types, weeks).sum(axis=1)
+    table = pd.DataFrame({
+        'Team': cube['teams'],
+        'EPA/Play': epa_per_play(totals),
+        'Total EPA': totals[:, 1],
+        'Plays': totals[:, 0].astype('int64'),
+    })
+    # Defense is better when EPA allowed is lower
+    return table.sort_values('EPA/Play', ascending=(side == 'defense')).reset_index(drop=True)
+
+def weekly_epa(cube, side='offense', play_types=PLAY_TYPES):
+    """Team x week EPA/play (NaN on byes)"""
+    return pd.DataFrame(epa_per_play(select(cube, side, play_types)),
+                        index=cube['teams'], columns=cube['weeks'])
+
+def rolling_epa(cube, window=4, side='offense', play_types=PLAY_TYPES):
+    """Team x week EPA/play over the trailing window of weeks, from cumulative sums"""
+    cumulative = np.cumsum(select(cube, side, play_types), axis=1)
+    trailing = cumulative.copy()
+    trailing[:, window:] -= cumulative[:, :-window]
+    return pd.DataFrame(epa_per_play(trailing), index=cube['teams'], columns=cube['weeks'])
+
+def cumulative_epa(cube, side='offense', play_types=PLAY_TYPES):
+    """Team x week running total EPA"""
+    cumulative = np.cumsum(select(cube, side, play_types)[..., 1], axis=1)
+    return pd.DataFrame(cumulative, index=cube['teams'], columns=cube['weeks'])
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Build team x week x play-type cubes')
+    parser.add_argument('--seasons', type=int, nargs='+', default=export.SEASONS)
+    parser.add_argument('--offline', action='store_true',
+                        help='Only read from the local cache, never download')
+    args = parser.parse_args()
+
+    for season in args.seasons:
+        cube = load_cube(season, offline=args.offline or None, rebuild=True)
+        print(f"✅ {season} cube: {len(cube['teams'])} teams x {len(cube['weeks'])} weeks "
+              f"({cube['cube'].nbytes / 1024:.0f} KB)")
@@ -0,0 +1,36 @@
+"""
+Shared test fixtures: small synthetic seasons in a temporary, offline data cache
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import data_cache
+import synthetic_pbp
+
+SEASON = 2024
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    """Empty offline data cache in a temporary directory"""
+    monkeypatch.setattr(data_cache, 'CACHE_DIR', tmp_path / 'cache')
+    monkeypatch.setattr(data_cache, 'OFFLINE', True)
+    data_cache.CACHE_DIR.mkdir()
+    return data_cache.CACHE_DIR
+
+@pytest.fixture(scope='session')
+def synthetic_season():
+    """Play-by-play and rosters of a small synthetic season"""
+    rosters = synthetic_pbp.generate_rosters()
+    return synthetic_pbp.generate_season(SEASON, n_plays=8000, rosters=rosters), rosters
+
+@pytest.fixture
+def cached_season(cache_dir, synthetic_season):
+    """The synthetic season written to the temporary cache; returns its season number"""
+    pbp, rosters = synthetic_season
+    synthetic_pbp.write_to_cache(pbp, rosters, SEASON)
+    return SEASON
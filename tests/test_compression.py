@@ -0,0 +1,33 @@
+"""
+Precompressed .gz/.br siblings of the exports (fetch_nfl_data.write_payload)
+"""
+
+import gzip
+
+import fetch_nfl_data as export
+
+def siblings(output_file):
+    return {suffix: output_file.with_name(output_file.name + suffix)
+            for suffix in export.COMPRESSED_SUFFIXES}
+
+def test_compressed_siblings_match_the_export(tmp_path):
+    output_file = tmp_path / 'nfl_2024.json'
+    export.write_payload(b'{"season": 2024}', output_file, compress=True)
+    assert gzip.decompress(siblings(output_file)['.gz'].read_bytes()) == output_file.read_bytes()
+
+def test_plain_export_removes_stale_siblings(tmp_path):
+    output_file = tmp_path / 'nfl_2024.json'
+    export.write_payload(b'{"season": 2024, "old": true}', output_file, compress=True)
+    sizes = export.write_payload(b'{"season": 2024}', output_file)
+
+    assert sizes == {'': output_file.stat().st_size}
+    assert not any(sibling.exists() for sibling in siblings(output_file).values())
+
+def test_plain_index_update_removes_stale_siblings(tmp_path):
+    entry = {'teams': {'KC': {'rank': 1, 'epaPerPlay': 0.1, 'totalEPA': 5.0, 'plays': 50}}, 'leaders': {}}
+    export.update_index(tmp_path, {2024: entry}, compress=True)
+    assert siblings(export.index_path(tmp_path))['.gz'].exists()
+
+    entry['teams']['KC']['epaPerPlay'] = 0.2
+    export.update_index(tmp_path, {2024: entry})
+    assert not any(sibling.exists() for sibling in siblings(export.index_path(tmp_path)).values())
@@ -0,0 +1,90 @@
+"""
+Downloads into the data cache: one refresh at a time across threads and processes
+"""
+
+import multiprocessing
+import os
+import threading
+import time
+
+import polars as pl
+import pytest
+
+import data_cache
+
+def logged_source(log):
+    """A slow pbp source that logs every download to a file"""
+    def load(season):
+        with open(log, 'a') as f:
+            f.write(f'{os.getpid()}\n')
+        time.sleep(0.3)
+        return pl.DataFrame({'season': [season], 'fresh': [True]})
+
+    return {'pbp': load}
+
+def current_season_settings(cache_dir):
+    """Cache settings under which 2024 is the current season with a one hour TTL"""
+    return {'CACHE_DIR': cache_dir, 'OFFLINE': False, 'CURRENT_SEASON_TTL_HOURS': 1}
+
+def refresh_in_worker(settings, log):
+    """Process entry point: apply the parent's cache settings and ensure 2024 is cached"""
+    for name, value in settings.items():
+        setattr(data_cache, name, value)
+    data_cache.nfl.get_current_season = lambda: 2024
+    data_cache.ensure_cached('pbp', 2024, source=logged_source(log))
+
+@pytest.fixture
+def source(cache_dir, tmp_path, monkeypatch):
+    """The logged source, with 2024 as the current season; returns it and its log"""
+    for name, value in current_season_settings(cache_dir).items():
+        monkeypatch.setattr(data_cache, name, value)
+    monkeypatch.setattr(data_cache.nfl, 'get_current_season', lambda: 2024)
+    log = tmp_path / 'downloads.log'
+    return logged_source(log), log
+
+def downloads(log):
+    return len(log.read_text().splitlines()) if log.exists() else 0
+
+def test_stale_copy_is_refreshed_once_by_concurrent_processes(source):
+    log = source[1]
+    path = data_cache.cache_path('pbp', 2024)
+    pl.DataFrame({'season': [2024], 'fresh': [False]}).write_parquet(path)
+    old = time.time() - 2 * 3600
+    os.utime(path, (old, old))
+
+    # Polars is not fork-safe once its thread pool runs, so start fresh interpreters
+    context = multiprocessing.get_context('spawn')
+    settings = current_season_settings(data_cache.CACHE_DIR)
+    workers = [context.Process(target=refresh_in_worker, args=(settings, log)) for _ in range(6)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    assert all(worker.exitcode == 0 for worker in workers)
+    assert downloads(log) == 1
+    assert pl.read_parquet(path)['fresh'].item()
+    assert not data_cache.is_stale(path, 2024)
+    assert not list(data_cache.CACHE_DIR.glob('*.tmp'))
+
+def test_missing_file_is_downloaded_once_for_waiting_threads(source):
+    source, log = source
+    paths = []
+    threads = [threading.Thread(target=lambda: paths.append(
+        data_cache.ensure_cached('pbp', 2024, source=source))) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Every caller waited for the one download instead of returning early
+    assert len(paths) == 6
+    assert all(path.exists() for path in paths)
+    assert downloads(log) == 1
+
+def test_refresh_downloads_even_when_fresh(source):
+    source, log = source
+    data_cache.ensure_cached('pbp', 2024, source=source)
+    data_cache.ensure_cached('pbp', 2024, source=source)
+    data_cache.ensure_cached('pbp', 2024, refresh=True, source=source)
+    assert downloads(log) == 2
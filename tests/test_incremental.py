@@ -0,0 +1,49 @@
+"""
+Incremental refresh (fetch_nfl_data.export_season with incremental=True)
+"""
+
+import json
+
+import pytest
+
+import fetch_nfl_data as export
+import synthetic_pbp
+
+def read_export(output_dir, season):
+    """An export without its timestamp, rounded so summation order doesn't matter"""
+    with open(output_dir / f'nfl_{season}.json') as f:
+        data = json.load(f)
+    del data['lastUpdated']
+    return export.round_floats(data, 6)
+
+@pytest.mark.parametrize('backend', ['pandas', 'polars'])
+def test_incremental_matches_full_rebuild(cached_season, synthetic_season, tmp_path, backend):
+    pbp, rosters = synthetic_season
+    season = cached_season
+
+    # First refresh: weeks 1-8 plus a few week 9 games, one of them still in progress
+    # and with EPA that nflverse corrects later
+    week9_games = sorted(pbp.loc[pbp['week'] == 9, 'game_id'].unique())[:3]
+    partial = pbp[(pbp['week'] < 9) | pbp['game_id'].isin(week9_games)].copy()
+    in_progress = partial.index[partial['game_id'] == week9_games[0]]
+    partial = partial.drop(in_progress[len(in_progress) // 2:])
+    partial.loc[partial['game_id'] == week9_games[1], 'epa'] += 0.5
+    synthetic_pbp.write_to_cache(partial, rosters, season)
+
+    incremental_dir = tmp_path / 'incremental'
+    incremental_dir.mkdir()
+    assert export.export_season(season, incremental_dir, incremental=True, backend=backend) is not None
+
+    # Second refresh: the full season
+    synthetic_pbp.write_to_cache(pbp, rosters, season)
+    assert export.export_season(season, incremental_dir, incremental=True, backend=backend) is not None
+
+    full_dir = tmp_path / 'full'
+    full_dir.mkdir()
+    export.export_season(season, full_dir, backend=backend)
+
+    assert read_export(incremental_dir, season) == read_export(full_dir, season)
+
+def test_incremental_without_changes_is_a_no_op(cached_season, tmp_path):
+    export.export_season(cached_season, tmp_path, incremental=True)
+    assert export.export_season(cached_season, tmp_path, incremental=True) is None
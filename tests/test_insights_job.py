@@ -0,0 +1,66 @@
+"""
+Weekly insights job state (insights_job.update_weekly)
+"""
+
+import pandas as pd
+import pytest
+
+import insights_job
+import synthetic_pbp
+
+def sorted_weekly(weekly):
+    return weekly.sort_values(insights_job.WEEKLY_KEYS, ignore_index=True)
+
+def test_rerun_reads_nothing_new(cached_season):
+    first, plays = insights_job.update_weekly(cached_season)
+    assert plays > 0
+
+    second, plays = insights_job.update_weekly(cached_season)
+    assert plays == 0
+    pd.testing.assert_frame_equal(sorted_weekly(first), sorted_weekly(second))
+
+def test_killed_write_keeps_previous_state(cached_season, synthetic_season, monkeypatch):
+    pbp, rosters = synthetic_season
+    synthetic_pbp.write_to_cache(pbp[pbp['week'] < 5], rosters, cached_season)
+    insights_job.update_weekly(cached_season)
+    before, meta_before = insights_job.load_state(cached_season)
+
+    # The next run dies halfway through writing its state
+    synthetic_pbp.write_to_cache(pbp, rosters, cached_season)
+    write_table = insights_job.pq.write_table
+
+    def killed(table, where, **kwargs):
+        write_table(table.slice(0, len(table) // 2), where, **kwargs)
+        raise KeyboardInterrupt
+
+    with monkeypatch.context() as patch:
+        patch.setattr(insights_job.pq, 'write_table', killed)
+        with pytest.raises(KeyboardInterrupt):
+            insights_job.update_weekly(cached_season)
+
+    after, meta_after = insights_job.load_state(cached_season)
+    assert meta_after == meta_before
+    pd.testing.assert_frame_equal(after, before)
+
+    # Rerunning gives the same result as a clean run over the full season
+    resumed, _ = insights_job.update_weekly(cached_season)
+    clean, _ = insights_job.update_weekly(cached_season, reset=True)
+    pd.testing.assert_frame_equal(sorted_weekly(resumed), sorted_weekly(clean), check_dtype=False)
+
+def test_game_in_progress_is_recalculated_on_the_next_run(cached_season, synthetic_season):
+    pbp, rosters = synthetic_season
+    # Weeks 1-4 plus the first half of one week-5 game
+    game = pbp.loc[pbp['week'] == 5, 'game_id'].iloc[0]
+    in_progress = pbp[pbp['game_id'] == game]
+    partial = pbp[(pbp['week'] < 5) | pbp.index.isin(in_progress.index[:len(in_progress) // 2])]
+    synthetic_pbp.write_to_cache(partial, rosters, cached_season)
+    insights_job.update_weekly(cached_season)
+
+    synthetic_pbp.write_to_cache(pbp, rosters, cached_season)
+    incremental, plays = insights_job.update_weekly(cached_season)
+    assert plays > 0
+    clean, _ = insights_job.update_weekly(cached_season, reset=True)
+
+    pd.testing.assert_frame_equal(sorted_weekly(incremental), sorted_weekly(clean), check_dtype=False)
+    team_plays = clean.loc[clean['kind'] == 'team', 'plays'].sum()
+    assert incremental.loc[incremental['kind'] == 'team', 'plays'].sum() == team_plays
@@ -0,0 +1,65 @@
+"""
+EPA/play confidence intervals: the dashboard's bootstrap and the export's normal approximation
+"""
+
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import fetch_nfl_data as export
+import season_stats
+
+@pytest.fixture(scope='module')
+def plays():
+    rng = np.random.default_rng(1)
+    sizes = {'A': 2000, 'B': 400, 'C': 1}
+    return pd.DataFrame({
+        'group': np.repeat(list(sizes), list(sizes.values())),
+        'epa': np.concatenate([rng.normal(0.1, 1.5, size) for size in sizes.values()]),
+    })
+
+def normal_interval(values, confidence=0.95):
+    margin = NormalDist().inv_cdf((1 + confidence) / 2) * values.std(ddof=0) / np.sqrt(len(values))
+    return values.mean() - margin, values.mean() + margin
+
+def test_bootstrap_brackets_the_mean_and_is_reproducible(plays):
+    interval = season_stats.bootstrap_ci(plays['epa'], plays['group'], resamples=500)
+    means = plays.groupby('group')['epa'].mean()
+
+    assert list(interval.index) == ['A', 'B', 'C']
+    assert (interval['low'] <= means).all() and (means <= interval['high']).all()
+    # A single play has nothing to resample
+    assert interval.loc['C', 'low'] == interval.loc['C', 'high'] == means['C']
+    pd.testing.assert_frame_equal(interval, season_stats.bootstrap_ci(plays['epa'], plays['group'], resamples=500))
+
+def test_bootstrap_ignores_missing_values(plays):
+    with_missing = plays.copy()
+    with_missing.loc[with_missing.index[:5], 'epa'] = np.nan
+    with_missing.loc[with_missing.index[5:10], 'group'] = None
+    interval = season_stats.bootstrap_ci(with_missing['epa'], with_missing['group'], resamples=200)
+    assert interval.notna().all().all()
+
+def test_bootstrap_chunks_agree(plays, monkeypatch):
+    whole = season_stats.bootstrap_ci(plays['epa'], plays['group'], resamples=300)
+    monkeypatch.setattr(season_stats, 'BOOTSTRAP_CHUNK_VALUES', len(plays) * 7)
+    chunked = season_stats.bootstrap_ci(plays['epa'], plays['group'], resamples=300)
+    pd.testing.assert_frame_equal(whole, chunked)
+
+def test_bootstrap_is_close_to_normal_for_large_groups(plays):
+    interval = season_stats.bootstrap_ci(plays['epa'], plays['group'])
+    low, high = normal_interval(plays.loc[plays['group'] == 'A', 'epa'])
+    width = high - low
+    assert interval.loc['A', 'low'] == pytest.approx(low, abs=0.1 * width)
+    assert interval.loc['A', 'high'] == pytest.approx(high, abs=0.1 * width)
+
+def test_export_interval_is_normal_from_summed_squares(plays):
+    rows = plays.assign(epaSum=plays['epa'], epaSumSq=plays['epa'] ** 2, plays=1)
+    summary = export.summarize_epa(rows, 'group', 'team', ['epaPerPlay', 'totalEPA', 'plays'],
+                                   interval=export.NORMAL_INTERVAL_COLUMNS).set_index('team')
+
+    for group in ['A', 'B']:
+        low, high = normal_interval(plays.loc[plays['group'] == group, 'epa'])
+        assert summary.loc[group, 'epaPerPlayNormalLow'] == pytest.approx(low)
+        assert summary.loc[group, 'epaPerPlayNormalHigh'] == pytest.approx(high)
@@ -0,0 +1,33 @@
+"""
+Lean loading (data_cache.downcast_pbp and the exporter's --lean)
+"""
+
+import json
+
+import numpy as np
+
+import data_cache
+import fetch_nfl_data as export
+
+def test_downcast_keeps_missing_success(synthetic_season):
+    pbp = synthetic_season[0].copy()
+    pbp.loc[pbp.index[:10], ['epa', 'success']] = np.nan
+    lean = data_cache.downcast_pbp(pbp.copy())
+
+    assert lean['success'].isna().sum() == pbp['success'].isna().sum()
+    assert lean['success'].mean() == np.float32(pbp['success'].mean())
+    assert lean['pass'].dtype == 'int8'
+    assert lean['epa'].dtype == 'float32'
+
+def test_lean_export_matches_regular_export(cached_season, tmp_path):
+    outputs = []
+    for lean in (False, True):
+        output_dir = tmp_path / f'lean_{lean}'
+        output_dir.mkdir()
+        export.export_season(cached_season, output_dir, lean=lean)
+        with open(output_dir / f'nfl_{cached_season}.json') as f:
+            data = json.load(f)
+        del data['lastUpdated']
+        outputs.append(export.round_floats(data, 9))
+
+    assert outputs[0] == outputs[1]
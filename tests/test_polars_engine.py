@@ -0,0 +1,15 @@
+"""
+Polars backend parity with the pandas exporter
+"""
+
+import fetch_nfl_data as export
+import polars_engine
+
+def test_backends_agree(cached_season):
+    assert polars_engine.check_parity(cached_season)
+
+def test_partial_aggregates_agree(cached_season):
+    pandas_result = export.calculate_aggregates(export.fetch_season_data(cached_season))
+    polars_result = polars_engine.calculate_aggregates(polars_engine.scan_season(cached_season))
+
+    assert export.aggregates_match(pandas_result, polars_result)
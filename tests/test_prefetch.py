@@ -0,0 +1,57 @@
+"""
+Concurrent downloads (data_cache.prefetch) and how the exporter handles failures
+"""
+
+import pytest
+
+import data_cache
+import fetch_nfl_data as export
+import synthetic_pbp
+
+@pytest.fixture
+def mirror(cache_dir, synthetic_season, tmp_path, monkeypatch):
+    """A local nflverse mirror holding only the 2024 season; records every download"""
+    pbp, rosters = synthetic_season
+    mirror_dir = tmp_path / 'mirror'
+    synthetic_pbp.write_to_cache(pbp, rosters, 2024, cache_dir=mirror_dir)
+    # write_to_cache points the cache at the directory it wrote to; point it back
+    monkeypatch.setattr(data_cache, 'CACHE_DIR', cache_dir)
+
+    monkeypatch.setattr(data_cache, 'OFFLINE', False)
+    monkeypatch.setattr(data_cache, 'SOURCE_DIR', str(mirror_dir))
+    monkeypatch.setattr(data_cache, 'DOWNLOAD_RETRIES', 1)
+    monkeypatch.setattr(data_cache, 'RETRY_BACKOFF_SECONDS', 0)
+
+    downloads = []
+    download = data_cache.download
+
+    def recorded(dataset, season, source=None):
+        downloads.append((dataset, season))
+        return download(dataset, season, source)
+
+    monkeypatch.setattr(data_cache, 'download', recorded)
+    return downloads
+
+def test_prefetch_caches_every_dataset(mirror):
+    paths = data_cache.prefetch(['pbp', 'rosters'], [2024])
+    assert set(paths) == {('pbp', 2024), ('rosters', 2024)}
+    assert all(path.exists() for path in paths.values())
+
+def test_prefetch_raises_after_finishing_the_rest(mirror):
+    with pytest.raises(FileNotFoundError):
+        data_cache.prefetch(['pbp', 'rosters'], [2023, 2024])
+    assert data_cache.cache_path('pbp', 2024).exists()
+
+def test_failed_prefetch_is_reported_and_not_downloaded_again(mirror, tmp_path, capsys):
+    options = export.prefetch_seasons([2023, 2024], {'offline': None, 'refresh': False})
+    assert 'Not every download succeeded' in capsys.readouterr().out
+    assert options == {'offline': True, 'refresh': False}
+
+    # Each dataset is downloaded (with its retries) once, during the prefetch
+    attempts = list(mirror)
+    assert sorted(attempts) == [('pbp', 2023), ('pbp', 2024), ('rosters', 2023), ('rosters', 2024)]
+
+    assert export.export_season(2024, tmp_path, **options) is not None
+    with pytest.raises(FileNotFoundError):
+        export.export_season(2023, tmp_path, **options)
+    assert mirror == attempts
@@ -0,0 +1,111 @@
+"""
+Ad-hoc query engine: validation, results and the HTTP handler
+"""
+
+import json
+import threading
+import urllib.error
+import urllib.request
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+import fetch_nfl_data as export
+import query_engine
+
+@pytest.fixture
+def store(cached_season, monkeypatch):
+    """An empty season store reading from the synthetic cache"""
+    monkeypatch.setattr(query_engine, 'STORE', {})
+    query_engine.cached_query.cache_clear()
+    yield cached_season
+    query_engine.cached_query.cache_clear()
+
+@pytest.fixture
+def server():
+    """Query handler on a free local port; yields its base URL"""
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), query_engine.QueryHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{httpd.server_address[1]}'
+    httpd.shutdown()
+    httpd.server_close()
+
+def post(url, body):
+    """POST a JSON body, returning the status and decoded response"""
+    request = urllib.request.Request(f'{url}/query', data=json.dumps(body).encode(),
+                                     headers={'Content-Type': 'application/json'})
+    try:
+        with urllib.request.urlopen(request, timeout=10) as response:
+            return response.status, json.load(response)
+    except urllib.error.HTTPError as e:
+        return e.code, json.load(e)
+
+@pytest.mark.parametrize('bad_query', [
+    [],
+    {'position': 5},
+    {'playType': ['pass']},
+    {'groupBy': {'team': 1}},
+    {'teams': [1, 2]},
+    {'metrics': 7},
+    {'season': 'latest'},
+    {'season': 2024.5},
+    {'regularSeason': 'false'},
+    {'minAttempts': -1},
+    {'colour': 'red'},
+])
+def test_malformed_queries_raise_value_error(bad_query):
+    with pytest.raises(ValueError):
+        query_engine.normalize_query(bad_query)
+
+def test_equal_queries_normalize_the_same():
+    a = query_engine.normalize_query({'teams': ['KC', 'BUF'], 'position': 'qb', 'season': '2024'})
+    b = query_engine.normalize_query({'teams': ['BUF', 'KC', 'KC'], 'position': 'QB', 'season': 2024})
+    assert a == b
+
+def test_team_query_matches_direct_filter(store, synthetic_season):
+    pbp = synthetic_season[0]
+    response = query_engine.query({'season': store, 'metrics': ['epaPerPlay', 'plays'], 'playType': 'pass'})
+
+    plays = export.filter_offensive_plays(pbp)
+    plays = plays[(plays['season_type'] == 'REG') & (plays['play_type'] == 'pass')]
+    expected = plays.groupby('posteam')['epa'].agg(['mean', 'count'])
+
+    rows = {row['team']: row for row in response['rows']}
+    assert set(rows) == set(expected.index)
+    for team, row in rows.items():
+        assert row['plays'] == expected.loc[team, 'count']
+        assert row['epaPerPlay'] == pytest.approx(expected.loc[team, 'mean'], rel=1e-6)
+
+def test_handler_rejects_bad_field_types(server):
+    status, body = post(server, {'position': 5})
+    assert status == 400
+    assert 'position' in body['error']
+
+def test_handler_reports_unexpected_errors(server, monkeypatch):
+    def broken(raw_query):
+        raise RuntimeError('boom')
+
+    monkeypatch.setattr(query_engine, 'query', broken)
+    status, body = post(server, {})
+    assert status == 500
+    assert 'boom' in body['error']
+
+def test_week_groups_come_back_in_week_order(store):
+    response = query_engine.query({'season': store, 'groupBy': 'week', 'metrics': ['epaPerPlay']})
+    weeks = [row['week'] for row in response['rows']]
+    assert len(weeks) > 1
+    assert weeks == sorted(weeks)
+
+def test_team_filter_limits_the_offenses(store):
+    response = query_engine.query({'season': store, 'groupBy': 'team', 'teams': ['KC', 'BUF']})
+    assert {row['team'] for row in response['rows']} <= {'KC', 'BUF'}
+    assert response['rows']
+
+def test_preflight_has_no_body(server):
+    request = urllib.request.Request(f'{server}/query', method='OPTIONS')
+    with urllib.request.urlopen(request, timeout=10) as response:
+        assert response.status == 204
+        assert response.headers['Access-Control-Allow-Origin'] == '*'
+        assert response.headers.get('Content-Length') in (None, '0')
+        assert response.read() == b''
@@ -0,0 +1,65 @@
+"""
+Memory-bounded season cache (season_cache.SeasonCache)
+"""
+
+import threading
+
+import numpy as np
+import pandas as pd
+
+import data_cache
+import season_cache
+
+def frame_of(mb):
+    """A frame of about mb megabytes"""
+    return pd.DataFrame({'epa': np.zeros(int(mb * 1024 ** 2 / 8))})
+
+def sized_loader(sizes, loads):
+    def load(key):
+        loads.append(key)
+        return frame_of(sizes[key])
+    return load
+
+def test_evicts_least_recently_used_within_budget():
+    loads = []
+    cache = season_cache.SeasonCache(sized_loader({2022: 4, 2023: 4, 2024: 4}, loads), budget_mb=10)
+
+    cache.get(2022)
+    cache.get(2023)
+    cache.get(2022)  # 2023 is now least recently used
+    cache.get(2024)
+
+    metrics = cache.metrics()
+    assert metrics['seasons'] == [2022, 2024]
+    assert metrics['used_mb'] <= 10
+    assert (metrics['hits'], metrics['misses'], metrics['evictions']) == (1, 3, 1)
+
+    cache.get(2023)
+    assert loads == [2022, 2023, 2024, 2023]
+
+def test_newest_frame_stays_even_over_budget():
+    cache = season_cache.SeasonCache(sized_loader({2024: 8}, []), budget_mb=1)
+    cache.get(2024)
+    assert cache.metrics()['seasons'] == [2024]
+    assert cache.used_mb() == float(data_cache.memory_mb(frame_of(8)))
+
+def test_views_share_data_but_writes_stay_private():
+    cache = season_cache.SeasonCache(sized_loader({2024: 1}, []))
+    first = cache.get(2024)
+    second = cache.get(2024)
+    assert np.shares_memory(first['epa'].to_numpy(), second['epa'].to_numpy())
+
+    first.loc[0, 'epa'] = 1.0
+    assert second.loc[0, 'epa'] == 0.0
+    assert cache.get(2024).loc[0, 'epa'] == 0.0
+
+def test_concurrent_gets_load_once():
+    loads = []
+    cache = season_cache.SeasonCache(sized_loader({2024: 1}, loads))
+    threads = [threading.Thread(target=cache.get, args=(2024,)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert loads == [2024]
+    assert cache.metrics()['hits'] == 7
@@ -0,0 +1,65 @@
+"""
+Memory-mapped Arrow season store (season_store) and its read-only frames
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import data_cache
+import season_cache
+import season_store
+
+COLUMNS = ['game_id', 'posteam', 'week', 'epa', 'wp', 'pass']
+
+def test_store_matches_lean_parquet_load(cached_season):
+    store = season_store.load_store(cached_season, columns=COLUMNS)
+    lean = data_cache.load_pbp(cached_season, columns=COLUMNS, lean=True)
+    pd.testing.assert_frame_equal(store, lean, check_categorical=False)
+
+def test_store_frames_are_read_only(cached_season):
+    frame = season_store.load_store(cached_season, columns=COLUMNS)
+    assert not frame['epa'].to_numpy().flags.writeable
+    with pytest.raises(ValueError, match='read-only'):
+        frame.loc[0, 'epa'] = 1.0
+
+    # Whole columns can still be added
+    frame['epa2'] = frame['epa'] * 2
+
+def test_copy_is_writable_and_leaves_the_store_untouched(cached_season):
+    frame = season_store.load_store(cached_season, columns=COLUMNS)
+    original = frame.loc[0, 'epa']
+
+    private = frame.copy()
+    private.loc[0, 'epa'] = original + 1
+    assert season_store.load_store(cached_season, columns=COLUMNS).loc[0, 'epa'] == original
+
+def test_cache_views_are_private_while_cached_and_read_only_once_evicted(cached_season):
+    cache = season_cache.SeasonCache(lambda season: season_store.load_store(season, columns=COLUMNS))
+
+    cached = cache.get(cached_season)
+    cached.loc[0, 'epa'] = 1.0
+    assert cache.get(cached_season).loc[0, 'epa'] != 1.0
+
+    evicted = cache.get(cached_season)
+    cache.clear()
+    with pytest.raises(ValueError, match='read-only'):
+        evicted.loc[0, 'epa'] = 1.0
+    evicted = evicted.copy()
+    evicted.loc[0, 'epa'] = 1.0
+    assert evicted.loc[0, 'epa'] == 1.0
+
+def test_rebuild_swaps_the_store_version(cached_season):
+    frame = season_store.load_store(cached_season, columns=COLUMNS)
+    # Backdate the file so the swap shows even with coarse filesystem timestamps
+    path = season_store.store_path(cached_season)
+    os.utime(path, (path.stat().st_atime, path.stat().st_mtime - 60))
+    version = path.stat().st_mtime_ns
+
+    season_store.build_store(cached_season)
+    assert season_store.store_version(cached_season) != version
+    # Frames mapped before the swap keep reading the old file
+    assert np.isfinite(frame['epa'].to_numpy()).any()
+    assert not list(season_store.store_dir().glob('*.tmp'))
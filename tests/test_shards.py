@@ -0,0 +1,85 @@
+"""
+Content-hashed shards and the season manifest (fetch_nfl_data.write_shards)
+"""
+
+import copy
+import hashlib
+import json
+
+import fetch_nfl_data as export
+import synthetic_pbp
+
+def season_data(epa=0.1):
+    """A minimal season export"""
+    return {
+        'season': 2024,
+        'leagueStats': {'totalPlays': 100, 'totalTouchdowns': 3, 'passingPlays': 60, 'rushingPlays': 40},
+        'teamStats': [{'team': 'KC', 'epaPerPlay': epa, 'totalEPA': epa * 50, 'plays': 50},
+                      {'team': 'BUF', 'epaPerPlay': 0.05, 'totalEPA': 2.5, 'plays': 50}],
+        'playerStats': {'qb': [{'playerId': '00-1', 'player': 'A.Passer', 'epaPerPlay': 0.2}]},
+        'lastUpdated': '2024-09-01T00:00:00',
+    }
+
+def read_manifest(output_dir):
+    with open(export.manifest_path(output_dir, 2024)) as f:
+        return json.load(f)
+
+def test_manifest_hashes_match_shard_bytes(tmp_path):
+    export.write_shards(season_data(), tmp_path)
+    manifest = read_manifest(tmp_path)
+
+    assert set(manifest['shards']) == {'league', 'teams', 'players_qb'}
+    for shard in manifest['shards'].values():
+        payload = (tmp_path / shard['file']).read_bytes()
+        assert hashlib.sha256(payload).hexdigest() == shard['sha256']
+        assert len(payload) == shard['bytes']
+        assert shard['sha256'][:12] in shard['file']
+
+def test_only_changed_shards_get_new_names(tmp_path):
+    export.write_shards(season_data(), tmp_path)
+    first = read_manifest(tmp_path)['shards']
+
+    export.write_shards(season_data(), tmp_path)
+    assert read_manifest(tmp_path)['shards'] == first
+
+    export.write_shards(season_data(epa=0.3), tmp_path)
+    second = read_manifest(tmp_path)['shards']
+    assert second['teams']['file'] != first['teams']['file']
+    assert second['league'] == first['league']
+    assert second['players_qb'] == first['players_qb']
+
+def test_previous_generation_is_kept_then_removed(tmp_path):
+    generations = []
+    for epa in (0.1, 0.2, 0.3):
+        export.write_shards(season_data(epa=epa), tmp_path)
+        generations.append(read_manifest(tmp_path)['shards']['teams']['file'])
+
+    assert (tmp_path / generations[2]).exists()
+    assert (tmp_path / generations[1]).exists()
+    assert not (tmp_path / generations[0]).exists()
+
+def test_precision_rounds_shard_values(tmp_path):
+    data = season_data(epa=0.123456789)
+    export.write_shards(copy.deepcopy(data), tmp_path, precision=3)
+    teams = json.loads((tmp_path / read_manifest(tmp_path)['shards']['teams']['file']).read_bytes())
+    assert teams[0]['epaPerPlay'] == 0.123
+
+def test_export_without_shards_keeps_an_existing_manifest_current(cached_season, synthetic_season, tmp_path):
+    pbp, rosters = synthetic_season
+    synthetic_pbp.write_to_cache(pbp[pbp['week'] < 5], rosters, cached_season)
+    export.export_season(cached_season, tmp_path, shards=True)
+
+    synthetic_pbp.write_to_cache(pbp, rosters, cached_season)
+    export.export_season(cached_season, tmp_path)
+
+    with open(tmp_path / f'nfl_{cached_season}.json') as f:
+        data = json.load(f)
+    with open(export.manifest_path(tmp_path, cached_season)) as f:
+        manifest = json.load(f)
+    assert manifest['lastUpdated'] == data['lastUpdated']
+    teams = json.loads((tmp_path / manifest['shards']['teams']['file']).read_bytes())
+    assert teams == data['teamStats']
+
+def test_export_without_shards_writes_no_manifest(cached_season, tmp_path):
+    export.export_season(cached_season, tmp_path)
+    assert not export.manifest_path(tmp_path, cached_season).exists()
@@ -0,0 +1,67 @@
+"""
+Situational cube queries against direct filters over the plays
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import fetch_nfl_data as export
+import situation_cube
+
+@pytest.fixture(scope='module')
+def plays_and_cube(synthetic_season):
+    pbp = synthetic_season[0]
+    plays = export.filter_offensive_plays(pbp)
+    plays = plays[plays['posteam'].notna() & plays['defteam'].notna() & (plays['season_type'] == 'REG')]
+    situation_columns = [column for column, _, _ in situation_cube.DIMENSIONS.values()]
+    plays = plays.dropna(subset=situation_columns)
+    return plays, situation_cube.build_cube(pbp)
+
+def field_zone(yardline):
+    """Field buckets written out by hand"""
+    return pd.Series(np.select([yardline <= 20, yardline <= 50, yardline <= 80],
+                               ['red_zone', 'opp', 'own'], 'own_deep'), index=yardline.index)
+
+def assert_matches(table, expected):
+    assert (table['plays'].to_numpy() == expected['count'].to_numpy()).all()
+    assert np.allclose(table['totalEPA'], expected['sum'])
+    assert np.allclose(table['successRate'], expected['success'].to_numpy(), equal_nan=True)
+
+def test_sliced_team_query_matches_filter(plays_and_cube):
+    plays, cube = plays_and_cube
+    team = cube['teams'][3]
+    selected = plays[(plays['defteam'] == team) & (plays['down'] == 3) & (plays['ydstogo'] > 6)]
+    expected = selected.groupby(field_zone(selected['yardline_100'])).agg(
+        count=('epa', 'count'), sum=('epa', 'sum'), success=('success', 'mean'),
+    ).reindex(['red_zone', 'opp', 'own', 'own_deep'])
+    expected['count'] = expected['count'].fillna(0)
+
+    table = situation_cube.query(cube, where={'down': ['3'], 'distance': ['long', 'very_long']},
+                                 by=['field'], team=team, side='defense')
+    assert list(table['field']) == ['red_zone', 'opp', 'own', 'own_deep']
+    assert_matches(table, expected)
+
+def test_rollup_matches_cell_sums(plays_and_cube):
+    plays, cube = plays_and_cube
+    expected = plays.groupby(plays['qtr'].astype(int).astype(str)).agg(
+        count=('epa', 'count'), sum=('epa', 'sum'), success=('success', 'mean'))
+
+    # No filter and one dimension reads the precomputed rollup
+    table = situation_cube.query(cube, by=['quarter'])
+    table = table[table['plays'] > 0].set_index('quarter')
+    assert_matches(table, expected.loc[table.index])
+
+def test_player_query_matches_filter(plays_and_cube):
+    plays, cube = plays_and_cube
+    passes = plays[plays['passer_player_id'].notna()]
+    player = passes['passer_player_id'].value_counts().index[0]
+    selected = passes[(passes['passer_player_id'] == player) & (passes['wp'] > 0.4) & (passes['wp'] <= 0.6)]
+
+    table = situation_cube.query(cube, where={'wp': ['40-60']}, player=player, role='pass')
+    assert table['plays'].iloc[0] == len(selected)
+    assert table['totalEPA'].iloc[0] == pytest.approx(selected['epa'].sum())
+
+def test_unknown_bucket_is_rejected():
+    with pytest.raises(ValueError):
+        situation_cube.parse_where(['down=5'])
@@ -0,0 +1,46 @@
+"""
+Team x week x play-type cube queries against direct filters over the plays
+"""
+
+import numpy as np
+import pytest
+
+import fetch_nfl_data as export
+import team_cube
+
+@pytest.fixture(scope='module')
+def plays_and_cube(synthetic_season):
+    pbp = synthetic_season[0]
+    plays = export.filter_offensive_plays(pbp)
+    plays = plays[plays['posteam'].notna() & plays['defteam'].notna()]
+    return plays, team_cube.build_cube(pbp)
+
+@pytest.mark.parametrize('side, team_column', [('offense', 'posteam'), ('defense', 'defteam')])
+def test_team_table_matches_filter(plays_and_cube, side, team_column):
+    plays, cube = plays_and_cube
+    selected = plays[plays['week'].between(3, 6) & (plays['play_type'] == 'pass')]
+    expected = selected.groupby(team_column)['epa'].agg(['mean', 'sum', 'count'])
+
+    table = team_cube.team_table(cube, side=side, play_types=['pass'], weeks=(3, 6)).set_index('Team')
+    table = table[table['Plays'] > 0]
+
+    assert sorted(table.index) == sorted(expected.index)
+    assert np.allclose(table.loc[expected.index, 'EPA/Play'], expected['mean'])
+    assert np.allclose(table.loc[expected.index, 'Total EPA'], expected['sum'])
+    assert (table.loc[expected.index, 'Plays'] == expected['count']).all()
+
+def test_rolling_epa_matches_filter(plays_and_cube):
+    plays, cube = plays_and_cube
+    team = cube['teams'][0]
+    window = 4
+    rolling = team_cube.rolling_epa(cube, window=window)
+
+    for week in (2, 8, 12):
+        selected = plays[(plays['posteam'] == team) & plays['week'].between(week - window + 1, week)]
+        assert rolling.loc[team, week] == pytest.approx(selected['epa'].mean())
+
+def test_cumulative_epa_ends_at_season_total(plays_and_cube):
+    plays, cube = plays_and_cube
+    cumulative = team_cube.cumulative_epa(cube)
+    totals = plays.groupby('posteam')['epa'].sum()
+    assert np.allclose(cumulative.iloc[:, -1].loc[totals.index], totals)
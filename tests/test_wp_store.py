@@ -0,0 +1,73 @@
+"""
+Win probability store (wp_store)
+"""
+
+import multiprocessing
+import threading
+
+import numpy as np
+import pyarrow.parquet as pq
+
+import synthetic_pbp
+import wp_store
+
+def test_game_curve_keeps_first_and_last_play(cached_season, synthetic_season):
+    pbp = synthetic_season[0]
+    games, curves = wp_store.load_store(cached_season)
+
+    game_id = games.index[0]
+    plays = pbp[pbp['game_id'] == game_id]
+    curve = wp_store.game_curve(games, curves, game_id)
+
+    assert len(curve) == min(len(plays), wp_store.POINTS_PER_GAME)
+    assert curve['home_wp'].iloc[0] == np.float32(plays['home_wp'].iloc[0])
+    assert curve['home_wp'].iloc[-1] == np.float32(plays['home_wp'].iloc[-1])
+
+def test_concurrent_builds_do_not_collide(cached_season):
+    # Forked workers inherit the temporary cache directory
+    context = multiprocessing.get_context('fork')
+    with context.Pool(4) as pool:
+        pool.map(wp_store.build_store, [cached_season] * 8)
+
+    games, curves = wp_store.load_store(cached_season)
+    assert games['stop'].iloc[-1] == len(curves)
+    assert not list(wp_store.store_dir().glob('*.tmp'))
+
+def test_index_and_curves_swap_together(cached_season, synthetic_season):
+    pbp, rosters = synthetic_season
+    wp_store.build_store(cached_season)
+    old_games, old_curves = wp_store.load_store(cached_season)
+
+    # A rebuild with different games, as after a refresh
+    synthetic_pbp.write_to_cache(pbp[pbp['week'] < 5], rosters, cached_season)
+    wp_store.build_store(cached_season)
+    games, curves = wp_store.load_store(cached_season)
+    assert games['stop'].iloc[-1] == len(curves) != len(old_curves)
+
+    # Readers holding the previous index still find its curves
+    assert old_games['stop'].iloc[-1] == len(old_curves)
+    assert len(list(wp_store.store_dir().glob('*.npy'))) == 2
+
+def test_older_layout_is_rebuilt(cached_season):
+    path = wp_store.ensure_store(cached_season)
+    pq.write_table(pq.read_table(path).replace_schema_metadata(None), path)
+
+    games, curves = wp_store.load_store(cached_season)
+    assert wp_store.stored_curves(path) is not None
+    assert games['stop'].iloc[-1] == len(curves)
+
+def test_concurrent_readers_rebuild_once(cached_season, monkeypatch):
+    builds = []
+    build_store = wp_store.build_store
+
+    def counted(season, **kwargs):
+        builds.append(season)
+        return build_store(season, **kwargs)
+
+    monkeypatch.setattr(wp_store, 'build_store', counted)
+    threads = [threading.Thread(target=wp_store.load_store, args=(cached_season,)) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert builds == [cached_season]
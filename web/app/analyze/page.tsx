@@ -1,19 +1,197 @@
+'use client'
+
+import { useState, useEffect } from 'react'
+import { useSeason } from '@/lib/SeasonContext'
+import { TEAM_COLORS } from '@/lib/teamLogos'
+import { ScatterChart, Scatter, BarChart, Bar, XAxis, YAxis, CartesianGrid, Tooltip, ResponsiveContainer } from 'recharts'
+
+// Local query engine (python query_engine.py)
+const QUERY_URL = process.env.NEXT_PUBLIC_QUERY_URL || 'http://127.0.0.1:8765'
+
+const METRIC_LABELS: Record<string, string> = {
+  epaPerPlay: 'EPA/Play',
+  totalEPA: 'Total EPA',
+  plays: 'Plays',
+  successRate: 'Success Rate',
+  yards: 'Yards',
+  yardsPerPlay: 'Yards/Play',
+  touchdowns: 'Touchdowns',
+  completions: 'Completions',
+  completionRate: 'Completion Rate',
+  interceptions: 'Interceptions',
+  sacks: 'Sacks',
+  airYards: 'Air Yards',
+  cpoe: 'CPOE'
+}
+
+const GROUP_LABELS: Record<string, string> = {
+  team: 'Team',
+  defense: 'Defense',
+  week: 'Week',
+  playType: 'Play Type',
+  player: 'Player'
+}
+
+const TEAMS = Object.keys(TEAM_COLORS).sort()
+
+type Row = Record<string, string | number | null>
+
 export default function AnalyzePage() {
+  const { season } = useSeason()
+  const [xMetric, setXMetric] = useState('plays')
+  const [yMetric, setYMetric] = useState('epaPerPlay')
+  const [groupBy, setGroupBy] = useState('team')
+  const [teams, setTeams] = useState<string[]>([])
+  const [position, setPosition] = useState('')
+  const [playType, setPlayType] = useState('')
+  const [regularSeason, setRegularSeason] = useState(true)
+  const [minAttempts, setMinAttempts] = useState(0)
+  const [rows, setRows] = useState<Row[]>([])
+  const [elapsedMs, setElapsedMs] = useState<number | null>(null)
+  const [error, setError] = useState<string | null>(null)
+
+  useEffect(() => {
+    const query = {
+      season,
+      groupBy,
+      metrics: [yMetric, xMetric],
+      teams,
+      position: position || null,
+      playType: playType || null,
+      regularSeason,
+      minAttempts
+    }
+
+    // Drop responses for queries the user has already changed
+    let current = true
+    fetch(`${QUERY_URL}/query`, { method: 'POST', body: JSON.stringify(query) })
+      .then(res => res.json())
+      .then(data => {
+        if (!current) return
+        if (data.error) {
+          setError(data.error)
+          setRows([])
+        } else {
+          setError(null)
+          setRows(data.rows)
+          setElapsedMs(data.elapsedMs)
+        }
+      })
+      .catch(() => {
+        if (current) setError(`Query engine not reachable at ${QUERY_URL}`)
+      })
+    return () => { current = false }
+  }, [season, xMetric, yMetric, groupBy, teams, position, playType, regularSeason, minAttempts])
+
+  const labelKey = groupBy === 'player' ? 'player' : groupBy
+  const selectClass = 'border border-gray-300 rounded-sm px-2 py-1 bg-white'
+
   return (
     <div className="space-y-8">
       <div>
         <h2 className="text-2xl mb-6 pb-4 border-b border-gray-200">
-          Custom Analysis
+          Custom Analysis — {season} Season
         </h2>
-        <div className="bg-surface border border-gray-200 rounded-sm p-12 text-center">
-          <div className="text-6xl mb-4">🎨</div>
-          <h3 className="text-xl mb-2">Chart Builder Coming Soon</h3>
-          <p className="text-gray-600">
-            Build custom charts on the fly with AI-powered suggestions and real-time insights.
-          </p>
-          <p className="text-sm text-gray-500 mt-4">Phase 4</p>
+
+        <div className="bg-surface border border-gray-200 rounded-sm p-6 grid grid-cols-2 md:grid-cols-4 gap-4 text-sm">
+          <label className="flex flex-col gap-1">
+            X-Axis
+            <select className={selectClass} value={xMetric} onChange={e => setXMetric(e.target.value)}>
+              {Object.entries(METRIC_LABELS).map(([key, label]) => <option key={key} value={key}>{label}</option>)}
+            </select>
+          </label>
+          <label className="flex flex-col gap-1">
+            Y-Axis
+            <select className={selectClass} value={yMetric} onChange={e => setYMetric(e.target.value)}>
+              {Object.entries(METRIC_LABELS).map(([key, label]) => <option key={key} value={key}>{label}</option>)}
+            </select>
+          </label>
+          <label className="flex flex-col gap-1">
+            Group By
+            <select className={selectClass} value={groupBy} onChange={e => setGroupBy(e.target.value)}>
+              {Object.entries(GROUP_LABELS).map(([key, label]) => <option key={key} value={key}>{label}</option>)}
+            </select>
+          </label>
+          <label className="flex flex-col gap-1">
+            Teams {teams.length === 0 && <span className="text-gray-500">(all)</span>}
+            <select
+              multiple
+              size={3}
+              className={selectClass}
+              value={teams}
+              onChange={e => setTeams(Array.from(e.target.selectedOptions, option => option.value))}
+            >
+              {TEAMS.map(team => <option key={team} value={team}>{team}</option>)}
+            </select>
+          </label>
+          <label className="flex flex-col gap-1">
+            Position
+            <select className={selectClass} value={position} onChange={e => setPosition(e.target.value)}>
+              <option value="">All</option>
+              {['QB', 'RB', 'WR', 'TE'].map(pos => <option key={pos} value={pos}>{pos}</option>)}
+            </select>
+          </label>
+          <label className="flex flex-col gap-1">
+            Play Type
+            <select className={selectClass} value={playType} onChange={e => setPlayType(e.target.value)}>
+              <option value="">Pass + Run</option>
+              <option value="pass">Pass</option>
+              <option value="run">Run</option>
+            </select>
+          </label>
+          <label className="flex flex-col gap-1">
+            Min Attempts
+            <input
+              type="number"
+              min={0}
+              className={selectClass}
+              value={minAttempts}
+              onChange={e => setMinAttempts(Number(e.target.value) || 0)}
+            />
+          </label>
+          <label className="flex items-center gap-2">
+            <input type="checkbox" checked={regularSeason} onChange={e => setRegularSeason(e.target.checked)} />
+            Regular season only
+          </label>
+          <div className="flex items-center text-gray-500">
+            {elapsedMs !== null && !error && `${rows.length} groups · ${elapsedMs} ms`}
+          </div>
         </div>
       </div>
+
+      {error ? (
+        <div className="text-red-500">{error}</div>
+      ) : (
+        <div className="bg-surface border border-gray-200 rounded-sm p-6">
+          <ResponsiveContainer width="100%" height={500}>
+            {groupBy === 'week' ? (
+              <BarChart data={rows} margin={{ left: 20, right: 20, top: 10, bottom: 10 }}>
+                <CartesianGrid strokeDasharray="3 3" stroke="#e5e7eb" />
+                <XAxis dataKey="week" stroke="#6b7280" />
+                <YAxis stroke="#6b7280" />
+                <Tooltip />
+                <Bar dataKey={yMetric} name={METRIC_LABELS[yMetric]} fill="#4A4A4A" />
+              </BarChart>
+            ) : (
+              <ScatterChart margin={{ left: 20, right: 20, top: 10, bottom: 10 }}>
+                <CartesianGrid strokeDasharray="3 3" stroke="#e5e7eb" />
+                <XAxis type="number" dataKey={xMetric} name={METRIC_LABELS[xMetric]} stroke="#6b7280" />
+                <YAxis type="number" dataKey={yMetric} name={METRIC_LABELS[yMetric]} stroke="#6b7280" />
+                <Tooltip
+                  content={({ payload }) => payload && payload.length ? (
+                    <div className="bg-white border border-gray-200 p-2 text-sm">
+                      <div className="font-medium">{String(payload[0].payload[labelKey])}</div>
+                      <div>{METRIC_LABELS[xMetric]}: {payload[0].payload[xMetric]}</div>
+                      <div>{METRIC_LABELS[yMetric]}: {payload[0].payload[yMetric]}</div>
+                    </div>
+                  ) : null}
+                />
+                <Scatter data={rows} fill="#4A4A4A" />
+              </ScatterChart>
+            )}
+          </ResponsiveContainer>
+        </div>
+      )}
     </div>
   )
 }
@@ -1,19 +1,88 @@
+'use client'
+
+import { useState, useEffect } from 'react'
+
+interface Insight {
+  type: string
+  kind: 'team' | 'player'
+  entity: string
+  name: string
+  role: string
+  week: number
+  plays: number
+  epaPerPlay: number
+  baseline: number
+  zScore: number
+  headline: string
+}
+
+interface InsightsData {
+  season: number
+  generated: string
+  insights: Insight[]
+}
+
 export default function InsightsPage() {
+  const [data, setData] = useState<InsightsData | null>(null)
+  const [loading, setLoading] = useState(true)
+
+  useEffect(() => {
+    // Written by insights_job.py
+    fetch('/data/insights.json', { cache: 'no-cache' })
+      .then(res => res.json())
+      .then(data => {
+        setData(data)
+        setLoading(false)
+      })
+      .catch(err => {
+        console.error('Failed to load insights:', err)
+        setLoading(false)
+      })
+  }, [])
+
+  if (loading) {
+    return (
+      <div className="flex items-center justify-center min-h-96">
+        <div className="text-lg text-gray-500">Loading insights...</div>
+      </div>
+    )
+  }
+
   return (
     <div className="space-y-8">
       <div>
         <h2 className="text-2xl mb-6 pb-4 border-b border-gray-200">
-          AI Insights
+          Insights{data ? ` — ${data.season} Season` : ''}
         </h2>
-        <div className="bg-surface border border-gray-200 rounded-sm p-12 text-center">
-          <div className="text-6xl mb-4">🤖</div>
-          <h3 className="text-xl mb-2">AI Insights Coming Soon</h3>
-          <p className="text-gray-600">
-            Autonomous agents discover hidden patterns, detect anomalies, and surface interesting findings automatically.
+        {data && (
+          <p className="text-sm text-gray-500">
+            Generated {new Date(data.generated).toLocaleString()} · {data.insights.length} unusual performances
           </p>
-          <p className="text-sm text-gray-500 mt-4">Phase 4</p>
-        </div>
+        )}
       </div>
+
+      {!data || data.insights.length === 0 ? (
+        <div className="bg-surface border border-gray-200 rounded-sm p-12 text-center text-gray-600">
+          No anomalies detected yet. Run <code>python insights_job.py</code> to analyze the latest games.
+        </div>
+      ) : (
+        <div className="grid gap-4 md:grid-cols-2">
+          {data.insights.map(insight => (
+            <div
+              key={`${insight.kind}-${insight.entity}-${insight.role}-${insight.week}`}
+              className="bg-surface border border-gray-200 rounded-sm p-6"
+            >
+              <div className="flex justify-between text-sm text-gray-500 mb-2">
+                <span>🔍 Anomaly Detected · Week {insight.week}</span>
+                <span className={insight.zScore > 0 ? 'text-green-700' : 'text-red-700'}>
+                  z = {insight.zScore > 0 ? '+' : ''}{insight.zScore.toFixed(1)}
+                </span>
+              </div>
+              <p>{insight.headline}</p>
+            </div>
+          ))}
+        </div>
+      )}
     </div>
   )
 }
@@ -2,6 +2,7 @@
 
 import { useState, useEffect } from 'react'
 import { useSeason } from '@/lib/SeasonContext'
+import { fetchSeasonShards } from '@/lib/nflData'
 
 interface TeamStat {
   team: string
@@ -30,8 +31,7 @@ export default function Home() {
 
   useEffect(() => {
     setLoading(true)
-    fetch(`/data/nfl_${season}.json`)
-      .then(res => res.json())
+    fetchSeasonShards<NFLData>(season, ['league', 'teams'])
       .then(data => {
         setData(data)
         setLoading(false)
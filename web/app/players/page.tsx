@@ -2,13 +2,17 @@
 
 import { useState, useEffect } from 'react'
 import { useSeason } from '@/lib/SeasonContext'
+import { fetchSeasonShards } from '@/lib/nflData'
 
 interface NFLData {
   season: number
   playerStats: {
     qb: Array<{
       player: string
+      playerId: string
       epaPerPlay: number
+      epaPerPlayNormalLow?: number
+      epaPerPlayNormalHigh?: number
       totalEPA: number
       plays: number
       passingYards: number
@@ -19,7 +23,10 @@ interface NFLData {
     }>
     rb: Array<{
       player: string
+      playerId: string
       epaPerPlay: number
+      epaPerPlayNormalLow?: number
+      epaPerPlayNormalHigh?: number
       totalEPA: number
       plays: number
       rushingYards: number
@@ -27,7 +34,10 @@ interface NFLData {
     }>
     wr: Array<{
       player: string
+      playerId: string
       epaPerPlay: number
+      epaPerPlayNormalLow?: number
+      epaPerPlayNormalHigh?: number
       totalEPA: number
       targets: number
       receivingYards: number
@@ -36,7 +46,10 @@ interface NFLData {
     }>
     te: Array<{
       player: string
+      playerId: string
       epaPerPlay: number
+      epaPerPlayNormalLow?: number
+      epaPerPlayNormalHigh?: number
       totalEPA: number
       targets: number
       receivingYards: number
@@ -57,6 +70,12 @@ const POSITION_LABELS = {
   flex: 'Flex (RB/WR/TE)'
 }
 
+// 95% confidence interval on EPA/play (normal approximation), shown on hover
+function epaInterval(player: { epaPerPlayNormalLow?: number, epaPerPlayNormalHigh?: number }) {
+  if (player.epaPerPlayNormalLow === undefined || player.epaPerPlayNormalHigh === undefined) return undefined
+  return `95% CI (normal approx.): ${player.epaPerPlayNormalLow.toFixed(3)} to ${player.epaPerPlayNormalHigh.toFixed(3)}`
+}
+
 export default function PlayersPage() {
   const { season } = useSeason()
   const [position, setPosition] = useState<Position>('all')
@@ -65,8 +84,7 @@ export default function PlayersPage() {
 
   useEffect(() => {
     setLoading(true)
-    fetch(`/data/nfl_${season}.json`)
-      .then(res => res.json())
+    fetchSeasonShards<NFLData>(season, ['players_qb', 'players_rb', 'players_wr', 'players_te'])
       .then(data => {
         setData(data)
         setLoading(false)
@@ -174,7 +192,7 @@ export default function PlayersPage() {
                         {player.position}
                       </span>
                     </td>
-                    <td className="py-3 px-4 text-right font-mono">{player.epaPerPlay.toFixed(3)}</td>
+                    <td className="py-3 px-4 text-right font-mono" title={epaInterval(player)}>{player.epaPerPlay.toFixed(3)}</td>
                     <td className="py-3 px-4 text-right font-mono">{player.totalEPA.toFixed(1)}</td>
                     <td className="py-3 px-4 text-right">{player.plays || player.targets}</td>
                   </tr>
@@ -203,7 +221,7 @@ export default function PlayersPage() {
                   <tr key={idx} className="border-b border-gray-100 hover:bg-gray-50">
                     <td className="py-3 px-4 text-gray-500">#{idx + 1}</td>
                     <td className="py-3 px-4 font-medium">{player.player}</td>
-                    <td className="py-3 px-4 text-right font-mono">{player.epaPerPlay.toFixed(3)}</td>
+                    <td className="py-3 px-4 text-right font-mono" title={epaInterval(player)}>{player.epaPerPlay.toFixed(3)}</td>
                     <td className="py-3 px-4 text-right font-mono">{player.totalEPA.toFixed(1)}</td>
                     <td className="py-3 px-4 text-right">{player.plays}</td>
                     <td className="py-3 px-4 text-right">{player.passingYards.toLocaleString()}</td>
@@ -235,7 +253,7 @@ export default function PlayersPage() {
                   <tr key={idx} className="border-b border-gray-100 hover:bg-gray-50">
                     <td className="py-3 px-4 text-gray-500">#{idx + 1}</td>
                     <td className="py-3 px-4 font-medium">{player.player}</td>
-                    <td className="py-3 px-4 text-right font-mono">{player.epaPerPlay.toFixed(3)}</td>
+                    <td className="py-3 px-4 text-right font-mono" title={epaInterval(player)}>{player.epaPerPlay.toFixed(3)}</td>
                     <td className="py-3 px-4 text-right font-mono">{player.totalEPA.toFixed(1)}</td>
                     <td className="py-3 px-4 text-right">{player.plays}</td>
                     <td className="py-3 px-4 text-right">{player.rushingYards.toLocaleString()}</td>
@@ -267,7 +285,7 @@ export default function PlayersPage() {
                   <tr key={idx} className="border-b border-gray-100 hover:bg-gray-50">
                     <td className="py-3 px-4 text-gray-500">#{idx + 1}</td>
                     <td className="py-3 px-4 font-medium">{player.player}</td>
-                    <td className="py-3 px-4 text-right font-mono">{player.epaPerPlay.toFixed(3)}</td>
+                    <td className="py-3 px-4 text-right font-mono" title={epaInterval(player)}>{player.epaPerPlay.toFixed(3)}</td>
                     <td className="py-3 px-4 text-right font-mono">{player.totalEPA.toFixed(1)}</td>
                     <td className="py-3 px-4 text-right">{player.targets}</td>
                     <td className="py-3 px-4 text-right">{player.receptions}</td>
@@ -2,6 +2,7 @@
 
 import { useState, useEffect } from 'react'
 import { useSeason } from '@/lib/SeasonContext'
+import { fetchSeasonShards } from '@/lib/nflData'
 import { getTeamLogo, TEAM_COLORS } from '@/lib/teamLogos'
 import Image from 'next/image'
 import { BarChart, Bar, XAxis, YAxis, CartesianGrid, Tooltip, Legend, ResponsiveContainer, PieChart, Pie, Cell, ReferenceLine } from 'recharts'
@@ -25,6 +26,12 @@ interface NFLData {
     rushEpaPerPlay: number
     rushTotalEPA: number
     rushPlays: number
+    defEpaPerPlay: number
+    defTotalEPA: number
+    defPlays: number
+    defPassEpaPerPlay: number
+    defRushEpaPerPlay: number
+    netEpaPerPlay: number
   }>
 }
 
@@ -43,8 +50,7 @@ export default function TeamsPage() {
 
   useEffect(() => {
     setLoading(true)
-    fetch(`/data/nfl_${season}.json`)
-      .then(res => res.json())
+    fetchSeasonShards<NFLData>(season, ['teams'])
       .then(data => {
         setData(data)
         setLoading(false)
@@ -155,6 +161,46 @@ export default function TeamsPage() {
             </div>
           </section>
 
+          {teamData.defEpaPerPlay !== undefined && (
+            <section>
+              <h3 className="text-xl mb-4">Defensive Efficiency</h3>
+              <div className="grid grid-cols-1 md:grid-cols-4 gap-6">
+                <div className="metric-card">
+                  <div className="text-sm uppercase tracking-wider text-gray-500 mb-2">
+                    EPA/Play Allowed
+                  </div>
+                  <div className="text-3xl font-light">
+                    <span className={teamData.defEpaPerPlay < 0 ? '' : 'text-red-600'}>
+                      {teamData.defEpaPerPlay.toFixed(3)}
+                    </span>
+                  </div>
+                </div>
+                <div className="metric-card">
+                  <div className="text-sm uppercase tracking-wider text-gray-500 mb-2">
+                    Pass EPA Allowed
+                  </div>
+                  <div className="text-3xl font-light">{teamData.defPassEpaPerPlay.toFixed(3)}</div>
+                </div>
+                <div className="metric-card">
+                  <div className="text-sm uppercase tracking-wider text-gray-500 mb-2">
+                    Rush EPA Allowed
+                  </div>
+                  <div className="text-3xl font-light">{teamData.defRushEpaPerPlay.toFixed(3)}</div>
+                </div>
+                <div className="metric-card">
+                  <div className="text-sm uppercase tracking-wider text-gray-500 mb-2">
+                    Net EPA/Play
+                  </div>
+                  <div className="text-3xl font-light">
+                    <span className={teamData.netEpaPerPlay > 0 ? '' : 'text-red-600'}>
+                      {teamData.netEpaPerPlay > 0 ? '+' : ''}{teamData.netEpaPerPlay.toFixed(3)}
+                    </span>
+                  </div>
+                </div>
+              </div>
+            </section>
+          )}
+
           <section>
             <h3 className="text-xl mb-4">Pass vs Rush Efficiency</h3>
             <div className="grid grid-cols-1 lg:grid-cols-2 gap-6">
@@ -0,0 +1,77 @@
+type Row = Record<string, unknown>
+type Columns = Record<string, unknown[]>
+
+// Rebuild row objects from the columnar export (one array per field)
+function toRows(columns: Columns): Row[] {
+  const fields = Object.keys(columns)
+  const length = fields.length ? columns[fields[0]].length : 0
+  const rows: Row[] = new Array(length)
+  for (let i = 0; i < length; i++) {
+    const row: Row = {}
+    for (const field of fields) {
+      row[field] = columns[field][i]
+    }
+    rows[i] = row
+  }
+  return rows
+}
+
+function tableRows(table: Row[] | Columns, format: string): Row[] {
+  return format === 'columnar' ? toRows(table as Columns) : (table as Row[])
+}
+
+// Fetch a season export in either the row or the columnar layout
+export async function fetchSeasonData<T>(season: number): Promise<T> {
+  const res = await fetch(`/data/nfl_${season}.json`)
+  const data = await res.json()
+
+  if (data.format !== 'columnar') {
+    return data as T
+  }
+
+  const playerStats: Record<string, Row[]> = {}
+  for (const [position, columns] of Object.entries(data.playerStats as Record<string, Columns>)) {
+    playerStats[position] = toRows(columns)
+  }
+
+  return { ...data, teamStats: toRows(data.teamStats), playerStats } as T
+}
+
+interface Manifest {
+  season: number
+  format: string
+  lastUpdated: string
+  shards: Record<string, { file: string; sha256: string; bytes: number }>
+}
+
+// Fetch only the shards a page renders ('league', 'teams', 'players_qb', ...),
+// falling back to the full season file when no manifest was exported
+export async function fetchSeasonShards<T>(season: number, names: string[]): Promise<T> {
+  // The manifest is small and changes every rebuild; shard URLs are content-hashed
+  const res = await fetch(`/data/nfl_${season}.manifest.json`, { cache: 'no-cache' })
+  if (!res.ok) {
+    return fetchSeasonData<T>(season)
+  }
+  const manifest: Manifest = await res.json()
+
+  const shards = await Promise.all(
+    names.map(name => fetch(`/data/${manifest.shards[name].file}`).then(r => r.json()))
+  )
+
+  const data: Record<string, unknown> = { season: manifest.season, lastUpdated: manifest.lastUpdated }
+  const playerStats: Record<string, Row[]> = {}
+  names.forEach((name, i) => {
+    if (name === 'league') {
+      data.leagueStats = shards[i]
+    } else if (name === 'teams') {
+      data.teamStats = tableRows(shards[i], manifest.format)
+    } else if (name.startsWith('players_')) {
+      playerStats[name.slice('players_'.length)] = tableRows(shards[i], manifest.format)
+    }
+  })
+  if (Object.keys(playerStats).length) {
+    data.playerStats = playerStats
+  }
+
+  return data as T
+}
@@ -11,6 +11,19 @@ const nextConfig = {
       },
     ],
   },
+  async headers() {
+    return [
+      {
+        // Shard file names contain a hash of their contents, so they never change
+        source: '/data/shards/:file*',
+        headers: [{ key: 'Cache-Control', value: 'public, max-age=31536000, immutable' }],
+      },
+      {
+        source: '/data/:file*.manifest.json',
+        headers: [{ key: 'Cache-Control', value: 'no-cache' }],
+      },
+    ]
+  },
 }
 
 module.exports = nextConfig
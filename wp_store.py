@@ -0,0 +1,157 @@
+"""
+Win Probability Store
+Precomputed, downsampled win probability curves for every game in a season,
+so one game's curve is a slice of a memory-mapped array instead of a filter
+over the whole play-by-play frame
+"""
+
+import argparse
+import hashlib
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+import data_cache
+
+# Most points kept per game (a game has ~170 plays)
+POINTS_PER_GAME = 120
+
+WP_COLUMNS = ['game_id', 'week', 'home_team', 'away_team', 'posteam',
+              'game_seconds_remaining', 'wp', 'home_wp']
+
+# Key in the game index's Parquet metadata naming the curve array it belongs to
+CURVES_KEY = b'wp_curves'
+
+def store_dir():
+    """Directory holding the win probability stores"""
+    return data_cache.CACHE_DIR / 'wp'
+
+def index_path(season):
+    """Game offset index for a season; its metadata names the matching curve array"""
+    return store_dir() / f'wp_{season}_games.parquet'
+
+def stored_curves(path):
+    """Name of the curve array a game index points at, or None for an older layout"""
+    return (pq.read_schema(path).metadata or {}).get(CURVES_KEY, b'').decode() or None
+
+def downsample_positions(sizes, points):
+    """Evenly spaced row positions per group, always keeping each group's first and last row"""
+    starts = np.cumsum(sizes) - sizes
+    kept = np.minimum(sizes, points)
+
+    group = np.repeat(np.arange(len(sizes)), kept)
+    step = np.arange(kept.sum()) - np.repeat(np.cumsum(kept) - kept, kept)
+
+    # Spread kept points over each game: 0 .. size-1 in kept-1 even steps
+    span = (sizes - 1)[group]
+    denominator = np.maximum(kept - 1, 1)[group]
+    return starts[group] + np.round(step * span / denominator).astype(np.int64), kept
+
+def build_store(season, points=POINTS_PER_GAME, offline=None, refresh=False):
+    """Build a season's store from cached play-by-play
+
+    Curves are stored from the home team's point of view as a float32
+    array of (game_seconds_remaining, home_wp) rows, grouped by game.
+    """
+    pbp = data_cache.read_cached('pbp', season, columns=WP_COLUMNS, offline=offline, refresh=refresh)
+
+    # nflverse has home_wp; otherwise flip the possession team's wp
+    if 'home_wp' not in pbp.columns:
+        pbp['home_wp'] = pbp['wp'].where(pbp['posteam'] == pbp['home_team'], 1 - pbp['wp'])
+
+    pbp = pbp.dropna(subset=['game_id', 'game_seconds_remaining', 'home_wp'])
+    # Plays are already in game order; a stable sort only groups games together
+    pbp = pbp.sort_values('game_id', kind='stable')
+
+    games = pbp.groupby('game_id', sort=False).agg(
+        week=('week', 'first'), home_team=('home_team', 'first'),
+        away_team=('away_team', 'first'), size=('home_wp', 'size'),
+    ).reset_index()
+
+    positions, kept = downsample_positions(games['size'].to_numpy(), points)
+    curves = np.column_stack([
+        pbp['game_seconds_remaining'].to_numpy(dtype='float32')[positions],
+        pbp['home_wp'].to_numpy(dtype='float32')[positions],
+    ])
+
+    games['stop'] = np.cumsum(kept)
+    games['start'] = games['stop'] - kept
+    games = games.drop(columns='size')
+
+    # The curve array is named by a hash of its contents and the index that
+    # points at it is swapped in last, in one step, so a reader never pairs
+    # new curves with old offsets. Temporary names are per process and thread.
+    path = index_path(season)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    previous = stored_curves(path) if path.exists() else None
+
+    curves_name = f'wp_{season}.{hashlib.sha256(curves.tobytes()).hexdigest()[:12]}.npy'
+    curve_path = store_dir() / curves_name
+    if not curve_path.exists():
+        tmp_curve = data_cache.temporary_path(curve_path)
+        with open(tmp_curve, 'wb') as f:
+            np.save(f, curves)
+        os.replace(tmp_curve, curve_path)
+
+    table = pa.Table.from_pandas(games, preserve_index=False)
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}), CURVES_KEY: curves_name.encode()})
+    tmp_index = data_cache.temporary_path(path)
+    pq.write_table(table, tmp_index)
+    os.replace(tmp_index, path)
+
+    # Keep the previous array for readers that opened the old index
+    for old_curves in store_dir().glob(f'wp_{season}*.npy'):
+        if old_curves.name not in (curves_name, previous):
+            old_curves.unlink()
+
+    print(f"✅ Win probability store for {season}: {len(games)} games, {len(curves):,} points")
+    return path
+
+def ensure_store(season, offline=None, refresh=False):
+    """Build the store if it is missing, in an older layout or older than the cached play-by-play
+
+    Only one thread or process rebuilds it; the rest wait and reuse its files.
+    """
+    path = index_path(season)
+    pbp_path = data_cache.ensure_cached('pbp', season, offline=offline, refresh=refresh)
+
+    def stale():
+        return (not path.exists() or path.stat().st_mtime < pbp_path.stat().st_mtime or
+                stored_curves(path) is None)
+
+    if refresh or stale():
+        requested = time.time()
+        with data_cache.refresh_lock(path):
+            rebuilt = path.exists() and path.stat().st_mtime >= requested
+            if not rebuilt and (refresh or stale()):
+                build_store(season, offline=offline)
+    return path
+
+def load_store(season, offline=None, refresh=False):
+    """Game index and the memory-mapped curve array it was built with, for a season"""
+    path = ensure_store(season, offline=offline, refresh=refresh)
+    table = pq.read_table(path)
+    games = table.to_pandas().set_index('game_id')
+    return games, np.load(store_dir() / table.schema.metadata[CURVES_KEY].decode(), mmap_mode='r')
+
+def game_curve(games, curves, game_id):
+    """One game's win probability curve as a DataFrame (seconds remaining, home_wp)"""
+    start, stop = games.loc[game_id, ['start', 'stop']]
+    points = np.asarray(curves[int(start):int(stop)])
+    return pd.DataFrame({'game_seconds_remaining': points[:, 0], 'home_wp': points[:, 1]})
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Build the per-game win probability store')
+    parser.add_argument('--seasons', type=int, nargs='+', default=[2025, 2024, 2023, 2022, 2021, 2020])
+    parser.add_argument('--points', type=int, default=POINTS_PER_GAME,
+                        help='Most points kept per game')
+    parser.add_argument('--offline', action='store_true',
+                        help='Only read from the local cache, never download')
+    args = parser.parse_args()
+
+    for season in args.seasons:
+        build_store(season, points=args.points, offline=args.offline or None)